@@ -0,0 +1,193 @@
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import bar_store
+import lru
+import metrics
+
+# ==========================================
+# 均線回測：一次評估數百組「短均線 / 長均線」交叉參數
+# 短均線在長均線之上時持有 (以當日收盤訊號持有到隔日收盤)，否則空手；
+# 所有視窗的均線以累積和一次算出，全部參數組合的部位 / 報酬 / 回撤都是 (組合 × 交易日) 矩陣運算
+# 整個群組回測時每檔交給行程池平行計算，結果依 K 線資料庫版本快取
+#
+#   python backtest.py 2330.TW 2317.TW    (以本地日線回測，印出各檔建議的 ma_settings)
+# ==========================================
+FAST_WINDOWS = tuple(range(3, 31))
+SLOW_WINDOWS = tuple(range(10, 61, 5)) + tuple(range(70, 241, 10))
+# 回測期間 (交易日)：約等於日線標準序列的 2 年
+BACKTEST_DAYS = 500
+# 每次進場或出場的成本 (手續費 + 證交稅的概估，單邊)
+TRADE_COST = 0.002
+# 交易次數太少的組合只是碰巧抓到一段行情，不列入建議
+MIN_TRADES = 3
+# 超過這麼多檔才交給行程池，檔數少時行程間傳遞的成本不划算
+PARALLEL_MIN_SYMBOLS = 8
+POOL_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+CACHE_SIZE = 1024
+
+_lock = threading.Lock()
+_cache = lru.LRUCache(CACHE_SIZE)    # symbol -> {"version", "result"}
+_pool = None
+
+def _moving_averages(close, windows):
+    # (len(windows), T) 的移動平均矩陣，資料不足的位置為 NaN
+    csum = np.concatenate(([0.0], np.cumsum(close)))
+    windows = np.asarray(windows)
+    end = np.arange(1, len(close) + 1)
+    start = end[None, :] - windows[:, None]
+    with np.errstate(invalid="ignore"):
+        out = (csum[end][None, :] - csum[np.maximum(start, 0)]) / windows[:, None]
+    out[start < 0] = np.nan
+    return out
+
+def sweep(close, fast_windows=FAST_WINDOWS, slow_windows=SLOW_WINDOWS, cost=TRADE_COST):
+    # 回傳每組參數的報酬、勝率、最大回撤、交易次數、持有比例 (皆為與 fast / slow 同長度的陣列)
+    close = np.asarray(close, dtype=float)
+    close = close[~np.isnan(close)]
+    pairs = [(f, s) for f in fast_windows for s in slow_windows if f < s]
+    fast = np.array([f for f, _ in pairs], dtype=int)
+    slow = np.array([s for _, s in pairs], dtype=int)
+    windows = np.unique(np.concatenate((fast, slow)))
+    n_days = len(close)
+    result = {"fast": fast, "slow": slow, "days": n_days}
+    if n_days < 2:
+        nan = np.full(len(pairs), np.nan)
+        return result | {"return": nan, "hit_rate": nan, "max_drawdown": nan,
+                         "trades": np.zeros(len(pairs), dtype=int), "exposure": nan, "buy_hold": np.nan}
+
+    ma = _moving_averages(close, windows)
+    with np.errstate(invalid="ignore"):
+        position = ma[np.searchsorted(windows, fast)] > ma[np.searchsorted(windows, slow)]
+    # change[t]：第 t 天收盤時的進出場 (1 進場、-1 出場)，最後一天的訊號已沒有隔日報酬，不計
+    change = np.diff(position.astype(np.int8), axis=1, prepend=0)[:, :-1]
+    held = position[:, :-1]
+    daily = close[1:] / close[:-1] - 1
+    strategy = np.where(held, daily, 0.0) - cost * np.abs(change)
+
+    equity = np.cumprod(1 + strategy, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    entries = change == 1
+
+    # 逐筆交易報酬：以進場次數的累積值當交易編號，持有日與出場日的對數報酬依編號加總
+    trade_id = np.cumsum(entries, axis=1)
+    in_trade = held | (change == -1)
+    rows = np.broadcast_to(np.arange(len(pairs))[:, None], trade_id.shape)
+    flat_id = (rows * n_days + trade_id)[in_trade]
+    trade_log = np.bincount(flat_id, weights=np.log1p(strategy)[in_trade], minlength=len(pairs) * n_days)
+    trade_log = trade_log.reshape(len(pairs), n_days)
+    trades = entries.sum(axis=1)
+    wins = (trade_log[:, 1:] > 0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hit_rate = np.where(trades > 0, wins / trades, np.nan)
+
+    return result | {
+        "return": equity[:, -1] - 1,
+        "hit_rate": hit_rate,
+        "max_drawdown": (1 - equity / peak).max(axis=1),
+        "trades": trades,
+        "exposure": held.mean(axis=1),
+        "buy_hold": close[-1] / close[0] - 1,
+    }
+
+def ranking(result, min_trades=MIN_TRADES):
+    # 依報酬由高到低 (同報酬時回撤小的優先) 排出組合的索引，交易次數不足的排除
+    eligible = np.flatnonzero((result["trades"] >= min_trades) & ~np.isnan(result["return"]))
+    order = np.lexsort((result["max_drawdown"][eligible], -result["return"][eligible]))
+    return eligible[order]
+
+def suggest(result, min_trades=MIN_TRADES):
+    # 建議的 ma_settings 字串 ("短,長")；沒有合格組合時回傳 None
+    order = ranking(result, min_trades)
+    if not len(order):
+        return None
+    best = order[0]
+    return f"{result['fast'][best]},{result['slow'][best]}"
+
+def _load_close(symbol):
+    _, quote = bar_store.load_bars(symbol, "1d")
+    return np.array(quote["close"][-BACKTEST_DAYS:], dtype=float)
+
+def _cached(symbol, version):
+    entry = _cache.get(symbol)
+    if entry is not None and entry["version"] == version:
+        return entry["result"]
+    return None
+
+def sweep_symbol(symbol):
+    # 單檔回測；K 線資料庫沒有新 K 棒時直接回傳上次結果
+    version = bar_store.get_version(symbol, "1d")
+    result = _cached(symbol, version)
+    if result is None:
+        started = time.perf_counter()
+        result = sweep(_load_close(symbol))
+        metrics.observe("backtest_seconds", time.perf_counter() - started, scope="symbol")
+        _cache.put(symbol, {"version": version, "result": result})
+    return result
+
+def _get_pool():
+    # 以 spawn 建立子行程：Streamlit 伺服器有多個執行緒，fork 可能複製到被鎖住的鎖
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def sweep_group(symbols):
+    # 回傳 {symbol: 回測結果}；收盤價在主行程讀出，只把陣列送進行程池計算
+    global _pool
+    symbols = list(dict.fromkeys(symbols))
+    versions = bar_store.get_versions(symbols, "1d")
+    results = {sym: _cached(sym, versions.get(sym)) for sym in symbols}
+    todo = [sym for sym in symbols if results[sym] is None]
+    if not todo:
+        return results
+
+    started = time.perf_counter()
+    closes = [_load_close(sym) for sym in todo]
+    computed = None
+    if len(todo) >= PARALLEL_MIN_SYMBOLS:
+        try:
+            computed = list(_get_pool().map(sweep, closes, chunksize=max(1, len(todo) // (POOL_WORKERS * 4))))
+        except BrokenProcessPool as e:
+            # 子行程異常結束 (例如記憶體不足)：丟掉這個行程池，改在本行程計算
+            print(f"⚠️ 回測行程池失效，改在本行程計算: {e}")
+            with _lock:
+                _pool = None
+    if computed is None:
+        computed = [sweep(close) for close in closes]
+    metrics.observe("backtest_seconds", time.perf_counter() - started, scope="group")
+
+    for sym, result in zip(todo, computed):
+        _cache.put(sym, {"version": versions.get(sym), "result": result})
+        results[sym] = result
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="均線交叉參數回測")
+    parser.add_argument("symbols", nargs="+")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    results = sweep_group(args.symbols)
+    for sym, result in results.items():
+        order = ranking(result)
+        if not len(order):
+            print(f"{sym}: 資料不足 ({result['days']} 日)")
+            continue
+        best = order[0]
+        print(
+            f"{sym}: 建議 {suggest(result)}  報酬 {result['return'][best]:+.1%}  勝率 {result['hit_rate'][best]:.0%}  "
+            f"最大回撤 {result['max_drawdown'][best]:.1%}  交易 {result['trades'][best]} 次  "
+            f"(買進持有 {result['buy_hold']:+.1%}，{len(result['fast'])} 組參數)"
+        )
+    print(f"耗時 {time.perf_counter() - started:.2f} 秒")
+
+if __name__ == "__main__":
+    main()
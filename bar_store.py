@@ -0,0 +1,212 @@
+import os
+import time
+
+import sqlite_conn
+
+# ==========================================
+# 本地 K 線資料庫 (SQLite)：以 symbol / interval 為鍵保存歷史 OHLCV
+# ==========================================
+DB_PATH = os.environ.get(
+    "BAR_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "bars.sqlite3"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,
+    open     REAL,
+    high     REAL,
+    low      REAL,
+    close    REAL,
+    volume   REAL,
+    PRIMARY KEY (symbol, interval, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol       TEXT    NOT NULL,
+    interval     TEXT    NOT NULL,
+    covered_from INTEGER NOT NULL,
+    fetched_at   REAL    NOT NULL,
+    PRIMARY KEY (symbol, interval)
+) WITHOUT ROWID;
+
+-- 代號資料快取 (symbol_resolver)：是否有效與名稱 / 交易所 / 幣別，查無資料的代號也記錄
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol     TEXT    NOT NULL PRIMARY KEY,
+    valid      INTEGER NOT NULL,
+    name       TEXT    NOT NULL DEFAULT '',
+    exchange   TEXT    NOT NULL DEFAULT '',
+    currency   TEXT    NOT NULL DEFAULT '',
+    checked_at REAL    NOT NULL
+) WITHOUT ROWID;
+"""
+
+_connections = sqlite_conn.ThreadConnections(SCHEMA)
+
+def get_conn():
+    return _connections.get(DB_PATH)
+
+def get_coverage(symbol, interval):
+    # 回傳 (已涵蓋的最早時間, 最後一根 K 棒時間, 上次抓取時間)，沒有資料時回傳 None
+    conn = get_conn()
+    row = conn.execute(
+        "SELECT covered_from, fetched_at FROM coverage WHERE symbol = ? AND interval = ?",
+        (symbol, interval),
+    ).fetchone()
+    if row is None:
+        return None
+    last = conn.execute(
+        "SELECT MAX(ts) FROM bars WHERE symbol = ? AND interval = ?", (symbol, interval)
+    ).fetchone()[0]
+    if last is None:
+        return None
+    return row[0], last, row[1]
+
+def get_version(symbol, interval):
+    # 每次寫入或確認增量都會更新 fetched_at，可作為快取失效的版本號
+    row = get_conn().execute(
+        "SELECT fetched_at FROM coverage WHERE symbol = ? AND interval = ?", (symbol, interval)
+    ).fetchone()
+    return row[0] if row else None
+
+def get_versions(symbols, interval):
+    # 一次查多檔的版本號 {symbol: fetched_at}，沒有資料的代號不會出現在結果裡
+    symbols = list(symbols)
+    versions = {}
+    conn = get_conn()
+    for i in range(0, len(symbols), 500):
+        chunk = symbols[i:i + 500]
+        rows = conn.execute(
+            f"SELECT symbol, fetched_at FROM coverage WHERE interval = ? AND symbol IN ({', '.join('?' * len(chunk))})",
+            [interval] + chunk,
+        ).fetchall()
+        versions.update(rows)
+    return versions
+
+def get_tail_timestamps(symbol, interval, n=2):
+    # 最後 n 根 K 棒的時間 (新到舊)，增量抓取時用來決定重疊起點
+    rows = get_conn().execute(
+        "SELECT ts FROM bars WHERE symbol = ? AND interval = ? ORDER BY ts DESC LIMIT ?",
+        (symbol, interval, n),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+def save_bars(symbol, interval, timestamps, quote, covered_from=None, replace_tail=True, fetched_at=None):
+    # quote 為 Yahoo chart 回傳的 indicators.quote[0] (open/high/low/close/volume 陣列)
+    # replace_tail: 新資料取代本地重疊的整個尾段 (盤中最後一根 K 棒的時間戳記會變動)；
+    # 往前補資料時只取代新資料本身涵蓋的區間
+    # fetched_at: 資料實際抓取的時間 (從快照寫入時沿用快照時間)，預設為現在
+    if not timestamps:
+        return
+
+    opens = quote.get("open") or [None] * len(timestamps)
+    highs = quote.get("high") or [None] * len(timestamps)
+    lows = quote.get("low") or [None] * len(timestamps)
+    closes = quote.get("close") or [None] * len(timestamps)
+    volumes = quote.get("volume") or [None] * len(timestamps)
+    rows = [
+        (symbol, interval, int(ts), o, h, l, c, v)
+        for ts, o, h, l, c, v in zip(timestamps, opens, highs, lows, closes, volumes)
+        if c is not None
+    ]
+
+    conn = get_conn()
+    with conn:
+        if replace_tail:
+            conn.execute(
+                "DELETE FROM bars WHERE symbol = ? AND interval = ? AND ts >= ?",
+                (symbol, interval, int(min(timestamps))),
+            )
+        else:
+            conn.execute(
+                "DELETE FROM bars WHERE symbol = ? AND interval = ? AND ts BETWEEN ? AND ?",
+                (symbol, interval, int(min(timestamps)), int(max(timestamps))),
+            )
+        conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        existing = conn.execute(
+            "SELECT covered_from FROM coverage WHERE symbol = ? AND interval = ?", (symbol, interval)
+        ).fetchone()
+        if covered_from is None:
+            covered_from = existing[0] if existing else int(min(timestamps))
+        elif existing:
+            covered_from = min(covered_from, existing[0])
+        conn.execute(
+            "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+            (symbol, interval, int(covered_from), time.time() if fetched_at is None else fetched_at),
+        )
+
+def extend_coverage(symbol, interval, covered_from):
+    # 往前補抓的區段確定沒有 K 棒 (例如上市前)：只把涵蓋起點往前推，之後不再重抓這一段
+    conn = get_conn()
+    with conn:
+        conn.execute(
+            "UPDATE coverage SET covered_from = MIN(covered_from, ?) WHERE symbol = ? AND interval = ?",
+            (int(covered_from), symbol, interval),
+        )
+
+def touch(symbol, interval):
+    # 增量查詢成功但沒有新 K 棒時，只更新抓取時間
+    conn = get_conn()
+    with conn:
+        conn.execute(
+            "UPDATE coverage SET fetched_at = ? WHERE symbol = ? AND interval = ?",
+            (time.time(), symbol, interval),
+        )
+
+def load_bars(symbol, interval, start_ts=None):
+    # 回傳與 Yahoo chart 相同形狀的 (timestamps, quote dict)
+    sql = "SELECT ts, open, high, low, close, volume FROM bars WHERE symbol = ? AND interval = ?"
+    params = [symbol, interval]
+    if start_ts is not None:
+        sql += " AND ts >= ?"
+        params.append(int(start_ts))
+    sql += " ORDER BY ts"
+
+    rows = get_conn().execute(sql, params).fetchall()
+    timestamps = [r[0] for r in rows]
+    quote = {
+        "open": [r[1] for r in rows],
+        "high": [r[2] for r in rows],
+        "low": [r[3] for r in rows],
+        "close": [r[4] for r in rows],
+        "volume": [r[5] for r in rows],
+    }
+    return timestamps, quote
+
+def load_last_closes(symbol, interval, n=2):
+    # 報價用：只取最後 n 筆收盤價 (舊到新)，走主鍵索引倒序掃描
+    rows = get_conn().execute(
+        "SELECT close FROM bars WHERE symbol = ? AND interval = ? AND close IS NOT NULL "
+        "ORDER BY ts DESC LIMIT ?",
+        (symbol, interval, n),
+    ).fetchall()
+    return [r[0] for r in reversed(rows)]
+
+SYMBOL_COLUMNS = ("symbol", "valid", "name", "exchange", "currency", "checked_at")
+
+def get_symbol_meta(symbols):
+    # 一次查多檔的代號資料 {symbol: dict}，沒查過的代號不會出現在結果裡
+    symbols = list(symbols)
+    meta = {}
+    conn = get_conn()
+    for i in range(0, len(symbols), 500):
+        chunk = symbols[i:i + 500]
+        rows = conn.execute(
+            f"SELECT {', '.join(SYMBOL_COLUMNS)} FROM symbols WHERE symbol IN ({', '.join('?' * len(chunk))})", chunk,
+        ).fetchall()
+        meta.update((row[0], dict(zip(SYMBOL_COLUMNS, row))) for row in rows)
+    return meta
+
+def save_symbol_meta(entries):
+    # entries: [{"symbol", "valid", "name", "exchange", "currency"}]，檢查時間記為現在
+    now = time.time()
+    conn = get_conn()
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO symbols ({', '.join(SYMBOL_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+            [(e["symbol"], int(e["valid"]), e.get("name", ""), e.get("exchange", ""), e.get("currency", ""), now)
+             for e in entries],
+        )
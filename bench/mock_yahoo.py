@@ -0,0 +1,261 @@
+import argparse
+import datetime
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+# ==========================================
+# 本地模擬 Yahoo 伺服器 (效能測試用)：
+# 提供 v8/finance/chart 與 v7/finance/spark，可設定延遲與錯誤注入
+# 有錄製檔 (fixtures/<代號>.json，v8 chart 原始回應) 的代號直接回放，其餘以代號為種子產生固定的假資料：
+# 假資料固定算到 SYNTHETIC_TODAY，再整週平移到接近實際日期，不同日子跑出的 K 棒數值相同
+#
+#   python bench/mock_yahoo.py serve --port 8765 --latency 50 --error-rate 0.02
+#   python bench/mock_yahoo.py record 2330.TW 2317.TW      (從 Yahoo 錄製 2y 日線到 fixtures/)
+# ==========================================
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+HISTORY_START = datetime.date(2010, 1, 4)
+SYNTHETIC_TODAY = datetime.date(2026, 6, 30)
+INTERVAL_SECONDS = {"1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600}
+RANGE_DAYS = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+# 交易時段 (UTC)：台股 09:00-13:30 (UTC+8)，其他視為美股 09:30-16:00 (夏令 UTC-4)
+SESSIONS = {"TW": (1 * 3600, 5 * 3600 + 1800), "US": (13 * 3600 + 1800, 20 * 3600)}
+
+class MockConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, missing_rate=0.0, seed=0, fixture_dir=FIXTURE_DIR,
+                 today=SYNTHETIC_TODAY):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # 以 error_rate 的機率回 429 / 503 (觸發客戶端重試與斷路器)
+        self.error_rate = error_rate
+        # 以 missing_rate 的比例讓代號永久 404 (依代號雜湊決定，每次執行都相同)
+        self.missing_rate = missing_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.fixture_dir = fixture_dir
+        # 假資料的最後一個交易日 (平移前)
+        self.today = today
+        self.stats = {"chart": 0, "spark": 0, "errors": 0, "missing": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def roll(self):
+        with self.random_lock:
+            return self.random.random(), self.random.gauss(0, 1)
+
+def _seed(symbol):
+    return zlib.crc32(symbol.encode())
+
+def is_missing(symbol, rate):
+    return rate > 0 and (_seed(symbol) % 10000) < rate * 10000
+
+@functools.lru_cache(maxsize=4096)
+def _daily_series(symbol, last_day):
+    # 以代號為種子的隨機漫步 (交易日 = 週一到週五)；結果只由代號與 last_day 決定，增量請求與完整請求一致
+    days = np.arange(np.datetime64(HISTORY_START), np.datetime64(last_day) + 1)
+    days = days[np.is_busday(days)]
+    rng = np.random.default_rng(_seed(symbol))
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, len(days))))
+    spread = np.abs(rng.normal(0, 0.01, len(days))) * close
+    open_ = close * (1 + rng.normal(0, 0.006, len(days)))
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(500, 50000, len(days)) * 1000
+    return days, open_, high, low, close, volume
+
+def _session(symbol):
+    return SESSIONS["TW"] if symbol.upper().endswith((".TW", ".TWO")) else SESSIONS["US"]
+
+def _shift_seconds(now, today=SYNTHETIC_TODAY):
+    # 固定序列整週往後平移 (星期幾不變)，讓最後一根 K 棒落在實際日期前 7 天內，客戶端依現在時間算的區間仍有資料
+    weeks = max((datetime.datetime.fromtimestamp(now, datetime.timezone.utc).date() - today).days // 7, 0)
+    return weeks * 7 * 86400
+
+def synthetic_bars(symbol, start, end, interval, today=SYNTHETIC_TODAY):
+    # 回傳 [start, end] 之間的 (timestamps, quote)
+    now = time.time()
+    end = min(end, now)
+    days, open_, high, low, close, volume = _daily_series(symbol, today)
+    base_ts = days.astype("datetime64[s]").astype(np.int64)
+    day_ts = base_ts + _shift_seconds(now, today)
+    session_open, session_close = _session(symbol)
+
+    if interval not in INTERVAL_SECONDS:
+        ts = day_ts + session_open
+        keep = (ts >= start) & (ts <= end)
+        return ts[keep].tolist(), {
+            "open": open_[keep].round(2).tolist(), "high": high[keep].round(2).tolist(),
+            "low": low[keep].round(2).tolist(), "close": close[keep].round(2).tolist(),
+            "volume": volume[keep].tolist(),
+        }
+
+    # 盤中：在每個交易日的時段內以該日開盤 → 收盤為趨勢補上小幅波動
+    step = INTERVAL_SECONDS[interval]
+    first = np.searchsorted(day_ts + session_close, start)
+    last = np.searchsorted(day_ts + session_open, end, side="right")
+    per_day = (session_close - session_open) // step
+    offsets = np.arange(per_day) * step
+    ts, o, h, l, c, v = [], [], [], [], [], []
+    for i in range(first, last):
+        bar_ts = day_ts[i] + session_open + offsets
+        rng = np.random.default_rng((_seed(symbol), int(base_ts[i]), step))
+        path = np.linspace(open_[i], close[i], per_day + 1)
+        path[1:-1] *= 1 + rng.normal(0, 0.002, per_day - 1)
+        keep = (bar_ts >= start) & (bar_ts <= end)
+        ts.extend(bar_ts[keep].tolist())
+        o.extend(path[:-1][keep].round(2).tolist())
+        c.extend(path[1:][keep].round(2).tolist())
+        h.extend((np.maximum(path[:-1], path[1:])[keep] * 1.001).round(2).tolist())
+        l.extend((np.minimum(path[:-1], path[1:])[keep] * 0.999).round(2).tolist())
+        v.extend((volume[i] // per_day * np.ones(per_day, dtype=np.int64))[keep].tolist())
+    return ts, {"open": o, "high": h, "low": l, "close": c, "volume": v}
+
+@functools.lru_cache(maxsize=256)
+def _load_fixture(fixture_dir, symbol):
+    path = os.path.join(fixture_dir, f"{symbol}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        result = json.load(f)["chart"]["result"][0]
+    return result.get("timestamp") or [], result["indicators"]["quote"][0]
+
+def get_bars(config, symbol, params):
+    now = time.time()
+    interval = params.get("interval", "1d")
+    if "period1" in params:
+        start, end = int(params["period1"]), int(params.get("period2", now))
+    else:
+        range_str = params.get("range", "1mo")
+        start = 0 if range_str == "max" else now - RANGE_DAYS.get(range_str, 31) * 86400
+        end = now
+
+    fixture = _load_fixture(config.fixture_dir, symbol) if interval == "1d" else None
+    if fixture is None:
+        return synthetic_bars(symbol, start, end, interval, config.today)
+    timestamps, quote = fixture
+    keep = [i for i, ts in enumerate(timestamps) if start <= ts <= end]
+    return [timestamps[i] for i in keep], {key: [values[i] for i in keep] for key, values in quote.items()}
+
+def chart_payload(symbol, timestamps, quote, interval):
+    return {"chart": {"result": [{
+        "meta": {"symbol": symbol, "dataGranularity": interval},
+        "timestamp": timestamps,
+        "indicators": {"quote": [quote]},
+    }], "error": None}}
+
+class MockYahooHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        config = self.config
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        roll, gauss = config.roll()
+        delay = max(config.latency_ms + config.jitter_ms * gauss, 0) / 1000
+        if delay:
+            time.sleep(delay)
+        if roll < config.error_rate:
+            config.count("errors")
+            status = 429 if roll < config.error_rate / 2 else 503
+            self._send(status, {"finance": {"error": {"code": "Too Many Requests"}}}, {"Retry-After": "0"})
+            return
+
+        if url.path.startswith("/v8/finance/chart/"):
+            config.count("chart")
+            symbol = url.path.rsplit("/", 1)[1]
+            if is_missing(symbol, config.missing_rate):
+                config.count("missing")
+                self._send(404, {"chart": {"result": None, "error": {"code": "Not Found"}}})
+                return
+            interval = params.get("interval", "1d")
+            timestamps, quote = get_bars(config, symbol, params)
+            self._send(200, chart_payload(symbol, timestamps, quote, interval))
+        elif url.path == "/v7/finance/spark":
+            config.count("spark")
+            interval = params.get("interval", "1d")
+            results = []
+            for symbol in params.get("symbols", "").split(","):
+                if not symbol or is_missing(symbol, config.missing_rate):
+                    continue
+                timestamps, quote = get_bars(config, symbol, {"range": params.get("range", "5d"), "interval": interval})
+                results.append({"symbol": symbol, "response": [chart_payload(symbol, timestamps, {"close": quote["close"]}, interval)["chart"]["result"][0]]})
+            self._send(200, {"spark": {"result": results, "error": None}})
+        else:
+            self._send(404, {"error": "unknown path"})
+
+def start_server(config, host="127.0.0.1", port=0):
+    # 在背景執行緒啟動，回傳 (server, base_url)；port=0 由系統挑空閒埠
+    handler = type("Handler", (MockYahooHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-yahoo", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def record(symbols, fixture_dir=FIXTURE_DIR, range_str="2y"):
+    # 從真正的 Yahoo 錄製日線回應作為回放用的錄製檔
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import yahoo_client
+    os.makedirs(fixture_dir, exist_ok=True)
+    for symbol in symbols:
+        data = yahoo_client.get_json(f"/v8/finance/chart/{symbol}", params={"range": range_str, "interval": "1d"})
+        with open(os.path.join(fixture_dir, f"{symbol}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        print(f"✅ {symbol}")
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模擬 Yahoo 伺服器")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="每個請求的延遲 (毫秒)")
+    serve.add_argument("--jitter", type=float, default=0.0, help="延遲的標準差 (毫秒)")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="回 429/503 的機率")
+    serve.add_argument("--missing-rate", type=float, default=0.0, help="永久 404 的代號比例")
+    serve.add_argument("--seed", type=int, default=0)
+    rec = sub.add_parser("record")
+    rec.add_argument("symbols", nargs="+")
+    rec.add_argument("--range", default="2y")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.symbols, range_str=args.range)
+        return
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.missing_rate, args.seed)
+    server, base_url = start_server(config, args.host, args.port)
+    print(f"模擬 Yahoo 伺服器：{base_url} (設定 YAHOO_BASE_URL={base_url} 讓 app 改連這裡)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
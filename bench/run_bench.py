@@ -0,0 +1,286 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ==========================================
+# 離線效能測試：啟動本地模擬 Yahoo 伺服器，在不同觀察清單規模下量測
+#   - 報價批次抓取的吞吐量 (fetch_batch_quotes)
+#   - fetch_stock_data_direct 冷 / 熱延遲
+#   - 首頁 (群組平均)、個股列表與 K 線圖頁的冷 / 熱渲染時間 (Streamlit AppTest 實際執行 app.py)
+#   - 各階段結束時的行程峰值記憶體
+#   - 各頁面模組的 import 時間 (不含 streamlit 本身)，與預算比較
+# 每個規模在獨立子行程、獨立的暫存資料庫中執行；結果存成 JSON，可用 --compare 與其他 commit 比較
+#
+#   python bench/run_bench.py                          (80 / 1000 / 10000 檔)
+#   python bench/run_bench.py --sizes 80 --latency 50 --error-rate 0.02
+#   python bench/run_bench.py --compare bench/results/<舊結果>.json
+# ==========================================
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_SIZES = (80, 1000, 10000)
+GROUP_SIZE = 5
+SAMPLE_SIZE = 100
+# 熱渲染取 RERUNS 次的中位數
+RERUNS = 5
+# 效能預算：各頁面模組的 import 時間 (毫秒，與規模無關)，
+# 以及預設規模 (BUDGET_SIZE 檔) 下的每次 rerun 時間 (毫秒)；超出時在結果中列出
+BUDGET_SIZE = 80
+IMPORT_BUDGET_MS = {"home": 250, "group_detail": 250, "stock_detail": 700}
+RERUN_BUDGET_MS = {"home": 120, "group_detail": 80, "stock_detail": 150}
+
+def peak_rss_mb():
+    # Linux 的 ru_maxrss 單位為 KB，macOS 為 bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else None
+
+def make_symbols(n):
+    # 依序混合上市 / 上櫃 / 美股代號，規模不同時前綴一致，結果可互相比較
+    symbols = []
+    for i in range(n):
+        kind = i % 10
+        if kind < 6:
+            symbols.append(f"{1000 + i:05d}.TW")
+        elif kind < 9:
+            symbols.append(f"{1000 + i:05d}.TWO")
+        else:
+            symbols.append(f"US{i:05d}")
+    return symbols
+
+def setup_watchlist(owner, symbols):
+    # 把預設清單換成 n 檔、每群組 GROUP_SIZE 檔的測試清單
+    import watchlist_store
+    for g in watchlist_store.get_groups(owner):
+        watchlist_store.delete_group(owner, g["id"])
+    conn = watchlist_store.get_conn()
+    with conn:
+        for start in range(0, len(symbols), GROUP_SIZE):
+            group_id = watchlist_store._next_id(conn, "groups")
+            conn.execute("INSERT INTO groups (owner, id, name, note) VALUES (?, ?, ?, '')", (owner, group_id, f"群組 {start // GROUP_SIZE + 1}"))
+            for sym in symbols[start:start + GROUP_SIZE]:
+                stock_id = watchlist_store._next_id(conn, "stocks")
+                conn.execute(
+                    "INSERT INTO stocks (owner, id, symbol, name, group_id, ma_settings, note) VALUES (?, ?, ?, ?, ?, '5,10,20', '')",
+                    (owner, stock_id, sym, sym, group_id),
+                )
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+def bench_pages(owner, symbols, timeout):
+    from streamlit.testing.v1 import AppTest
+    import watchlist_store
+    results = {}
+    stock = watchlist_store.get_stocks_by_symbol(owner, symbols[0])[0]
+
+    # 結果欄位沿用 home_* / chart_*，可與先前的結果比較
+    for page, prefix in (("home", "home"), ("group_detail", "group"), ("stock_detail", "chart")):
+        app = AppTest.from_file(os.path.join(ROOT_DIR, "app.py"), default_timeout=timeout)
+        if page != "home":
+            app.session_state["page"] = page
+            app.session_state["selected_stock"] = stock
+            app.session_state["selected_group"] = watchlist_store.get_group(owner, stock["group_id"])
+        elapsed, _ = timed(app.run)
+        results[f"{prefix}_cold_s"] = round(elapsed, 3)
+        results[f"{prefix}_cold_exceptions"] = len(app.exception)
+        results[f"{prefix}_warm_s"] = round(statistics.median(timed(app.run)[0] for _ in range(RERUNS)), 3)
+        results[f"rss_after_{prefix}_mb"] = peak_rss_mb()
+    return results
+
+def bench_imports(pages=tuple(IMPORT_BUDGET_MS), repeat=5):
+    # 每次在全新的子行程量測：先 import streamlit，再計時 app.py 與該頁面模組帶入的 import
+    results = {}
+    for page in pages:
+        code = (
+            f"import sys, time, importlib; sys.path.insert(0, {ROOT_DIR!r}); import streamlit; "
+            f"t = time.perf_counter(); import metrics, snapshot, views; "
+            f"importlib.import_module(views.PAGES[{page!r}]); print((time.perf_counter() - t) * 1000)"
+        )
+        samples = [float(subprocess.check_output([sys.executable, "-c", code], stderr=subprocess.DEVNULL, text=True))
+                   for _ in range(repeat)]
+        results[page] = round(statistics.median(samples), 1)
+    return results
+
+def check_budgets(report):
+    # 回傳超出預算的項目清單
+    violations = []
+    for page, limit in IMPORT_BUDGET_MS.items():
+        value = report["imports_ms"].get(page)
+        if value is not None and value > limit:
+            violations.append(f"import {page}: {value} ms > {limit} ms")
+    sized = report["sizes"].get(str(BUDGET_SIZE), {})
+    for page, prefix in (("home", "home"), ("group_detail", "group"), ("stock_detail", "chart")):
+        value = sized.get(f"{prefix}_warm_s")
+        if value is not None and value * 1000 > RERUN_BUDGET_MS[page]:
+            violations.append(f"rerun {page} ({BUDGET_SIZE} 檔): {value * 1000:.0f} ms > {RERUN_BUDGET_MS[page]} ms")
+    return violations
+
+def bench_data_layer(symbols):
+    import stock_data
+    results = {}
+
+    # 從清單尾端取樣，K 線圖頁量測用的是第一檔，兩者互不影響冷快取
+    sample = symbols[-min(SAMPLE_SIZE, len(symbols) // 2):]
+    for phase in ("cold", "warm"):
+        latencies = []
+        for sym in sample:
+            started = time.perf_counter()
+            stock_data.fetch_stock_data_direct(sym, range_str="6mo")
+            latencies.append(time.perf_counter() - started)
+        results[f"history_{phase}_p50_ms"] = round(statistics.median(latencies) * 1000, 2)
+        results[f"history_{phase}_p95_ms"] = round(percentile(latencies, 0.95) * 1000, 2)
+    results["rss_after_history_mb"] = peak_rss_mb()
+
+    elapsed, quotes = timed(lambda: stock_data.fetch_batch_quotes(symbols))
+    resolved = sum(1 for price, _ in quotes.values() if price is not None)
+    results["quotes_s"] = round(elapsed, 3)
+    results["quotes_per_s"] = round(len(symbols) / elapsed, 1)
+    results["quotes_resolved"] = resolved
+    results["rss_after_quotes_mb"] = peak_rss_mb()
+    return results
+
+def worker(size, timeout, skip_pages):
+    # 子行程：環境變數 (資料庫路徑、YAHOO_BASE_URL) 已由主行程設定
+    sys.path.insert(0, ROOT_DIR)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    owner = "bench"
+    symbols = make_symbols(size)
+    setup_watchlist(owner, symbols)
+
+    import yahoo_client
+    results = {"symbols": size, "rss_start_mb": peak_rss_mb()}
+    # 資料層先量：頁面執行後背景更新會開始預抓歷史，冷快取就不冷了
+    results.update(bench_data_layer(symbols))
+    if not skip_pages:
+        results.update(bench_pages(owner, symbols, timeout))
+    timings = yahoo_client.get_request_timings()
+    results["requests_recorded"] = len(timings)
+    results["request_p50_ms"] = round(statistics.median(t["elapsed"] for t in timings) * 1000, 2) if timings else None
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(results))
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def run(args):
+    sys.path.insert(0, BENCH_DIR)
+    import mock_yahoo
+    config = mock_yahoo.MockConfig(args.latency, args.jitter, args.error_rate, args.missing_rate, args.seed)
+    server, base_url = mock_yahoo.start_server(config)
+
+    report = {
+        "commit": git_commit(),
+        "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)",
+        "mock": {"latency_ms": args.latency, "jitter_ms": args.jitter, "error_rate": args.error_rate,
+                 "missing_rate": args.missing_rate, "seed": args.seed},
+        "sizes": {},
+    }
+    report["imports_ms"] = bench_imports()
+    print(f"頁面 import 時間 (ms)：{report['imports_ms']}", flush=True)
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix=f"bench-{size}-")
+        env = dict(os.environ)
+        # 所有會留下狀態的路徑都放在這次的暫存目錄：正式執行留下的快照 / 共用快取不會讓「冷」測量變熱；
+        # 指標端點不啟動，避免 worker 搶正式 app 的 port
+        env.update({
+            "YAHOO_BASE_URL": base_url,
+            "BAR_STORE_PATH": os.path.join(workdir, "bars.sqlite3"),
+            "WATCHLIST_DB_PATH": os.path.join(workdir, "watchlist.sqlite3"),
+            "SNAPSHOT_PATH": os.path.join(workdir, "snapshot.npz"),
+            "SHARED_CACHE": "file",
+            "SHARED_CACHE_DIR": os.path.join(workdir, "shared_cache"),
+            "METRICS_PORT": "0",
+            # 頁面以 WATCHLIST_SHARED_OWNER 讀取測試清單 (worker 寫在 owner = "bench" 底下)
+            "WATCHLIST_SHARED_OWNER": "bench",
+        })
+        print(f"▶ {size} 檔 ...", flush=True)
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", str(size), "--timeout", str(args.timeout)]
+        if args.skip_pages:
+            cmd.append("--skip-pages")
+        try:
+            proc = subprocess.run(cmd, env=env, cwd=ROOT_DIR, capture_output=True, text=True)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(proc.stderr[-3000:])
+            report["sizes"][str(size)] = {"error": f"exit {proc.returncode}"}
+            continue
+        report["sizes"][str(size)] = json.loads(lines[-1])
+        print(json.dumps(report["sizes"][str(size)], ensure_ascii=False, indent=2))
+
+    report["mock"]["served"] = dict(config.stats)
+    server.shutdown()
+    report["budget_violations"] = check_budgets(report)
+    for violation in report["budget_violations"]:
+        print(f"⚠️ 超出預算：{violation}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"✅ 結果已存到 {path}")
+    if args.compare:
+        compare(args.compare, report)
+
+def compare(baseline_path, report):
+    # 逐項列出與基準結果的差異 (時間 / 記憶體：負值代表變快 / 變小)
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n比較 {baseline.get('commit')} → {report['commit']}")
+    for page, value in report.get("imports_ms", {}).items():
+        old = baseline.get("imports_ms", {}).get(page)
+        if old:
+            print(f"  import {page:21s} {old:>12} → {value:>12}  ({(value - old) / old * 100:+.1f}%)")
+    for size, current in report["sizes"].items():
+        before = baseline.get("sizes", {}).get(size)
+        if not before:
+            continue
+        print(f"-- {size} 檔")
+        for key, value in current.items():
+            old = before.get(key)
+            if isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+                print(f"  {key:28s} {old:>12} → {value:>12}  ({(value - old) / old * 100:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="離線效能測試")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--latency", type=float, default=20.0, help="模擬伺服器每個請求的延遲 (毫秒)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600.0, help="單一頁面渲染的逾時秒數")
+    parser.add_argument("--skip-pages", action="store_true", help="只量測資料層")
+    parser.add_argument("--output")
+    parser.add_argument("--compare", help="與先前的結果 JSON 比較")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.timeout, args.skip_pages)
+    else:
+        run(args)
+
+if __name__ == "__main__":
+    main()
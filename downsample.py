@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 圖表降採樣：線圖用 LTTB (Largest-Triangle-Three-Buckets) 保留形狀，
+# K 線把相鄰 K 棒合併成 OHLC 區塊；送到瀏覽器的點數固定有上限，與區間長短無關
+# ==========================================
+MAX_CANDLES = 300
+MAX_LINE_POINTS = 600
+
+def _lttb_indices(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # 頭尾固定保留，中間切成 threshold - 2 個區塊，每塊挑與前一點、下一塊平均點構成最大三角形的點
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def lttb(index, values, threshold=MAX_LINE_POINTS):
+    # 回傳 (降採樣後的 index, values)；NaN (例如均線開頭) 不參與挑點
+    values = np.asarray(values, dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) <= threshold:
+        return index[valid], values[valid]
+    x = np.asarray(index.asi8 if isinstance(index, pd.DatetimeIndex) else index, dtype=float)[valid]
+    keep = valid[_lttb_indices(x, values[valid], threshold)]
+    return index[keep], values[keep]
+
+def ohlc_buckets(df, max_bars=MAX_CANDLES):
+    # 每 k 根相鄰 K 棒合併成一根：開盤取第一根、最高 / 最低取極值、收盤取最後一根、成交量加總
+    n = len(df)
+    if n <= max_bars:
+        return df
+    k = -(-n // max_bars)
+    starts = np.arange(0, n, k)
+    ends = np.minimum(starts + k - 1, n - 1)
+    return pd.DataFrame({
+        "Open": df["Open"].to_numpy(dtype=float)[starts],
+        "High": np.fmax.reduceat(df["High"].to_numpy(dtype=float), starts),
+        "Low": np.fmin.reduceat(df["Low"].to_numpy(dtype=float), starts),
+        "Close": df["Close"].to_numpy(dtype=float)[ends],
+        "Volume": np.add.reduceat(np.nan_to_num(df["Volume"].to_numpy(dtype=float)), starts),
+    }, index=df.index[starts])
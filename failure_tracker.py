@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import deque
+
+# ==========================================
+# 失敗追蹤：個股負向快取 (指數退避) + 全域斷路器 (Yahoo 限流時暫停送出請求)
+# ==========================================
+# 個股連續失敗時的封鎖時間：BASE * 2^(n-1)，上限 MAX；查無代號 (404 或查無資料) 從較長的時間起算
+NEGATIVE_TTL_BASE = 60
+NEGATIVE_TTL_PERMANENT_BASE = 30 * 60
+NEGATIVE_TTL_MAX = 6 * 3600
+
+# 斷路器：WINDOW 秒內至少 MIN_REQUESTS 次請求且限流/5xx 比例達 THRESHOLD 即跳脫
+BREAKER_WINDOW = 30
+BREAKER_MIN_REQUESTS = 5
+BREAKER_THRESHOLD = 0.5
+BREAKER_COOLDOWN = 30
+BREAKER_COOLDOWN_MAX = 10 * 60
+
+_lock = threading.Lock()
+_symbols = {}    # symbol -> {"failures", "blocked_until", "last_error", "permanent"}
+
+class CircuitBreaker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = deque()    # (時間, 是否為限流/5xx)
+        self._open_until = 0.0
+        self._trips = 0
+        self._probing = False
+
+    def _prune(self, now):
+        while self._results and self._results[0][0] < now - BREAKER_WINDOW:
+            self._results.popleft()
+
+    def allow(self):
+        # 關閉：放行；跳脫冷卻中：擋下；冷卻結束 (半開)：只放行一個試探請求
+        with self._lock:
+            now = time.time()
+            if now < self._open_until:
+                return False
+            if self._trips and self._open_until:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def is_open(self):
+        # 只查詢是否在冷卻中，不佔用半開狀態的試探名額
+        with self._lock:
+            return time.time() < self._open_until
+
+    def record(self, throttled):
+        with self._lock:
+            now = time.time()
+            if self._probing:
+                self._probing = False
+                if throttled:
+                    self._trip(now)
+                else:
+                    self._trips = 0
+                    self._open_until = 0.0
+                    self._results.clear()
+                return
+
+            self._results.append((now, throttled))
+            self._prune(now)
+            bad = sum(1 for _, t in self._results if t)
+            if len(self._results) >= BREAKER_MIN_REQUESTS and bad / len(self._results) >= BREAKER_THRESHOLD:
+                self._trip(now)
+
+    def _trip(self, now):
+        self._trips += 1
+        cooldown = min(BREAKER_COOLDOWN * (2 ** (self._trips - 1)), BREAKER_COOLDOWN_MAX)
+        self._open_until = now + cooldown
+        self._results.clear()
+        print(f"⚠️ Yahoo 限流，斷路器跳脫 {cooldown} 秒")
+
+    def state(self):
+        with self._lock:
+            now = time.time()
+            if now < self._open_until:
+                return {"state": "open", "retry_in": self._open_until - now, "trips": self._trips}
+            if self._trips and self._open_until:
+                return {"state": "half_open", "retry_in": 0, "trips": self._trips}
+            return {"state": "closed", "retry_in": 0, "trips": 0}
+
+breaker = CircuitBreaker()
+
+def record_failure(symbol, error, permanent=False):
+    with _lock:
+        entry = _symbols.setdefault(symbol, {"failures": 0, "blocked_until": 0.0, "last_error": "", "permanent": False})
+        entry["failures"] += 1
+        entry["permanent"] = permanent
+        entry["last_error"] = str(error)
+        base = NEGATIVE_TTL_PERMANENT_BASE if permanent else NEGATIVE_TTL_BASE
+        entry["blocked_until"] = time.time() + min(base * (2 ** (entry["failures"] - 1)), NEGATIVE_TTL_MAX)
+
+def record_success(symbol):
+    with _lock:
+        _symbols.pop(symbol, None)
+
+def is_blocked(symbol):
+    with _lock:
+        entry = _symbols.get(symbol)
+        return entry is not None and time.time() < entry["blocked_until"]
+
+def get_failure(symbol):
+    # 回傳 {"failures", "retry_in", "last_error", "permanent"}，沒有失敗紀錄時回傳 None
+    with _lock:
+        entry = _symbols.get(symbol)
+        if entry is None:
+            return None
+        return {
+            "failures": entry["failures"],
+            "retry_in": max(entry["blocked_until"] - time.time(), 0),
+            "last_error": entry["last_error"],
+            "permanent": entry["permanent"],
+        }
@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import metrics
+import yahoo_client
+
+# ==========================================
+# 全行程共用的抓取排程器：所有 session 共用同一組執行緒，
+# 相同的請求在執行中時直接共用結果 (coalescing)，並限制對 Yahoo 的總併發數
+# ==========================================
+class FetchScheduler:
+    def __init__(self, max_workers):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yahoo-fetch")
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {"submitted": 0, "coalesced": 0, "queued": 0, "running": 0}
+
+    def _release(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _run(self, queued_at, fn, *args):
+        # 記錄排隊等待時間與執行中工作數 (submit 時已計入 queued)
+        metrics.observe("fetch_scheduler_wait_seconds", time.perf_counter() - queued_at)
+        with self._lock:
+            self.stats["queued"] -= 1
+            self.stats["running"] += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.stats["running"] -= 1
+
+    def submit(self, key, fn, *args):
+        # 同一個 key 已在執行中就回傳同一個 Future，不重複打 API
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future
+            future = self._executor.submit(self._run, time.perf_counter(), fn, *args)
+            self._inflight[key] = future
+            self.stats["submitted"] += 1
+            self.stats["queued"] += 1
+        future.add_done_callback(lambda f: self._release(key, f))
+        return future
+
+    def fetch_many(self, kind, symbols, batch_fn, batch_size):
+        # 多檔批次查詢：先去重，已在途的個股共用既有 Future，
+        # 其餘個股每 batch_size 檔合成一次 batch_fn(chunk) 呼叫 (回傳 {symbol: 結果})
+        futures = {}
+        pending = []
+        with self._lock:
+            for sym in dict.fromkeys(symbols):
+                key = f"{kind}:{sym}"
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.stats["coalesced"] += 1
+                else:
+                    future = Future()
+                    self._inflight[key] = future
+                    pending.append(sym)
+                futures[sym] = future
+
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i:i + batch_size]
+            with self._lock:
+                self.stats["submitted"] += 1
+                self.stats["queued"] += 1
+            self._executor.submit(self._run, time.perf_counter(), self._run_batch, kind, chunk, [futures[sym] for sym in chunk], batch_fn)
+        return futures
+
+    def _run_batch(self, kind, chunk, chunk_futures, batch_fn):
+        try:
+            results = batch_fn(chunk)
+        except Exception as e:
+            for sym, future in zip(chunk, chunk_futures):
+                future.set_exception(e)
+                self._release(f"{kind}:{sym}", future)
+            return
+
+        for sym, future in zip(chunk, chunk_futures):
+            future.set_result(results.get(sym))
+            self._release(f"{kind}:{sym}", future)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    # Streamlit 每次 rerun 都重新執行 app.py，排程器放在模組層級才能跨 rerun / session 存活
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = FetchScheduler(max_workers=yahoo_client.MAX_WORKERS)
+                metrics.gauge("fetch_scheduler_queued", lambda: _scheduler.stats["queued"])
+                metrics.gauge("fetch_scheduler_running", lambda: _scheduler.stats["running"])
+                metrics.gauge("fetch_scheduler_inflight_keys", lambda: len(_scheduler._inflight))
+    return _scheduler
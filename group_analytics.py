@@ -0,0 +1,118 @@
+import numpy as np
+
+import lru
+import panel
+
+# ==========================================
+# 群組分析：群組內相關係數矩陣、等權重群組指數、各股相對強弱
+# 以對齊後的報酬率面板向量化計算，結果依群組快取到有新 K 棒為止
+# ==========================================
+CORR_WINDOWS = (60, 120, 250)
+RS_WINDOWS = (20, 60)
+CACHE_SIZE = 256
+
+_cache = lru.LRUCache(CACHE_SIZE)    # (symbols, corr_window) -> {"version", "result"}
+
+def _returns(close, traded):
+    # 日報酬率 (T-1, N)；當天沒有交易的格子為 NaN，不以補值後的 0 報酬稀釋相關係數
+    if len(close) < 2:
+        return np.empty((0, close.shape[1]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = close[1:] / close[:-1] - 1
+    returns[~traded[1:]] = np.nan
+    return returns
+
+def equal_weight_index(returns, base=100.0):
+    # 每天取當日有交易個股的平均報酬，累乘成指數 (起點 = base)
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=1)
+    daily = np.where(count > 0, np.where(valid, returns, 0.0).sum(axis=1) / np.maximum(count, 1), 0.0)
+    return base * np.concatenate(([1.0], np.cumprod(1 + daily))), daily
+
+def correlation_matrix(returns, min_periods=20):
+    # 兩兩以「雙方都有報酬」的日子計算皮爾森相關係數，全部以矩陣乘法一次算出
+    valid = (~np.isnan(returns)).astype(float)
+    x = np.where(valid > 0, returns, 0.0)
+    n = valid.T @ valid
+    sum_x = x.T @ valid            # [i, j]：i 在雙方都有資料的日子的報酬總和
+    sum_xx = (x * x).T @ valid
+    sum_xy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_i = sum_xx - sum_x * sum_x / n
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr[n < min_periods] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def _window_return(levels, n):
+    # 最近 n 個交易日的累積報酬 (%)
+    if len(levels) <= n:
+        return np.full(levels.shape[1:], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (levels[-1] / levels[-1 - n] - 1) * 100
+
+def _insufficient(price_panel):
+    # 空群組或歷史不到兩個交易日：沒有報酬可算，頁面顯示「歷史資料不足」
+    empty = np.array([])
+    return {
+        "days": price_panel["days"],
+        "symbols": [],
+        "index": empty,
+        "index_daily": empty,
+        "rs_line": np.empty((len(price_panel["days"]), 0)),
+        "relative_strength": {n: {"return": empty, "rs": empty, "index_return": np.nan} for n in RS_WINDOWS},
+        "correlation": np.empty((0, 0)),
+        "corr_days": 0,
+        "missing": price_panel["missing"],
+    }
+
+def _compute(price_panel, corr_window):
+    if len(price_panel["days"]) < 2:
+        return _insufficient(price_panel)
+    # 完全沒有歷史資料的代號不列入
+    keep = np.array([sym not in price_panel["missing"] for sym in price_panel["symbols"]], dtype=bool)
+    close = price_panel["close"][:, keep]
+    returns = _returns(close, price_panel["traded"][:, keep])
+    index_levels, index_daily = equal_weight_index(returns)
+
+    # 相對強弱線：個股累積報酬相對群組指數，每檔從自己第一筆資料起算 (= 100，> 100 代表強於群組)
+    first = np.argmax(~np.isnan(close), axis=0)
+    cols = np.arange(close.shape[1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs_line = (close / close[first, cols]) / (index_levels[:, None] / index_levels[first]) * 100
+    relative_strength = {}
+    for n in RS_WINDOWS:
+        stock_return = _window_return(close, n)
+        index_return = _window_return(index_levels[:, None], n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            relative_strength[n] = {
+                "return": stock_return,
+                "rs": (1 + stock_return / 100) / (1 + index_return / 100) * 100,
+                "index_return": float(index_return[0]),
+            }
+
+    recent = returns[-corr_window:]
+    return {
+        "days": price_panel["days"],
+        "symbols": [sym for sym, k in zip(price_panel["symbols"], keep) if k],
+        "index": index_levels,
+        "index_daily": index_daily,
+        "rs_line": rs_line,
+        "relative_strength": relative_strength,
+        "correlation": correlation_matrix(recent),
+        "corr_days": len(recent),
+        "missing": price_panel["missing"],
+    }
+
+def analyze_group(symbols, corr_window=CORR_WINDOWS[0]):
+    # 群組成分與 K 線資料庫版本都沒變時直接回傳上次結果，Streamlit 重跑不必重算
+    symbols = tuple(dict.fromkeys(symbols))
+    price_panel = panel.get_panel(symbols)
+    key = (symbols, corr_window)
+    entry = _cache.get(key)
+    if entry is not None and entry["version"] == price_panel["version"]:
+        return entry["result"]
+
+    result = _compute(price_panel, corr_window)
+    _cache.put(key, {"version": price_panel["version"], "result": result})
+    return result
@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+
+import bar_store
+import lru
+import metrics
+
+# ==========================================
+# 技術指標引擎：一次向量化計算多個指標 (MA / EMA / RSI / MACD / 布林通道 / 均量)
+# 結果依 (symbol, interval, 指標組合) 快取，新 K 棒進來時只補算尾段
+# ==========================================
+INDICATOR_KINDS = ("MACD", "EMA", "RSI", "VMA", "MA", "BB")
+DEFAULT_PARAMS = {"MA": (20,), "EMA": (12,), "RSI": (14,), "MACD": (12, 26, 9), "BB": (20, 2), "VMA": (5,)}
+CACHE_SIZE = 1024
+
+_cache = lru.LRUCache(CACHE_SIZE)    # (symbol, interval, spec) -> 快取項目
+
+def parse_spec(text):
+    # "MA5,EMA12,RSI14,MACD12/26/9,BB20/2,VMA5" -> (("MA", 5), ("EMA", 12), ...)；無法解析的項目略過
+    spec = []
+    for token in text.split(","):
+        token = token.strip().upper()
+        kind = next((k for k in INDICATOR_KINDS if token.startswith(k)), None)
+        if kind is None:
+            continue
+        rest = token[len(kind):]
+        try:
+            params = tuple(float(p) if "." in p else int(p) for p in rest.split("/")) if rest else DEFAULT_PARAMS[kind]
+        except ValueError:
+            continue
+        if len(params) != len(DEFAULT_PARAMS[kind]) or min(params) <= 0:
+            continue
+        spec.append((kind,) + params)
+    return tuple(dict.fromkeys(spec))
+
+def ma_spec(ma_settings):
+    # 個股的 ma_settings ("5,10,20") 轉成指標組合
+    return tuple(dict.fromkeys(("MA", int(x.strip())) for x in ma_settings.split(",") if x.strip().isdigit() and int(x.strip()) > 0))
+
+def output_names(item):
+    kind, params = item[0], item[1:]
+    tag = "/".join(f"{p:g}" for p in params)
+    if kind == "MACD":
+        return [f"MACD{tag}", f"MACD{tag}_signal", f"MACD{tag}_hist"]
+    if kind == "BB":
+        return [f"BB{tag}_mid", f"BB{tag}_upper", f"BB{tag}_lower"]
+    return [f"{kind}{tag}"]
+
+# --- 基礎運算：完整計算用向量化，尾段補算用遞迴 ---
+def _rolling_mean(x, n):
+    out = np.full(len(x), np.nan)
+    if n <= len(x):
+        csum = np.concatenate(([0.0], np.cumsum(x)))
+        out[n - 1:] = (csum[n:] - csum[:-n]) / n
+    return out
+
+def _rolling_std(x, n):
+    # 母體標準差 (ddof=0)，以平方和的累積和一次算出
+    out = np.full(len(x), np.nan)
+    if n <= len(x):
+        csum = np.concatenate(([0.0], np.cumsum(x)))
+        csq = np.concatenate(([0.0], np.cumsum(x * x)))
+        mean = (csum[n:] - csum[:-n]) / n
+        out[n - 1:] = np.sqrt(np.maximum((csq[n:] - csq[:-n]) / n - mean * mean, 0.0))
+    return out
+
+def _ema(x, alpha):
+    # 與 pandas ewm(adjust=False) 相同：y0 = x0，y_t = a * x_t + (1 - a) * y_{t-1} (忽略開頭的 NaN)
+    return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+def _ema_tail(x, alpha, prev, k):
+    out = np.empty(len(x) - k)
+    last = prev[k - 1]
+    for i in range(k, len(x)):
+        last = x[i] if np.isnan(last) else alpha * x[i] + (1 - alpha) * last
+        out[i - k] = last
+    return out
+
+def _tail_window(x, n, k, fn):
+    # 只重算 k 之後的滾動視窗值
+    start = max(k - n + 1, 0)
+    return fn(x[start:], n)[k - start:]
+
+def _compute_item(item, close, volume, k, prev):
+    # prev 為上次的完整結果 (含內部中間值)，k 為第一個需要重算的位置；k == 0 時完整計算
+    kind, params = item[0], item[1:]
+    names = output_names(item)
+    out = {}
+
+    def extend(name, tail):
+        out[name] = tail if k == 0 else np.concatenate((prev[name][:k], tail))
+
+    if kind in ("MA", "VMA"):
+        x = close if kind == "MA" else volume
+        n = int(params[0])
+        extend(names[0], _rolling_mean(x, n) if k == 0 else _tail_window(x, n, k, _rolling_mean))
+
+    elif kind == "EMA":
+        alpha = 2.0 / (params[0] + 1)
+        extend(names[0], _ema(close, alpha) if k == 0 else _ema_tail(close, alpha, prev[names[0]], k))
+
+    elif kind == "BB":
+        n, width = int(params[0]), params[1]
+        if k == 0:
+            mid, std = _rolling_mean(close, n), _rolling_std(close, n)
+        else:
+            mid = _tail_window(close, n, k, _rolling_mean)
+            std = _tail_window(close, n, k, _rolling_std)
+        extend(names[0], mid)
+        extend(names[1], mid + width * std)
+        extend(names[2], mid - width * std)
+
+    elif kind == "RSI":
+        # Wilder 平滑：平均漲幅 / 跌幅以 alpha = 1/n 的 EMA 計算
+        alpha = 1.0 / params[0]
+        diff = np.diff(close, prepend=np.nan)
+        gain, loss = np.where(diff > 0, diff, 0.0), np.where(diff < 0, -diff, 0.0)
+        gain[0] = loss[0] = np.nan
+        gain_key, loss_key = f"_{names[0]}_gain", f"_{names[0]}_loss"
+        if k == 0:
+            avg_gain, avg_loss = _ema(gain, alpha), _ema(loss, alpha)
+        else:
+            avg_gain = _ema_tail(gain, alpha, prev[gain_key], k)
+            avg_loss = _ema_tail(loss, alpha, prev[loss_key], k)
+        extend(gain_key, avg_gain)
+        extend(loss_key, avg_loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+        rsi[np.isnan(avg_gain)] = np.nan
+        extend(names[0], rsi)
+
+    elif kind == "MACD":
+        fast, slow, signal = params
+        fast_key, slow_key = f"_{names[0]}_fast", f"_{names[0]}_slow"
+        a_fast, a_slow, a_signal = 2.0 / (fast + 1), 2.0 / (slow + 1), 2.0 / (signal + 1)
+        if k == 0:
+            ema_fast, ema_slow = _ema(close, a_fast), _ema(close, a_slow)
+        else:
+            ema_fast = _ema_tail(close, a_fast, prev[fast_key], k)
+            ema_slow = _ema_tail(close, a_slow, prev[slow_key], k)
+        extend(fast_key, ema_fast)
+        extend(slow_key, ema_slow)
+        extend(names[0], ema_fast - ema_slow)
+        macd = out[names[0]]
+        extend(names[1], _ema(macd, a_signal) if k == 0 else _ema_tail(macd, a_signal, prev[names[1]], k))
+        extend(names[2], macd[k:] - out[names[1]][k:])
+
+    return out
+
+def compute_arrays(close, volume, spec, k=0, prev=None):
+    # 不經快取，直接對收盤價 / 成交量陣列計算整組指標 (回傳含內部中間值的 dict)
+    close = np.asarray(close, dtype=float)
+    volume = np.nan_to_num(np.asarray(volume, dtype=float))
+    results = {}
+    for item in spec:
+        results.update(_compute_item(item, close, volume, k, prev))
+    return results
+
+def _public(results):
+    return {name: values for name, values in results.items() if not name.startswith("_")}
+
+def _load_series(symbol, interval, start_ts=None):
+    timestamps, quote = bar_store.load_bars(symbol, interval, start_ts)
+    volume = [v if v is not None else 0.0 for v in quote["volume"]]
+    return np.asarray(timestamps, dtype=np.int64), np.asarray(quote["close"], dtype=float), np.asarray(volume, dtype=float)
+
+def compute_indicators(symbol, spec, interval="1d"):
+    # 回傳 (timestamps, {指標名稱: 陣列})，以本地 K 線資料庫的完整歷史計算
+    key = (symbol, interval, spec)
+    version = bar_store.get_version(symbol, interval)
+    entry = _cache.get(key)
+    if entry is not None and entry["version"] == version:
+        metrics.inc("cache_requests_total", cache="indicators", result="hit")
+        return entry["ts"], _public(entry["results"])
+
+    k = 0
+    prev = None
+    if entry is not None and len(entry["ts"]) >= 2:
+        # 只讀回倒數第二根之後的 K 棒，找出第一個變動的位置後補算尾段
+        old_ts, old_close, old_volume = entry["ts"], entry["close"], entry["volume"]
+        tail_ts, tail_close, tail_volume = _load_series(symbol, interval, old_ts[-2])
+        base = len(old_ts) - 2
+        if len(tail_ts) >= 1 and tail_ts[0] == old_ts[base]:
+            ts = np.concatenate((old_ts[:base], tail_ts))
+            close = np.concatenate((old_close[:base], tail_close))
+            volume = np.concatenate((old_volume[:base], tail_volume))
+            k = base
+            overlap = min(len(old_ts), len(ts))
+            while (k < overlap and ts[k] == old_ts[k] and close[k] == old_close[k]
+                   and volume[k] == old_volume[k]):
+                k += 1
+            prev = entry["results"]
+        else:
+            ts, close, volume = _load_series(symbol, interval)
+    else:
+        ts, close, volume = _load_series(symbol, interval)
+
+    metrics.inc("cache_requests_total", cache="indicators", result="incremental" if prev is not None else "miss")
+    if k >= len(ts) and prev is not None:
+        results = {name: values[:len(ts)] for name, values in prev.items()}
+    elif k < 2:
+        results = compute_arrays(close, volume, spec)
+    else:
+        results = compute_arrays(close, volume, spec, k, prev)
+
+    _cache.put(key, {"version": version, "ts": ts, "close": close, "volume": volume, "results": results})
+    return ts, _public(results)
+
+def compute_for_frame(df, spec):
+    # 週 K / 月 K 等本地重新取樣的序列不在 K 線資料庫裡，直接對 DataFrame 計算 (不快取)
+    return _public(compute_arrays(df['Close'].to_numpy(), df['Volume'].to_numpy(), spec))
+
+def align_to_index(ts, results, index):
+    # 把指標結果對齊到圖表 DataFrame 的 DatetimeIndex (找不到對應 K 棒的位置為 NaN)
+    target = np.asarray(index.tz_convert("UTC").tz_localize(None), dtype="datetime64[s]").astype(np.int64)
+    pos = np.clip(np.searchsorted(ts, target), 0, max(len(ts) - 1, 0))
+    found = (ts[pos] == target) if len(ts) else np.zeros(len(target), dtype=bool)
+    aligned = {}
+    for name, values in results.items():
+        out = np.full(len(target), np.nan)
+        out[found] = values[pos[found]]
+        aligned[name] = out
+    return aligned
@@ -0,0 +1,35 @@
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# 行程內的 LRU 快取 (指標 / 面板 / 群組分析 / 回測共用)：
+# 只管容量與最近使用順序，項目是否過期 (K 線資料庫版本號) 由呼叫端比對
+# ==========================================
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        # 回傳項目 (沒有時為 None)，並標記為最近使用
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
@@ -0,0 +1,132 @@
+import datetime
+import json
+import os
+import threading
+import time
+from zoneinfo import ZoneInfo
+
+# ==========================================
+# 交易時段感知的快取到期策略：
+# 盤中用短 TTL，收盤 (含結算緩衝) 後資料保留到下一個開盤時間
+# ==========================================
+CALENDAR_PATH = os.environ.get(
+    "MARKET_CALENDAR_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "market_calendar.json"),
+)
+
+# 盤中 TTL (秒)，依 K 線週期；未列出的週期使用 DEFAULT_SESSION_TTL
+SESSION_TTL = {"1m": 30, "2m": 30, "5m": 60, "15m": 60}
+DEFAULT_SESSION_TTL = 60
+# 收盤後仍維持短 TTL 的緩衝時間，讓最終收盤價能被抓到
+POST_CLOSE_GRACE = 30 * 60
+# 找不到下一個交易日時的保險上限
+MAX_HOLD = 7 * 86400
+# 日曆檔 mtime 最多每幾秒檢查一次 (每個報價 / 同步都會查日曆，不必每次 stat)
+RELOAD_CHECK_INTERVAL = 5
+
+_lock = threading.Lock()
+_loaded = {"mtime": None, "config": None, "calendars": {}, "checked_at": 0.0, "checked_year": None}
+
+class ExchangeCalendar:
+    def __init__(self, name, spec):
+        self.name = name
+        self.tz = ZoneInfo(spec["timezone"])
+        self.open_time = datetime.time.fromisoformat(spec["open"])
+        self.close_time = datetime.time.fromisoformat(spec["close"])
+        self.weekdays = set(spec.get("weekdays", [0, 1, 2, 3, 4]))
+        self.holidays = {datetime.date.fromisoformat(d) for d in spec.get("holidays", [])}
+
+    def is_trading_day(self, day):
+        return day.weekday() in self.weekdays and day not in self.holidays
+
+    def session_bounds(self, day):
+        opened = datetime.datetime.combine(day, self.open_time, tzinfo=self.tz)
+        closed = datetime.datetime.combine(day, self.close_time, tzinfo=self.tz)
+        return opened, closed
+
+    def is_active(self, ts, grace=POST_CLOSE_GRACE):
+        # 盤中或收盤後緩衝時間內
+        local = datetime.datetime.fromtimestamp(ts, self.tz)
+        if not self.is_trading_day(local.date()):
+            return False
+        opened, closed = self.session_bounds(local.date())
+        return opened <= local <= closed + datetime.timedelta(seconds=grace)
+
+    def next_open(self, ts):
+        # ts 之後最近的一次開盤時間 (timestamp)
+        local = datetime.datetime.fromtimestamp(ts, self.tz)
+        day = local.date()
+        for _ in range(MAX_HOLD // 86400 + 1):
+            if self.is_trading_day(day):
+                opened, _ = self.session_bounds(day)
+                if opened > local:
+                    return opened.timestamp()
+            day += datetime.timedelta(days=1)
+        return ts + MAX_HOLD
+
+def _check_years(calendars, year):
+    # 休市日沒有列到今年的日曆會把國定假日當成交易日 (盤中 TTL、不必要的 API 查詢)，提醒更新日曆檔
+    for name, calendar in calendars.items():
+        if not any(day.year == year for day in calendar.holidays):
+            print(f"⚠️ 交易日曆 {name} 沒有 {year} 年的休市日，請更新 {CALENDAR_PATH}")
+
+def _load():
+    # 日曆檔更新後 (mtime 變動) 自動重新載入；mtime 每 RELOAD_CHECK_INTERVAL 秒才檢查一次
+    with _lock:
+        now = time.monotonic()
+        if _loaded["config"] is not None and now - _loaded["checked_at"] < RELOAD_CHECK_INTERVAL:
+            return _loaded["config"], _loaded["calendars"]
+        _loaded["checked_at"] = now
+        try:
+            mtime = os.path.getmtime(CALENDAR_PATH)
+        except OSError:
+            mtime = None
+
+        year = datetime.date.today().year
+        if _loaded["config"] is None or _loaded["mtime"] != mtime:
+            config = {"suffixes": {}, "default": None, "calendars": {}}
+            if mtime is not None:
+                try:
+                    with open(CALENDAR_PATH, encoding="utf-8") as f:
+                        config = json.load(f)
+                except Exception as e:
+                    print(f"❌ 交易日曆讀取失敗: {e}")
+            calendars = {name: ExchangeCalendar(name, spec) for name, spec in config.get("calendars", {}).items()}
+            _loaded.update(mtime=mtime, config=config, calendars=calendars, checked_year=None)
+        if _loaded["checked_year"] != year:
+            _check_years(_loaded["calendars"], year)
+            _loaded["checked_year"] = year
+        return _loaded["config"], _loaded["calendars"]
+
+def get_calendar(symbol):
+    # 依代號後綴找交易所日曆 (長後綴優先，.TWO 先於 .TW)；沒有對應日曆時回傳 None
+    config, calendars = _load()
+    suffixes = config.get("suffixes", {})
+    for suffix in sorted(suffixes, key=len, reverse=True):
+        if symbol.upper().endswith(suffix.upper()):
+            return calendars.get(suffixes[suffix])
+    if "." in symbol:
+        return None
+    return calendars.get(config.get("default"))
+
+def is_session_active(symbol, now=None):
+    # 盤中 (含收盤後緩衝)；沒有對應日曆的代號一律視為交易中
+    calendar = get_calendar(symbol)
+    now = time.time() if now is None else now
+    return calendar is None or calendar.is_active(now)
+
+def session_ttl(interval):
+    return SESSION_TTL.get(interval, DEFAULT_SESSION_TTL)
+
+def expires_at(symbol, fetched_at, interval="1d"):
+    # 盤中抓的資料只保留短 TTL；休市時抓的資料保留到下一次開盤
+    calendar = get_calendar(symbol)
+    if calendar is None or calendar.is_active(fetched_at):
+        return fetched_at + session_ttl(interval)
+    return calendar.next_open(fetched_at)
+
+def is_fresh(symbol, fetched_at, interval="1d", now=None):
+    if fetched_at is None:
+        return False
+    now = time.time() if now is None else now
+    return now < expires_at(symbol, fetched_at, interval)
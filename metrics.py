@@ -0,0 +1,212 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==========================================
+# 效能指標：行程內的計數器 / 直方圖 / 即時量測值，
+# 供隱藏的診斷頁 (?page=diagnostics) 與 Prometheus 文字格式端點 (/metrics) 使用
+# 標籤只用低基數的值 (端點、狀態、週期、頁面)，不以個股代號當標籤
+#
+# 指標存在各行程內，不跨行程彙總：同一台主機跑多個 worker (見 shared_cache.py) 時每個 worker 各開一個端點
+#   METRICS_WORKER_INDEX=0,1,2...  (建議) 部署時逐一指定，worker i 固定使用 METRICS_PORT + i
+#   未指定時從 METRICS_PORT 起往後找第一個可用的 port (最多 METRICS_PORT_SPAN 個)，啟動順序決定 port
+# Prometheus 的抓取目標列出 METRICS_PORT ~ METRICS_PORT + worker 數 - 1，查詢時以 sum() 彙總
+# 端點預設只綁 127.0.0.1；Prometheus 在其他主機時才把 METRICS_HOST 設為對外的介面
+# ==========================================
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.environ.get("METRICS_PORT", "9108")
+METRICS_WORKER_INDEX = os.environ.get("METRICS_WORKER_INDEX", "")
+METRICS_PORT_SPAN = 16
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "yahoo_requests_total": "Yahoo API 請求數 (依端點與 HTTP 狀態；status=error 為連線 / 傳輸錯誤，invalid_json 為回應格式錯誤，circuit_open 為斷路器擋下)",
+    "yahoo_request_seconds": "Yahoo API 請求耗時 (含重試)",
+    "yahoo_retries_total": "Yahoo API 因 429 / 5xx / 連線錯誤而重試的次數",
+    "symbol_fetch_seconds": "單一代號同步 K 線的耗時",
+    "bar_sync_total": "K 線同步方式 (fresh 未打 API / full / backfill / delta / blocked / busy 其他 worker 同步中 / error)",
+    "cache_requests_total": "快取查詢結果 (quote / history / indicators；共用快取另有 stale 先用舊值、wait 等其他 worker 寫入)",
+    "page_render_seconds": "頁面腳本執行時間",
+    "fetch_scheduler_wait_seconds": "工作在排程器佇列中等待執行緒的時間",
+    "fetch_scheduler_queued": "排程器中等待執行的工作數",
+    "fetch_scheduler_running": "排程器中執行中的工作數",
+    "fetch_scheduler_inflight_keys": "排程器中可共用結果的在途請求數",
+    "yahoo_breaker_open": "斷路器是否跳脫 (1 = 暫停查詢)",
+    "snapshot_seeded_total": "啟動時從收盤快照填入的報價 / K 線檔數",
+    "quote_refresher_watched": "背景報價更新登記的代號數",
+    "backtest_seconds": "均線回測耗時 (scope=symbol 單檔 / group 整個群組)",
+    "symbol_lookup_total": "代號資料查詢數 (source=cache 快取 / fetch 向 Yahoo 查詢；其中 error 查詢失敗、blocked 斷路器擋下)",
+    "symbol_resolve_total": "代號驗證結果 (ok / resolved 改用其他後綴 / invalid / error)",
+}
+
+_lock = threading.Lock()
+_counters = {}      # (name, labels) -> 數值
+_histograms = {}    # (name, labels) -> {"counts", "sum", "count"}
+_gauges = {}        # name -> 回傳數值的函式
+_started_at = time.time()
+_server = None
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": buckets, "counts": [0] * (len(buckets) + 1), "sum": 0.0, "count": 0}
+        hist["counts"][bisect.bisect_left(hist["buckets"], value)] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+@contextmanager
+def timer(name, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+def gauge(name, fn):
+    # 即時量測值在讀取時才呼叫 fn() 取得，不必在各處同步更新
+    with _lock:
+        _gauges[name] = fn
+
+def uptime():
+    return time.time() - _started_at
+
+# --- 讀取 (診斷頁) ---
+def counter_values(name):
+    with _lock:
+        return {labels: value for (n, labels), value in _counters.items() if n == name}
+
+def _quantile(hist, q):
+    # 依累積分桶線性內插估計分位數
+    target = q * hist["count"]
+    seen = 0
+    lower = 0.0
+    for upper, count in zip(list(hist["buckets"]) + [float("inf")], hist["counts"]):
+        if count and seen + count >= target:
+            if upper == float("inf"):
+                return lower
+            return lower + (upper - lower) * (target - seen) / count
+        seen += count
+        lower = upper if upper != float("inf") else lower
+    return lower
+
+def histogram_summary(name):
+    # {labels: {"count", "avg", "p50", "p95"}}
+    with _lock:
+        items = [(labels, dict(hist, counts=list(hist["counts"]))) for (n, labels), hist in _histograms.items() if n == name]
+    return {
+        labels: {
+            "count": hist["count"],
+            "avg": hist["sum"] / hist["count"] if hist["count"] else 0.0,
+            "p50": _quantile(hist, 0.5),
+            "p95": _quantile(hist, 0.95),
+        }
+        for labels, hist in items
+    }
+
+def gauge_values():
+    with _lock:
+        gauges = dict(_gauges)
+    values = {}
+    for name, fn in gauges.items():
+        try:
+            values[name] = float(fn())
+        except Exception:
+            values[name] = float("nan")
+    return values
+
+# --- Prometheus 文字格式 ---
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def render_prometheus():
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, dict(hist, counts=list(hist["counts"]))) for key, hist in _histograms.items())
+    lines = []
+    described = set()
+
+    def header(name, kind):
+        if name not in described:
+            described.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    for (name, labels), hist in histograms:
+        header(name, "histogram")
+        cumulative = 0
+        for upper, count in zip(hist["buckets"], hist["counts"]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', f'{upper:g}')])} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    for name, value in sorted(gauge_values().items()):
+        header(name, "gauge")
+        lines.append(f"{name} {value}")
+    header("process_uptime_seconds", "gauge")
+    lines.append(f"process_uptime_seconds {uptime()}")
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def _candidate_ports(port):
+    port = int(port)
+    if METRICS_WORKER_INDEX:
+        return [port + int(METRICS_WORKER_INDEX)]
+    return list(range(port, port + METRICS_PORT_SPAN))
+
+def start_http_server(port=None):
+    # 在背景執行緒提供 /metrics；METRICS_PORT 設為空字串或 0 時不啟動，重複呼叫只會啟動一次
+    global _server
+    port = METRICS_PORT if port is None else port
+    with _lock:
+        if _server is not None or not port or int(port) == 0:
+            return _server
+        error = None
+        for candidate in _candidate_ports(port):
+            try:
+                _server = ThreadingHTTPServer((METRICS_HOST, candidate), _MetricsHandler)
+                break
+            except OSError as e:
+                error = e
+        else:
+            print(f"⚠️ 指標端點無法啟動 ({METRICS_HOST}:{port}): {error}")
+            _server = False
+            return None
+        _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+import bar_store
+import lru
+import market_calendar
+
+# ==========================================
+# 橫斷面資料面板：把多檔個股的日線依「交易所當地日期」對齊成 日期 × 代號 矩陣，
+# 供選股器與群組分析一次向量化計算；個股序列依 K 線資料庫版本號快取，只重讀有變動的代號
+# ==========================================
+LOOKBACK_DAYS = 260
+SERIES_CACHE_SIZE = 4096
+PANEL_CACHE_SIZE = 64
+
+_series = lru.LRUCache(SERIES_CACHE_SIZE)    # symbol -> {"version", "days", "close", "volume"}
+_panels = lru.LRUCache(PANEL_CACHE_SIZE)     # (symbols, lookback) -> {"versions", "panel"}
+
+def _local_days(symbol, timestamps):
+    # K 棒時間換算成該交易所的當地日期，台股 / 美股的同一交易日才會對在同一列
+    calendar = market_calendar.get_calendar(symbol)
+    tz = calendar.tz if calendar is not None else "UTC"
+    local = pd.to_datetime(np.asarray(timestamps, dtype=np.int64), unit="s", utc=True).tz_convert(tz)
+    return local.tz_localize(None).to_numpy().astype("datetime64[D]")
+
+def _get_series(symbol, version):
+    entry = _series.get(symbol)
+    if entry is not None and entry["version"] == version:
+        return entry
+
+    timestamps, quote = bar_store.load_bars(symbol, "1d")
+    days = _local_days(symbol, timestamps)
+    close = np.asarray(quote["close"], dtype=float)
+    volume = np.array([v if v is not None else np.nan for v in quote["volume"]], dtype=float)
+    # 盤中最後一根 K 棒的時間戳記會變動，同一天若有兩筆只保留最後一筆
+    if len(days):
+        keep = np.append(days[1:] != days[:-1], True)
+        days, close, volume = days[keep], close[keep], volume[keep]
+    entry = {"version": version, "days": days, "close": close, "volume": volume}
+
+    _series.put(symbol, entry)
+    return entry
+
+def _forward_fill(x):
+    # 沿時間軸 (axis 0) 以前值補齊 NaN；開頭尚無資料的部分維持 NaN
+    rows = np.where(np.isnan(x), 0, np.arange(len(x))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return x[rows, np.arange(x.shape[1])]
+
+def _empty_panel(symbols):
+    # 空群組或全部代號都還沒有歷史：0 列的面板，每檔都列為 missing
+    empty = np.empty((0, len(symbols)))
+    return {
+        "days": np.array([], dtype="datetime64[D]"),
+        "symbols": list(symbols),
+        "close": empty,
+        "volume": empty.copy(),
+        "traded": np.zeros((0, len(symbols)), dtype=bool),
+        "last_row": np.full(len(symbols), -1),
+        "missing": list(symbols),
+    }
+
+def _assemble(symbols, series, lookback):
+    present = [sym for sym in symbols if len(series[sym]["days"])]
+    if not present:
+        return _empty_panel(symbols)
+    days = np.unique(np.concatenate([series[sym]["days"] for sym in present]))[-lookback:]
+
+    close = np.full((len(days), len(symbols)), np.nan)
+    volume = np.full((len(days), len(symbols)), np.nan)
+    for j, sym in enumerate(symbols):
+        s_days = series[sym]["days"]
+        if not len(s_days):
+            continue
+        mask = s_days >= days[0]
+        pos = np.searchsorted(days, s_days[mask])
+        close[pos, j] = series[sym]["close"][mask]
+        volume[pos, j] = series[sym]["volume"][mask]
+
+    traded = ~np.isnan(close)
+    # 每檔最後一個有交易的列 (沒有資料的代號為 -1)
+    last_row = np.where(traded.any(axis=0), len(days) - 1 - np.argmax(traded[::-1], axis=0), -1)
+    return {
+        "days": days,
+        "symbols": list(symbols),
+        # 收盤價在休市 / 停牌日沿用前一日，成交量保留 NaN
+        "close": _forward_fill(close),
+        "volume": volume,
+        "traded": traded,
+        "last_row": last_row,
+        "missing": [sym for sym in symbols if not len(series[sym]["days"])],
+    }
+
+def get_panel(symbols, lookback=LOOKBACK_DAYS):
+    # 回傳對齊後的面板 dict：days (T,)、close / volume / traded (T, N)、last_row (N,)、missing、version
+    symbols = tuple(dict.fromkeys(symbols))
+    key = (symbols, lookback)
+    versions = bar_store.get_versions(symbols, "1d")
+    version_key = tuple(versions.get(sym) for sym in symbols)
+    entry = _panels.get(key)
+    if entry is not None and entry["versions"] == version_key:
+        return entry["panel"]
+
+    series = {sym: _get_series(sym, versions.get(sym)) for sym in symbols}
+    result = _assemble(symbols, series, lookback)
+    # 版本號隨面板一起回傳，下游 (群組分析等) 可據此判斷自己的快取是否失效
+    result["version"] = version_key
+
+    _panels.put(key, {"versions": version_key, "panel": result})
+    return result
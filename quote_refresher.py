@@ -0,0 +1,206 @@
+import functools
+import json
+import threading
+import time
+
+import bar_store
+import failure_tracker
+import fetch_scheduler
+import market_calendar
+import metrics
+import shared_cache
+import stock_data
+
+# ==========================================
+# 背景報價更新 (stale-while-revalidate)：
+# 頁面一律立即拿到最後一次的報價 (附上資料年齡)，更新在背景執行緒進行
+# ==========================================
+REFRESH_INTERVAL = 60
+# 冷啟動時 (完全沒有報價) 最多等待首次更新的秒數
+COLD_START_WAIT = 10
+# 多個 worker 共用一份報價 (shared_cache)：同時間只有一個 worker 在更新，
+# 其他 worker 最多等它這麼久，之後併入它寫回的報價，只補抓仍過期的代號
+SHARED_QUOTES_KEY = "quotes"
+QUOTE_LEASE_WAIT = 20
+
+_lock = threading.Lock()
+_refreshed = threading.Condition(_lock)
+_quotes = {}       # symbol -> (最新價, 漲跌幅%, 更新時間)
+_watched = set()
+# 已確認本地有日線歷史的代號：之後的輪次與頁面重跑不必再查 K 線資料庫
+_warmed = set()
+_wake = threading.Event()
+_thread = None
+# 背景更新輪次：已開始 / 已完成的最後一輪編號
+_cycle_started = 0
+_cycle_completed = 0
+
+metrics.gauge("quote_refresher_watched", lambda: len(_watched))
+
+def _ensure_thread():
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_refresh_loop, name="quote-refresher", daemon=True)
+            _thread.start()
+
+def watch(symbols):
+    # 登記需要保持新鮮的代號；出現新代號時立刻喚醒背景更新
+    with _lock:
+        new_symbols = set(symbols) - _watched
+        _watched.update(new_symbols)
+    _ensure_thread()
+    if new_symbols:
+        _wake.set()
+    return new_symbols
+
+def _expired_symbols():
+    # 依交易時段策略判斷哪些報價已過期 (休市期間的報價保留到下次開盤)
+    now = time.time()
+    with _lock:
+        return sorted(
+            sym for sym in _watched
+            if sym not in _quotes or not market_calendar.is_fresh(sym, _quotes[sym][2], "1d", now)
+        )
+
+def _merge_quotes(entries):
+    # 併入 {symbol: (最新價, 漲跌幅%, 更新時間)}，已有較新報價的代號不覆蓋，回傳併入的檔數
+    merged = 0
+    with _lock:
+        for sym, (price, pct, updated_at) in entries.items():
+            if price is not None and (sym not in _quotes or _quotes[sym][2] < updated_at):
+                _quotes[sym] = (price, pct, updated_at)
+                merged += 1
+    return merged
+
+def _merge_shared():
+    # 併入其他 worker 寫回共用快取的報價
+    data, _ = shared_cache.get_backend().get(SHARED_QUOTES_KEY)
+    if data is None:
+        return 0
+    return _merge_quotes({sym: tuple(q) for sym, q in json.loads(data).items()})
+
+def _publish_shared():
+    # 持有租約時才寫回，整份報價 (已含剛併入的其他 worker 結果) 一次寫入
+    with _lock:
+        data = json.dumps({sym: list(q) for sym, q in _quotes.items()})
+    shared_cache.get_backend().put(SHARED_QUOTES_KEY, data.encode())
+
+def refresh_now(symbols=None):
+    # 同步更新 (背景執行緒與批次工具使用)；預設只更新已登記且已過期的代號
+    with shared_cache.lease(SHARED_QUOTES_KEY, wait=QUOTE_LEASE_WAIT) as leader:
+        _merge_shared()
+        if symbols is None:
+            symbols = _expired_symbols()
+        # 斷路器開啟時整輪略過，保留舊報價，等冷卻結束再更新
+        if not symbols or failure_tracker.breaker.state()["state"] == "open":
+            return {}
+
+        quotes = stock_data.fetch_batch_quotes(symbols)
+        now = time.time()
+        # 查詢失敗時保留舊值，不以 None 覆蓋
+        _merge_quotes({sym: (price, pct, now) for sym, (price, pct) in quotes.items()})
+        if leader:
+            _publish_shared()
+    return quotes
+
+def warm_histories():
+    # 本地還沒有日線歷史的代號，交給共用排程器在背景補抓 (只抓一次，之後開 K 線圖不必等)
+    # 已知有歷史的代號記在 _warmed，其餘一次批次查詢，全部都有歷史時不碰資料庫
+    with _lock:
+        symbols = sorted(_watched - _warmed)
+    if not symbols:
+        return
+    covered = bar_store.get_versions(symbols, "1d")
+    with _lock:
+        _warmed.update(covered)
+    scheduler = fetch_scheduler.get_scheduler()
+    for sym in symbols:
+        if sym not in covered and not failure_tracker.is_blocked(sym):
+            scheduler.submit(f"history:{sym}", stock_data.warm_history, sym)
+
+def seed_quotes(quotes, updated_at):
+    # 啟動時以快照報價填入快取 (已有較新報價的代號不覆蓋)，回傳填入的檔數
+    # 更新時間沿用快照時間：休市中仍有效，開盤後即過期，由背景更新換成即時報價
+    return _merge_quotes({sym: (price, pct, updated_at) for sym, (price, pct) in quotes.items()})
+
+def _store_quote(symbol, future):
+    try:
+        price, pct = future.result()
+    except Exception:
+        return
+    if price is not None:
+        with _lock:
+            _quotes[symbol] = (price, pct, time.time())
+
+def fetch_missing(symbols):
+    # 冷啟動用：還沒有報價 (且未在退避期間) 的代號立刻送出查詢，回傳 {symbol: Future}
+    # 頁面可依完成順序逐一填入結果；完成的報價同時寫入快取
+    watch(symbols)
+    with _lock:
+        missing = [sym for sym in dict.fromkeys(symbols) if sym not in _quotes and not failure_tracker.is_blocked(sym)]
+    if missing and _merge_shared():
+        # 其他 worker 已經有的報價直接沿用，只查剩下的代號
+        with _lock:
+            missing = [sym for sym in missing if sym not in _quotes]
+    if not missing or failure_tracker.breaker.state()["state"] == "open":
+        return {}
+
+    futures = stock_data.submit_batch_quotes(missing)
+    for sym, future in futures.items():
+        future.add_done_callback(functools.partial(_store_quote, sym))
+    return futures
+
+def _refresh_loop():
+    global _cycle_started, _cycle_completed
+    while True:
+        _wake.clear()
+        with _lock:
+            _cycle_started += 1
+            cycle = _cycle_started
+        try:
+            refresh_now()
+            if failure_tracker.breaker.state()["state"] != "open":
+                warm_histories()
+            shared_cache.prune()
+        except Exception as e:
+            print(f"❌ 背景報價更新失敗: {e}")
+        with _refreshed:
+            _cycle_completed = cycle
+            _refreshed.notify_all()
+        _wake.wait(REFRESH_INTERVAL)
+
+def get_quotes(symbols, wait_if_cold=True):
+    # 回傳 {symbol: (最新價, 漲跌幅%, 資料年齡秒數)}，沒有資料的代號為 (None, None, None)
+    with _lock:
+        # 登記前記下下一輪的編號：只有在登記之後才開始的那一輪才會包含這些代號
+        target_cycle = _cycle_started + 1
+    new_symbols = watch(symbols)
+    if new_symbols and not all(sym in _quotes for sym in new_symbols):
+        # 新登記的代號先看其他 worker 是否已有報價，有的話不必等首次更新
+        _merge_shared()
+
+    result = {}
+    with _refreshed:
+        if wait_if_cold and new_symbols and not any(sym in _quotes for sym in symbols):
+            _refreshed.wait_for(lambda: _cycle_completed >= target_cycle, COLD_START_WAIT)
+        now = time.time()
+        for sym in symbols:
+            if sym in _quotes:
+                price, pct, updated_at = _quotes[sym]
+                result[sym] = (price, pct, now - updated_at)
+            else:
+                result[sym] = (None, None, None)
+    misses = sum(1 for price, _, _ in result.values() if price is None)
+    metrics.inc("cache_requests_total", len(result) - misses, cache="quote", result="hit")
+    metrics.inc("cache_requests_total", misses, cache="quote", result="miss")
+    return result
+
+def format_age(age):
+    if age is None:
+        return ""
+    if age < 60:
+        return f"{int(age)} 秒前"
+    if age < 3600:
+        return f"{int(age // 60)} 分鐘前"
+    return f"{int(age // 3600)} 小時前"
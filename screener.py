@@ -0,0 +1,168 @@
+import re
+
+import numpy as np
+
+# ==========================================
+# 選股器：在對齊後的 日期 × 代號 面板上，以向量化方式一次評估整份觀察清單
+# 規則範例："CLOSE > MA20 AND VR20 > 2"、"MA5 CROSSUP MA20"、"CLOSE > HIGH60"、"PCT1 >= 3"
+#   CLOSE / VOLUME   收盤價 / 成交量
+#   MA<n> / VMA<n>   n 日均價 / 均量
+#   PCT<n>           n 日漲跌幅 (%)
+#   HIGH<n> / LOW<n> 前 n 日 (不含當日) 最高 / 最低收盤價
+#   VR<n>            當日成交量 ÷ 前 n 日均量
+# ==========================================
+TERM_KINDS = ("CLOSE", "VOLUME", "VMA", "MA", "PCT", "HIGH", "LOW", "VR")
+DEFAULT_WINDOW = {"VMA": 20, "MA": 20, "PCT": 1, "HIGH": 20, "LOW": 20, "VR": 20}
+OPERAND = r"([A-Z]+\d*|-?\d+(?:\.\d+)?)"
+CLAUSE_PATTERN = re.compile(rf"^{OPERAND}\s*(>=|<=|>|<|CROSSUP|CROSSDOWN)\s*{OPERAND}$")
+
+def _parse_operand(token):
+    # 數字回傳 float，指標回傳 (種類, 天數)
+    try:
+        return float(token)
+    except ValueError:
+        pass
+    kind = next((k for k in TERM_KINDS if token.startswith(k)), None)
+    rest = token[len(kind):] if kind else ""
+    if kind is None or (rest and not rest.isdigit()):
+        raise ValueError(f"看不懂的指標：{token}")
+    if kind in ("CLOSE", "VOLUME"):
+        if rest:
+            raise ValueError(f"{kind} 不需要天數：{token}")
+        return (kind, 0)
+    n = int(rest) if rest else DEFAULT_WINDOW[kind]
+    if n <= 0:
+        raise ValueError(f"天數必須大於 0：{token}")
+    return (kind, n)
+
+def parse_rules(text):
+    # 以 AND、逗號或換行分隔多個條件，全部成立才算符合；格式錯誤時丟出 ValueError
+    conditions = []
+    for clause in re.split(r"\bAND\b|,|\n", text.upper()):
+        clause = clause.strip()
+        if not clause:
+            continue
+        match = CLAUSE_PATTERN.match(clause)
+        if match is None:
+            raise ValueError(f"看不懂的條件：{clause}")
+        left, op, right = match.groups()
+        conditions.append((_parse_operand(left), op, _parse_operand(right)))
+    if not conditions:
+        raise ValueError("請輸入至少一個條件")
+    return conditions
+
+def parse_rank(text):
+    operand = _parse_operand(text.strip().upper() or "PCT1")
+    if isinstance(operand, float):
+        raise ValueError("排序欄位必須是指標")
+    return operand
+
+def term_label(term):
+    kind, n = term
+    return kind if kind in ("CLOSE", "VOLUME") else f"{kind}{n}"
+
+# --- 指標矩陣 (T, N)：全部沿時間軸向量化計算 ---
+def _rolling_sum_count(x, n):
+    # 滾動視窗內的總和與有效筆數 (NaN 不計入)
+    valid = ~np.isnan(x)
+    csum = np.concatenate((np.zeros((1, x.shape[1])), np.cumsum(np.where(valid, x, 0.0), axis=0)))
+    ccount = np.concatenate((np.zeros((1, x.shape[1])), np.cumsum(valid, axis=0)))
+    total = np.full(x.shape, np.nan)
+    count = np.zeros(x.shape)
+    if n <= len(x):
+        total[n - 1:] = csum[n:] - csum[:-n]
+        count[n - 1:] = ccount[n:] - ccount[:-n]
+    return total, count
+
+def _shift(x, n):
+    out = np.full(x.shape, np.nan)
+    if n < len(x):
+        out[n:] = x[:-n]
+    return out
+
+def _rolling_extreme(x, n, fn):
+    out = np.full(x.shape, np.nan)
+    if n <= len(x):
+        windows = np.lib.stride_tricks.sliding_window_view(x, n, axis=0)
+        out[n - 1:] = fn(windows, axis=-1)
+    return out
+
+def _term_matrix(term, panel, cache):
+    if term in cache:
+        return cache[term]
+    kind, n = term
+    close, volume = panel["close"], panel["volume"]
+    if kind == "CLOSE":
+        out = close
+    elif kind == "VOLUME":
+        out = volume
+    elif kind == "MA":
+        total, count = _rolling_sum_count(close, n)
+        out = np.where(count == n, total / n, np.nan)
+    elif kind == "VMA":
+        total, count = _rolling_sum_count(volume, n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = np.where(count > 0, total / count, np.nan)
+    elif kind == "PCT":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = (close / _shift(close, n) - 1) * 100
+    elif kind == "HIGH":
+        out = _shift(_rolling_extreme(close, n, np.max), 1)
+    elif kind == "LOW":
+        out = _shift(_rolling_extreme(close, n, np.min), 1)
+    elif kind == "VR":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = volume / _shift(_term_matrix(("VMA", n), panel, cache), 1)
+    cache[term] = out
+    return out
+
+def _values_at(operand, panel, cache, rows):
+    # 取每檔在指定列的值；數字直接廣播
+    if isinstance(operand, float):
+        return np.full(len(rows), operand)
+    matrix = _term_matrix(operand, panel, cache)
+    if not len(matrix):
+        return np.full(len(rows), np.nan)
+    values = matrix[np.clip(rows, 0, None), np.arange(len(rows))]
+    return np.where(rows >= 0, values, np.nan)
+
+def screen(panel, conditions, rank_by=("PCT", 1)):
+    # 每檔以自己最後一個交易日為「今天」評估 (台股 / 美股的最後交易日可能不同)，
+    # 回傳依 rank_by 由大到小排序的符合清單
+    rows = panel["last_row"]
+    cache = {}
+    matched = rows >= 0
+    with np.errstate(invalid="ignore"):
+        for left, op, right in conditions:
+            lhs, rhs = _values_at(left, panel, cache, rows), _values_at(right, panel, cache, rows)
+            if op == ">":
+                matched &= lhs > rhs
+            elif op == "<":
+                matched &= lhs < rhs
+            elif op == ">=":
+                matched &= lhs >= rhs
+            elif op == "<=":
+                matched &= lhs <= rhs
+            else:
+                prev_lhs = _values_at(left, panel, cache, rows - 1)
+                prev_rhs = _values_at(right, panel, cache, rows - 1)
+                if op == "CROSSUP":
+                    matched &= (prev_lhs <= prev_rhs) & (lhs > rhs)
+                else:
+                    matched &= (prev_lhs >= prev_rhs) & (lhs < rhs)
+
+    terms = list(dict.fromkeys(
+        [("CLOSE", 0), ("PCT", 1), rank_by]
+        + [t for left, _, right in conditions for t in (left, right) if not isinstance(t, float)]
+    ))
+    values = {term: _values_at(term, panel, cache, rows) for term in terms}
+    rank_values = np.where(np.isnan(values[rank_by]), -np.inf, values[rank_by])
+
+    results = []
+    for j in np.flatnonzero(matched)[np.argsort(-rank_values[matched], kind="stable")]:
+        results.append({
+            "symbol": panel["symbols"][j],
+            "date": panel["days"][rows[j]],
+            "values": {term_label(term): values[term][j] for term in terms},
+        })
+    return results
@@ -0,0 +1,307 @@
+import contextlib
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.parse
+
+import bar_store
+import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows 沒有 fcntl，改用 msvcrt 的檔案鎖
+    fcntl = None
+    import msvcrt
+
+# ==========================================
+# 跨 worker 共用快取：負載平衡後方同一台主機跑多個 Streamlit worker 時，
+# st.cache_data 只存在各自的行程，同一檔會被每個 worker 各抓一次、各存一份 DataFrame。
+# 報價與 K 線序列改放在主機共用的後端 (環境變數 SHARED_CACHE 選擇)：
+#   file  (預設) 共用目錄 (有 /dev/shm 時放在共享記憶體) 下的檔案；K 線序列存成 .npy，
+#         讀取時 mmap，各 worker 共用同一份 page cache，不必每次反序列化整個 DataFrame
+#   redis://host:6379/0  Redis 或相容服務 (需另外安裝 redis 套件)
+#   local 只在本行程內 (單一 worker)
+# 過期時以租約 (lease) 決定由誰重抓：只有拿到租約的 worker 重抓並寫回，
+# 其他 worker 先回傳舊值；完全沒有資料時等待寫入者一小段時間
+# ==========================================
+SHARED_CACHE = os.environ.get("SHARED_CACHE", "file")
+# 依 K 線資料庫路徑區分命名空間：不同資料庫 (例如壓測用的) 不會讀到彼此的快取
+NAMESPACE = "stock-app-" + hashlib.md5(bar_store.DB_PATH.encode()).hexdigest()[:8]
+SHARED_CACHE_DIR = os.environ.get(
+    "SHARED_CACHE_DIR",
+    os.path.join("/dev/shm", NAMESPACE) if os.path.isdir("/dev/shm")
+    else os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "shared_cache"),
+)
+# Redis 租約的存活秒數：持有者當掉時最晚這麼久後由其他 worker 接手
+# (檔案後端用作業系統的檔案鎖，行程結束時自動釋放，不需要逾時)
+LEASE_TTL = 30
+# 完全沒有資料時等待其他 worker 寫入的秒數，逾時就自己抓
+WRITER_WAIT = 10
+POLL_INTERVAL = 0.05
+# 超過這個時間沒有更新的項目會被清掉 (停止觀察的代號)
+PRUNE_AGE = 86400
+PRUNE_INTERVAL = 3600
+
+_lock = threading.Lock()
+_backend = None
+_last_prune = 0.0
+
+def _save_array(array):
+    import numpy as np
+    buf = io.BytesIO()
+    np.save(buf, array, allow_pickle=False)
+    return buf.getvalue()
+
+def _load_array(data):
+    import numpy as np
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+def _try_lock(fd):
+    # 非阻塞的排他鎖，鎖不到時丟出 OSError
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+class FileBackend:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._leases = {}
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, urllib.parse.quote(key, safe="") + suffix)
+
+    def _write(self, path, data):
+        # 先寫暫存檔再改名：讀取端 (含已 mmap 的舊檔) 不會看到寫到一半的內容
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            # Windows 上舊檔正被其他行程 mmap 時無法取代，略過這次寫入
+            print(f"⚠️ 共用快取寫入失敗 {os.path.basename(path)}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+
+    def get(self, key):
+        try:
+            with open(self._path(key, ".bin"), "rb") as f:
+                return f.read(), os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return None, None
+
+    def put(self, key, data):
+        self._write(self._path(key, ".bin"), data)
+
+    def get_array(self, key):
+        import numpy as np
+        path = self._path(key, ".npy")
+        try:
+            stored_at = os.stat(path).st_mtime
+            return np.load(path, mmap_mode="r"), stored_at
+        except FileNotFoundError:
+            return None, None
+
+    def put_array(self, key, array):
+        self._write(self._path(key, ".npy"), _save_array(array))
+
+    def acquire(self, key):
+        # 每個 key 一個鎖檔，以非阻塞的排他鎖當租約；同一行程內不同執行緒各自開檔，也會互斥
+        path = self._path(key, ".lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        try:
+            _try_lock(fd)
+            # prune 可能在開檔與上鎖之間刪掉鎖檔：鎖到的已不是目錄裡的那個檔時，視為沒拿到
+            if not os.path.samestat(os.fstat(fd), os.stat(path)):
+                raise FileNotFoundError(path)
+            # 更新時間讓 prune 知道這個鎖檔還在使用
+            os.utime(path)
+        except OSError:
+            os.close(fd)
+            return False
+        with _lock:
+            self._leases[(key, threading.get_ident())] = fd
+        return True
+
+    def release(self, key):
+        with _lock:
+            fd = self._leases.pop((key, threading.get_ident()), None)
+        if fd is not None:
+            # 關檔即釋放檔案鎖；鎖檔本身保留 (太久沒用的由 prune 在沒有人持有時刪除)
+            os.close(fd)
+
+    def _remove_idle_lock(self, path):
+        # 只刪沒有人持有的鎖檔：先鎖住再刪，正在等這個鎖的 worker 上鎖後會發現檔案已換掉
+        fd = os.open(path, os.O_RDWR)
+        try:
+            _try_lock(fd)
+            os.remove(path)
+        finally:
+            os.close(fd)
+
+    def prune(self, max_age):
+        cutoff = time.time() - max_age
+        for entry in os.scandir(self.directory):
+            with contextlib.suppress(OSError):
+                if entry.name.endswith((".bin", ".npy", ".tmp")) and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                elif entry.name.endswith(".lock") and entry.stat().st_mtime < cutoff:
+                    self._remove_idle_lock(entry.path)
+
+class RedisBackend:
+    # 值與寫入時間存在同一個 hash；租約用 SET NX EX，只有持有者能刪除
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = NAMESPACE + ":"
+        self._release = self.client.register_script(self.RELEASE_SCRIPT)
+
+    def _token(self):
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def get(self, key):
+        data, stored_at = self.client.hmget(self.prefix + key, "data", "stored_at")
+        if data is None:
+            return None, None
+        return data, float(stored_at)
+
+    def put(self, key, data):
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix + key, mapping={"data": data, "stored_at": time.time()})
+        pipe.expire(self.prefix + key, PRUNE_AGE)
+        pipe.execute()
+
+    def get_array(self, key):
+        data, stored_at = self.get(key)
+        return (None, None) if data is None else (_load_array(data), stored_at)
+
+    def put_array(self, key, array):
+        self.put(key, _save_array(array))
+
+    def acquire(self, key):
+        return bool(self.client.set(self.prefix + key + ":lease", self._token(), nx=True, ex=LEASE_TTL))
+
+    def release(self, key):
+        self._release(keys=[self.prefix + key + ":lease"], args=[self._token()])
+
+    def prune(self, max_age):
+        # 由 Redis 的 EXPIRE 自動清除
+        pass
+
+class LocalBackend:
+    # 單一 worker 用：值放在本行程記憶體，租約是行程內的鎖
+    def __init__(self):
+        self._values = {}
+        self._leases = set()
+
+    def get(self, key):
+        return self._values.get(key, (None, None))
+
+    def put(self, key, data):
+        self._values[key] = (data, time.time())
+
+    get_array = get
+    put_array = put
+
+    def acquire(self, key):
+        with _lock:
+            if key in self._leases:
+                return False
+            self._leases.add(key)
+            return True
+
+    def release(self, key):
+        with _lock:
+            self._leases.discard(key)
+
+    def prune(self, max_age):
+        cutoff = time.time() - max_age
+        with _lock:
+            for key in [k for k, (_, stored_at) in self._values.items() if stored_at < cutoff]:
+                del self._values[key]
+
+def get_backend():
+    global _backend
+    with _lock:
+        if _backend is None:
+            if SHARED_CACHE.startswith(("redis://", "rediss://", "unix://")):
+                try:
+                    _backend = RedisBackend(SHARED_CACHE)
+                except ImportError:
+                    print("⚠️ 未安裝 redis 套件，共用快取改用檔案後端")
+            elif SHARED_CACHE == "local":
+                _backend = LocalBackend()
+            if _backend is None:
+                _backend = FileBackend(SHARED_CACHE_DIR)
+        return _backend
+
+@contextlib.contextmanager
+def lease(key, wait=0):
+    # 取得 key 的租約 (最多等待 wait 秒)，產出是否取得；區塊結束時釋放
+    backend = get_backend()
+    deadline = time.time() + wait
+    acquired = backend.acquire(key)
+    while not acquired and time.time() < deadline:
+        time.sleep(POLL_INTERVAL)
+        acquired = backend.acquire(key)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            backend.release(key)
+
+def get_or_refresh(key, load, max_age, array=False, cache="shared"):
+    # 回傳 key 的值：仍新鮮就直接用；過期時只有拿到租約的 worker 呼叫 load() 重抓並寫回，
+    # 其他 worker 先用舊值；完全沒有資料時等待寫入者，逾時才自己抓 (不寫回)
+    # load() 丟出的例外原樣往外傳，不寫入快取
+    backend = get_backend()
+    read = backend.get_array if array else backend.get
+    write = backend.put_array if array else backend.put
+
+    value, stored_at = read(key)
+    if value is not None and time.time() - stored_at < max_age:
+        metrics.inc("cache_requests_total", cache=cache, result="hit")
+        return value
+
+    deadline = time.time() + WRITER_WAIT
+    while True:
+        if backend.acquire(key):
+            try:
+                # 拿到租約後再讀一次：前一位寫入者可能剛寫完
+                value, stored_at = read(key)
+                if value is not None and time.time() - stored_at < max_age:
+                    metrics.inc("cache_requests_total", cache=cache, result="hit")
+                    return value
+                value = load()
+                write(key, value)
+                metrics.inc("cache_requests_total", cache=cache, result="miss")
+                return value
+            finally:
+                backend.release(key)
+        if value is not None:
+            metrics.inc("cache_requests_total", cache=cache, result="stale")
+            return value
+        if time.time() >= deadline:
+            metrics.inc("cache_requests_total", cache=cache, result="miss")
+            return load()
+        time.sleep(POLL_INTERVAL)
+        value, stored_at = read(key)
+        if value is not None:
+            metrics.inc("cache_requests_total", cache=cache, result="wait")
+            return value
+
+def prune():
+    # 清掉太久沒更新的項目；由背景報價更新順便呼叫，每 PRUNE_INTERVAL 秒最多執行一次
+    global _last_prune
+    now = time.time()
+    with _lock:
+        if now - _last_prune < PRUNE_INTERVAL:
+            return
+        _last_prune = now
+    get_backend().prune(PRUNE_AGE)
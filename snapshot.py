@@ -0,0 +1,143 @@
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import wait
+
+import bar_store
+import fetch_scheduler
+import market_calendar
+import metrics
+import quote_refresher
+import stock_data
+import watchlist_store
+
+# ==========================================
+# 收盤快照：收盤後以批次指令抓完整份基準觀察清單，寫成一個壓縮檔
+# (報價、日線標準序列)；app 啟動時先載入快照，首頁的報價與群組平均、個股的 K 線與指標
+# 第一次顯示就不必等網路 (群組平均與指標都由這兩者即時算出)，之後背景更新 / 增量同步照常以即時資料取代
+# numpy 只在讀寫快照檔時才 import：沒有快照檔時，app 啟動不必付 numpy 的載入時間
+#
+#   python snapshot.py                    (基準清單，寫到 data/snapshot.npz)
+#   python snapshot.py --owner user:alice@example.com   (含登入使用者的修改；擁有者格式同 views.common.current_user)
+#   python snapshot.py --owner anon:<網址 ?wl= 的代碼>     (含某個未登入瀏覽器的修改)
+# ==========================================
+SNAPSHOT_PATH = os.environ.get(
+    "SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "snapshot.npz"),
+)
+FORMAT_VERSION = 1
+OHLCV_FIELDS = ("open", "high", "low", "close", "volume")
+
+_lock = threading.Lock()
+_loaded = False
+
+# --- 產生快照 (批次指令) ---
+def build(owner=watchlist_store.BASELINE, path=SNAPSHOT_PATH):
+    import numpy as np
+    symbols = watchlist_store.get_all_symbols(owner)
+    if any(market_calendar.is_session_active(sym) for sym in symbols):
+        print("⚠️ 仍有市場在交易時段內，快照裡的報價不是收盤價")
+
+    # 與背景更新共用排程器與抓取函式：本地已是最新的代號不會再打 API
+    started = time.perf_counter()
+    scheduler = fetch_scheduler.get_scheduler()
+    wait([scheduler.submit(f"history:{sym}", stock_data.warm_history, sym) for sym in symbols])
+    print(f"日線同步完成：{len(symbols)} 檔，{time.perf_counter() - started:.1f} 秒")
+
+    created_at = time.time()
+    quotes = {}
+    covered_from = {}
+    offsets = [0]
+    ts_parts, ohlcv_parts, kept = [], [], []
+    for sym in symbols:
+        quotes[sym] = stock_data.get_latest_quote_and_change(sym)
+        coverage = bar_store.get_coverage(sym, "1d")
+        if coverage is None:
+            continue
+        timestamps, quote = bar_store.load_bars(sym, "1d")
+        kept.append(sym)
+        covered_from[sym] = coverage[0]
+        ts_parts.append(np.asarray(timestamps, dtype=np.int64))
+        ohlcv_parts.append(np.array([quote[f] for f in OHLCV_FIELDS], dtype=float).T)
+        offsets.append(offsets[-1] + len(timestamps))
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "created_at": created_at,
+        "owner": owner,
+        "covered_from": covered_from,
+        "quotes": {sym: list(q) for sym, q in quotes.items() if q[0] is not None},
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(
+            f,
+            meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            symbols=np.array(kept, dtype=str),
+            offsets=np.asarray(offsets, dtype=np.int64),
+            ts=np.concatenate(ts_parts) if ts_parts else np.empty(0, dtype=np.int64),
+            ohlcv=np.concatenate(ohlcv_parts) if ohlcv_parts else np.empty((0, len(OHLCV_FIELDS))),
+        )
+    # 先寫暫存檔再換名，app 不會讀到寫一半的快照
+    os.replace(tmp_path, path)
+    print(f"✅ 快照已存到 {path}：{len(kept)} 檔 K 線、{len(meta['quotes'])} 筆報價、{os.path.getsize(path) / 1024:.0f} KB")
+    return meta
+
+# --- 載入快照 (app 啟動時) ---
+def read(path=SNAPSHOT_PATH):
+    # 回傳 (meta, symbols, offsets, ts, ohlcv)；檔案不存在或格式不符時回傳 None
+    if not os.path.exists(path):
+        return None
+    import numpy as np
+    try:
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != FORMAT_VERSION:
+                return None
+            return meta, data["symbols"].tolist(), data["offsets"], data["ts"], data["ohlcv"]
+    except Exception as e:
+        print(f"❌ 快照讀取失敗: {e}")
+        return None
+
+def _seed_bars(meta, symbols, offsets, ts, ohlcv):
+    # 本地還沒有日線的代號才寫入；抓取時間記為快照時間，交易時段策略會判斷何時需要增量同步
+    seeded = 0
+    for i, sym in enumerate(symbols):
+        if bar_store.get_version(sym, "1d") is not None:
+            continue
+        rows = ohlcv[offsets[i]:offsets[i + 1]]
+        quote = {f: [None if math.isnan(v) else float(v) for v in rows[:, k]] for k, f in enumerate(OHLCV_FIELDS)}
+        bar_store.save_bars(sym, "1d", ts[offsets[i]:offsets[i + 1]].tolist(), quote,
+                            covered_from=meta["covered_from"][sym], fetched_at=meta["created_at"])
+        seeded += 1
+    metrics.inc("snapshot_seeded_total", seeded, kind="bars")
+
+def load_at_startup(path=SNAPSHOT_PATH):
+    # 整個行程只載入一次：報價立即填入背景更新的快取，K 線在背景執行緒寫入本地資料庫
+    global _loaded
+    with _lock:
+        if _loaded:
+            return None
+        _loaded = True
+    snapshot = read(path)
+    if snapshot is None:
+        return None
+    meta = snapshot[0]
+    seeded = quote_refresher.seed_quotes({sym: tuple(q) for sym, q in meta["quotes"].items()}, meta["created_at"])
+    metrics.inc("snapshot_seeded_total", seeded, kind="quotes")
+    threading.Thread(target=_seed_bars, args=snapshot, name="snapshot-seed", daemon=True).start()
+    return meta
+
+def main():
+    parser = argparse.ArgumentParser(description="產生收盤快照")
+    parser.add_argument("--owner", default=watchlist_store.BASELINE, help="觀察清單擁有者 user:<登入身分> / anon:<代碼> (預設為基準清單)")
+    parser.add_argument("--output", default=SNAPSHOT_PATH)
+    args = parser.parse_args()
+    build(args.owner, args.output)
+
+if __name__ == "__main__":
+    main()
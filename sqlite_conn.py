@@ -0,0 +1,38 @@
+import os
+import sqlite3
+import threading
+
+# ==========================================
+# SQLite 連線 (K 線資料庫 / 觀察清單資料庫共用)：每條執行緒各自一條連線，
+# 每個資料庫檔第一次連線時以 WAL 模式建立資料表 (並執行 on_create，例如寫入預設資料)
+# ==========================================
+class ThreadConnections:
+    def __init__(self, schema, on_create=None):
+        self.schema = schema
+        self.on_create = on_create
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = set()
+
+    def get(self, path):
+        # sqlite3 連線不可跨執行緒共用；path 改變時 (測試 / 壓測換資料庫) 重新連線
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "path", None) == path:
+            return conn
+
+        with self._init_lock:
+            if path not in self._initialized:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                init_conn = sqlite3.connect(path, timeout=30)
+                init_conn.execute("PRAGMA journal_mode=WAL")
+                init_conn.executescript(self.schema)
+                if self.on_create is not None:
+                    self.on_create(init_conn)
+                init_conn.close()
+                self._initialized.add(path)
+
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.path = path
+        return conn
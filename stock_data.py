@@ -0,0 +1,276 @@
+import datetime
+import functools
+import time
+from concurrent.futures import Future
+
+import bar_store
+import failure_tracker
+import fetch_scheduler
+import market_calendar
+import metrics
+import shared_cache
+import yahoo_client
+
+# ==========================================
+# 核心功能：直接呼叫 Yahoo API
+# ==========================================
+# range 參數對應的日曆秒數 ("1d"/"5d" 為交易日數，讀取後再依日期裁切)
+RANGE_SECONDS = {
+    "1d": 86400, "5d": 5 * 86400, "1mo": 31 * 86400, "3mo": 92 * 86400, "6mo": 183 * 86400,
+    "1y": 366 * 86400, "2y": 731 * 86400, "5y": 1827 * 86400, "10y": 3653 * 86400,
+}
+TRADING_DAY_RANGES = {"1d": 1, "5d": 5}
+
+# 每個代號每個週期只維護一條標準序列：第一次就抓足 CANONICAL_RANGE，
+# 5d 報價、6mo K 線圖、週 K / 月 K 都從同一條序列在本地裁切或重新取樣，不再各自打 API
+# (Yahoo 盤中資料的區間上限：1m 約 7 天、5m/15m 約 60 天、1h 約 730 天)
+CANONICAL_RANGE = {"1d": "2y", "1h": "6mo", "15m": "1mo", "5m": "1mo", "1m": "5d"}
+# 由日線重新取樣的週期
+RESAMPLE_RULES = {"1wk": "W-FRI", "1mo": "MS"}
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# 標準序列在共用快取 (shared_cache) 的有效秒數，所有 worker 共用同一份
+HISTORY_TTL = 60
+# 其他 worker 正在同步同一檔時最多等待的秒數；逾時就先以本地資料回應
+SYNC_LEASE_WAIT = 15
+
+class SyncBusyError(yahoo_client.YahooRequestError):
+    # 等不到同步租約 (其他 worker 仍在抓這一檔)：視為暫時性錯誤，
+    # 本地沒有資料時不可當成「查無資料」記錄失敗，也不把空序列寫進共用快取
+    pass
+
+def _range_start(range_str, now):
+    if range_str == "max":
+        return 0
+    if range_str == "ytd":
+        return int(datetime.datetime(datetime.datetime.fromtimestamp(now).year, 1, 1).timestamp())
+    return int(now - RANGE_SECONDS.get(range_str, RANGE_SECONDS["6mo"]))
+
+def _sync_range(range_str, interval, now):
+    # 需求區間在標準序列範圍內就同步標準序列，更長的區間才往前補抓
+    canonical = CANONICAL_RANGE.get(interval)
+    if canonical is None or _range_start(range_str, now) < _range_start(canonical, now):
+        return range_str
+    return canonical
+
+def _sync_bar_store(symbol, range_str, interval, now):
+    # 本地資料不足時補抓缺少的區段，否則只抓最後一根 K 棒之後的增量
+    # 回傳同步方式 (fresh / full / backfill / delta)，供效能指標統計
+    start = _range_start(range_str, now)
+    coverage = bar_store.get_coverage(symbol, interval)
+    if coverage is not None:
+        covered_from, _, fetched_at = coverage
+        if covered_from <= start and market_calendar.is_fresh(symbol, fetched_at, interval, now):
+            # 本地資料已涵蓋且仍在交易時段策略的有效期內 (例如收盤後到下次開盤前)，不打 API
+            return "fresh"
+
+    # 只有真的打 API 的同步 (含失敗) 計入抓取耗時
+    with metrics.timer("symbol_fetch_seconds", interval=interval):
+        return _fetch_bars(symbol, range_str, interval, now, start, coverage)
+
+def _fetch_bars(symbol, range_str, interval, now, start, coverage):
+    if coverage is None:
+        timestamps, quote = yahoo_client.fetch_chart(symbol, {"range": range_str, "interval": interval, "includePrePost": "false"})
+        if timestamps:
+            bar_store.save_bars(symbol, interval, timestamps, quote, covered_from=start)
+        return "full"
+
+    covered_from = coverage[0]
+    mode = "delta"
+    if covered_from > start:
+        mode = "backfill"
+        # 往前補齊較長區間，只抓本地沒有的那一段
+        timestamps, quote = yahoo_client.fetch_chart(symbol, {
+            "period1": start, "period2": covered_from, "interval": interval, "includePrePost": "false",
+        })
+        if timestamps:
+            bar_store.save_bars(symbol, interval, timestamps, quote, covered_from=start, replace_tail=False)
+        else:
+            bar_store.extend_coverage(symbol, interval, start)
+
+    # 從倒數第二根 K 棒開始重抓，盤中最後一根的時間戳記與數值都可能變動
+    tail = bar_store.get_tail_timestamps(symbol, interval, 2)
+    period1 = tail[-1] if tail else start
+    timestamps, quote = yahoo_client.fetch_chart(symbol, {
+        "period1": period1, "period2": int(now), "interval": interval, "includePrePost": "false",
+    })
+    if timestamps:
+        bar_store.save_bars(symbol, interval, timestamps, quote)
+    else:
+        bar_store.touch(symbol, interval)
+    return mode
+
+def _sync_symbol(symbol, range_str, interval, now):
+    # 同步本地 K 線並記錄成敗，回傳同步時遇到的例外 (成功或略過時回傳 None，等不到租約時回傳 SyncBusyError)
+    # 近期連續失敗的代號在退避期間內不打 API，直接以本地資料回應
+    if failure_tracker.is_blocked(symbol):
+        metrics.inc("bar_sync_total", interval=interval, mode="blocked")
+        return None
+    # 同一檔同一週期同時只有一個 worker 打 API；等到租約時對方已寫回 K 線資料庫，
+    # 這裡的同步會判定為 fresh 而不再重抓
+    with shared_cache.lease(f"sync:{symbol}:{interval}", wait=SYNC_LEASE_WAIT) as leader:
+        if not leader:
+            metrics.inc("bar_sync_total", interval=interval, mode="busy")
+            return SyncBusyError(f"{symbol} 正由其他 worker 同步中")
+        return _sync_symbol_locked(symbol, range_str, interval, now)
+
+def _sync_symbol_locked(symbol, range_str, interval, now):
+    try:
+        mode = _sync_bar_store(symbol, range_str, interval, now)
+        failure_tracker.record_success(symbol)
+        metrics.inc("bar_sync_total", interval=interval, mode=mode)
+    except yahoo_client.CircuitOpenError as e:
+        # 全域限流不算個股失敗
+        metrics.inc("bar_sync_total", interval=interval, mode="blocked")
+        return e
+    except Exception as e:
+        metrics.inc("bar_sync_total", interval=interval, mode="error")
+        # 網路失敗時仍以本地既有資料回應
+        print(f"❌ {symbol} 抓取失敗: {e}")
+        # 只有 404 才是永久查無此代號 (空的 chart.result 由讀取端記成「查無資料」)，其餘錯誤都會再重試
+        permanent = isinstance(e, yahoo_client.YahooRequestError) and e.is_not_found
+        failure_tracker.record_failure(symbol, e, permanent=permanent)
+        return e
+    return None
+
+# 標準序列在共用快取中存成 (N, 6) 的 float64 陣列，欄位依序為時間戳記與 OHLCV
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# pandas / numpy 只在需要 DataFrame (K 線圖、群組分析) 時才 import：
+# 首頁與報價路徑只用到 K 線資料庫與 spark，不必付 pandas 的載入時間
+def _bars_array(timestamps, quote):
+    import numpy as np
+    columns = [timestamps] + [quote[field.lower()] for field in BAR_COLUMNS]
+    return np.array(columns, dtype=float).T
+
+def _build_dataframe(bars):
+    # 由共用快取的陣列 (可能是唯讀的 mmap) 建立 DataFrame；數值會複製一份，呼叫端可自由修改
+    # 沒有收盤價的 K 棒先以 numpy 濾掉 (比 DataFrame.dropna 快一個數量級)
+    import numpy as np
+    import pandas as pd
+    bars = bars[~np.isnan(bars[:, 4])]
+    index = pd.DatetimeIndex(bars[:, 0].astype("datetime64[s]"), name="Date").tz_localize('UTC').tz_convert('Asia/Taipei')
+    return pd.DataFrame(bars[:, 1:], columns=list(BAR_COLUMNS), index=index)
+
+def _load_bars(symbol, interval, sync_range):
+    # 同步並讀出標準序列 (本地完整歷史)；查無資料時回傳空陣列 (照樣寫入快取)
+    now = time.time()
+    sync_error = _sync_symbol(symbol, sync_range, interval, now)
+
+    try:
+        timestamps, quote = bar_store.load_bars(symbol, interval, _range_start(sync_range, now))
+    except Exception as e:
+        print(f"❌ {symbol} 讀取本地資料失敗: {e}")
+        timestamps, quote = [], {field.lower(): [] for field in BAR_COLUMNS}
+    if not timestamps:
+        if isinstance(sync_error, yahoo_client.YahooRequestError) and not sync_error.is_not_found:
+            # 404 以外的錯誤且本地無資料：丟出例外，避免空序列被快取成「查無資料」
+            raise sync_error
+        if sync_error is None and not failure_tracker.is_blocked(symbol):
+            failure_tracker.record_failure(symbol, "查無資料", permanent=True)
+    return _bars_array(timestamps, quote)
+
+def _load_series(symbol, interval, sync_range):
+    # 快取單位是「代號 + 週期」的標準序列，不再依區間各存一份；
+    # 存在主機共用快取，各 worker 不再各自保存 DataFrame，過期時只有一個 worker 重新同步
+    bars = shared_cache.get_or_refresh(
+        f"bars:{symbol}:{interval}:{sync_range}", lambda: _load_bars(symbol, interval, sync_range),
+        HISTORY_TTL, array=True, cache="history",
+    )
+    if len(bars) == 0:
+        return None
+    return _build_dataframe(bars)
+
+def slice_range(df, range_str, now=None):
+    import pandas as pd
+    now = time.time() if now is None else now
+    if range_str in TRADING_DAY_RANGES:
+        # 交易日區間：取最後 N 個有 K 棒的日期
+        days = df.index.normalize().unique()
+        return df[df.index >= days[-TRADING_DAY_RANGES[range_str]:][0]]
+    return df[df.index >= pd.Timestamp(_range_start(range_str, now), unit='s', tz='UTC')]
+
+def resample_ohlcv(df, rule):
+    # 日線轉週 / 月 K；K 棒時間標在該期間的第一個交易日
+    out = df.resample(rule).agg(OHLCV_AGG)
+    out["Date"] = df.index.to_series().resample(rule).first()
+    return out.dropna(subset=["Close"]).set_index("Date")
+
+def fetch_stock_data_direct(symbol, range_str="6mo", interval="1d"):
+    # 1wk / 1mo 由日線重新取樣；其餘週期直接裁切該週期的標準序列
+    base_interval = "1d" if interval in RESAMPLE_RULES else interval
+    now = time.time()
+    df = _load_series(symbol, base_interval, _sync_range(range_str, base_interval, now))
+    if df is None or df.empty:
+        return df
+
+    df = slice_range(df, range_str, now)
+    if interval in RESAMPLE_RULES:
+        df = resample_ohlcv(df, RESAMPLE_RULES[interval])
+    return df
+
+def warm_history(symbol):
+    # 預先把日線標準序列同步到本地，之後開 K 線圖不必再等網路
+    return _sync_symbol(symbol, CANONICAL_RANGE["1d"], "1d", time.time())
+
+def _quote_from_closes(closes):
+    closes = [c for c in closes if c is not None]
+    if len(closes) >= 2:
+        latest, prev = closes[-1], closes[-2]
+        return latest, ((latest - prev) / prev) * 100
+    elif len(closes) == 1:
+        return closes[-1], 0.0
+    return None, None
+
+def get_latest_quote_and_change(symbol):
+    # 報價快速路徑：只從本地 K 線資料庫取最後兩筆收盤價，不建立 DataFrame
+    sync_error = _sync_symbol(symbol, CANONICAL_RANGE["1d"], "1d", time.time())
+    closes = bar_store.load_last_closes(symbol, "1d", 2)
+    if not closes and sync_error is None and not failure_tracker.is_blocked(symbol):
+        failure_tracker.record_failure(symbol, "查無資料", permanent=True)
+    return _quote_from_closes(closes)
+
+# 批次報價：spark 端點一次可查多檔，每批最多 20 檔
+SPARK_BATCH_SIZE = 20
+
+def _fetch_spark_chunk(symbols):
+    try:
+        closes = yahoo_client.fetch_spark(symbols, range_str="5d", interval="1d")
+        return {sym: _quote_from_closes(c) for sym, c in closes.items()}
+    except Exception as e:
+        print(f"❌ 批次報價 {','.join(symbols)} 抓取失敗: {e}")
+        return {}
+
+def _resolve_quote(symbol, out, spark_future):
+    # spark 結果回來後：拿到報價就完成；否則 (斷路器未開且個股未在退避期) 改送單檔 chart 查詢
+    try:
+        quote = spark_future.result() or (None, None)
+    except Exception:
+        quote = (None, None)
+    if quote[0] is not None or failure_tracker.breaker.state()["state"] == "open" or failure_tracker.is_blocked(symbol):
+        out.set_result(quote)
+        return
+
+    def finish(chart_future):
+        try:
+            out.set_result(chart_future.result())
+        except Exception:
+            out.set_result((None, None))
+
+    fallback = fetch_scheduler.get_scheduler().submit(f"quote:{symbol}", get_latest_quote_and_change, symbol)
+    fallback.add_done_callback(finish)
+
+def submit_batch_quotes(symbols):
+    # 回傳 {symbol: Future}，每個 Future 完成時給出 (最新價, 漲跌幅%)，可依完成順序逐一處理
+    # 經由共用排程器送出：重複代號只查一次，其他 session 正在查的個股直接共用結果
+    spark_futures = fetch_scheduler.get_scheduler().fetch_many("spark5d", symbols, _fetch_spark_chunk, SPARK_BATCH_SIZE)
+    futures = {}
+    for sym, spark_future in spark_futures.items():
+        out = Future()
+        spark_future.add_done_callback(functools.partial(_resolve_quote, sym, out))
+        futures[sym] = out
+    return futures
+
+def fetch_batch_quotes(symbols):
+    # 回傳 {symbol: (最新價, 漲跌幅%)}；不經共用快取，快取由 quote_refresher 負責
+    return {sym: future.result() for sym, future in submit_batch_quotes(symbols).items()}
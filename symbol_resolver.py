@@ -0,0 +1,118 @@
+import re
+import time
+
+import bar_store
+import fetch_scheduler
+import metrics
+import yahoo_client
+
+# ==========================================
+# 代號驗證與後綴判斷：新增 / 匯入個股前先向資料來源確認代號存在，
+# 台股代號沒寫後綴或後綴寫錯 (上市 .TW / 上櫃 .TWO) 時自動改成查得到的那一個；
+# 結果 (含查無資料) 存在 K 線資料庫的代號資料表，查不到的代號不會進入清單，也就不會進到頁面的報價路徑
+# ==========================================
+TW_CODE = re.compile(r"^\d{4,6}[A-Z]?$")
+TW_SUFFIXES = (".TW", ".TWO")
+# 代號資料的有效期：有效的代號很少變動；查無資料的代號可能之後才上市，較快重查
+VALID_TTL = 30 * 86400
+INVALID_TTL = 86400
+# spark 端點一次可查多檔
+META_BATCH_SIZE = 20
+# 等待整批查詢完成的秒數上限
+RESOLVE_TIMEOUT = 60
+
+def candidates(symbol):
+    # 依序嘗試的代號：台股代號沒寫後綴時先試上市再試上櫃，寫了後綴時先試原本的再試另一個
+    symbol = symbol.strip().upper()
+    if TW_CODE.match(symbol):
+        return [symbol + suffix for suffix in TW_SUFFIXES]
+    base, _, suffix = symbol.rpartition(".")
+    if f".{suffix}" in TW_SUFFIXES and TW_CODE.match(base):
+        return [symbol] + [base + s for s in TW_SUFFIXES if s != f".{suffix}"]
+    return [symbol]
+
+def _fetch_meta_chunk(symbols):
+    # 查得到的代號回傳代號資料，查不到的回傳 valid = False (連線錯誤 / 限流時整批丟出例外，不寫入快取)
+    try:
+        metas = yahoo_client.fetch_symbol_meta(symbols)
+    except yahoo_client.YahooRequestError as e:
+        # 整批都沒有掛牌的代號時 spark 回 404：視為整批查無資料，讓下一輪改試其他後綴
+        if e.status != 404:
+            raise
+        metas = {}
+    entries = {}
+    for sym in symbols:
+        meta = metas.get(sym)
+        entries[sym] = {
+            "symbol": sym, "valid": meta is not None,
+            "name": (meta or {}).get("longName") or (meta or {}).get("shortName") or "",
+            "exchange": (meta or {}).get("fullExchangeName") or (meta or {}).get("exchangeName") or "",
+            "currency": (meta or {}).get("currency") or "",
+        }
+    bar_store.save_symbol_meta(list(entries.values()))
+    return entries
+
+def _is_fresh(entry, now):
+    return now - entry["checked_at"] < (VALID_TTL if entry["valid"] else INVALID_TTL)
+
+def lookup(symbols):
+    # 回傳 {symbol: 代號資料 dict}；快取過期或沒查過的代號經共用排程器批次查詢 (各批平行)，
+    # 查詢失敗 (網路 / 限流 / 斷路器) 的代號不會出現在結果裡
+    symbols = list(dict.fromkeys(symbols))
+    now = time.time()
+    cached = {sym: entry for sym, entry in bar_store.get_symbol_meta(symbols).items() if _is_fresh(entry, now)}
+    metrics.inc("symbol_lookup_total", len(cached), source="cache")
+    todo = [sym for sym in symbols if sym not in cached]
+    if not todo:
+        return cached
+
+    metrics.inc("symbol_lookup_total", len(todo), source="fetch")
+    futures = fetch_scheduler.get_scheduler().fetch_many("meta", todo, _fetch_meta_chunk, META_BATCH_SIZE)
+    deadline = time.time() + RESOLVE_TIMEOUT
+    failed = {}    # 例外 -> 代號；同一批的代號共用同一個例外，每批只記一次
+    for sym, future in futures.items():
+        try:
+            entry = future.result(timeout=max(deadline - time.time(), 0))
+        except Exception as e:
+            failed.setdefault(e, []).append(sym)
+            continue
+        if entry is not None:
+            cached[sym] = entry
+
+    for e, syms in failed.items():
+        if isinstance(e, yahoo_client.CircuitOpenError):
+            # 全域限流不算查詢失敗
+            metrics.inc("symbol_lookup_total", len(syms), source="blocked")
+            continue
+        metrics.inc("symbol_lookup_total", len(syms), source="error")
+        print(f"❌ 代號查詢 {','.join(syms)} 失敗: {e}")
+    return cached
+
+def resolve_many(symbols):
+    # 回傳 {輸入代號: 結果}，結果的 status：
+    #   ok 原代號有效 / resolved 改用另一個後綴 / invalid 查無資料 / error 無法查詢 (網路或限流)
+    # 第一輪只查每個代號的第一個候選，查無資料的才在第二輪查其他後綴
+    options = {sym: candidates(sym) for sym in dict.fromkeys(symbols) if sym.strip()}
+    results = {}
+    pending = dict(options)
+    for round_index in range(max((len(c) for c in options.values()), default=0)):
+        entries = lookup(c[round_index] for c in pending.values())
+        next_pending = {}
+        for sym, choices in pending.items():
+            entry = entries.get(choices[round_index])
+            if entry is None:
+                results[sym] = {"status": "error", "symbol": None}
+            elif entry["valid"]:
+                status = "ok" if choices[round_index] == sym.strip().upper() else "resolved"
+                results[sym] = {"status": status, **entry}
+            elif round_index + 1 < len(choices):
+                next_pending[sym] = choices
+            else:
+                results[sym] = {"status": "invalid", "symbol": None}
+        pending = next_pending
+    for result in results.values():
+        metrics.inc("symbol_resolve_total", result=result["status"])
+    return results
+
+def resolve(symbol):
+    return resolve_many([symbol]).get(symbol, {"status": "invalid", "symbol": None})
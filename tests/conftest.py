@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# 模組都放在專案根目錄 (app 以根目錄為工作目錄執行)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def bar_db(tmp_path, monkeypatch):
+    # K 線資料庫換成暫存檔 (get_conn 依目前的 DB_PATH 連線)
+    import bar_store
+    monkeypatch.setattr(bar_store, "DB_PATH", str(tmp_path / "bars.sqlite3"))
+    return bar_store
+
+@pytest.fixture
+def watchlist_db(tmp_path, monkeypatch):
+    # 觀察清單改用暫存目錄的資料庫 (首次連線時寫入預設的基準清單)
+    import watchlist_store
+    monkeypatch.setattr(watchlist_store, "DB_PATH", str(tmp_path / "watchlist.sqlite3"))
+    return watchlist_store
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    # 共用快取改用暫存目錄的檔案後端，不碰 /dev/shm 裡正式執行的快取
+    import shared_cache
+    directory = str(tmp_path / "shared_cache")
+    monkeypatch.setattr(shared_cache, "_backend", shared_cache.FileBackend(directory))
+    return directory
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+import backtest
+
+FAST = (3, 5, 8)
+SLOW = (10, 20, 50)
+
+def _naive(close, fast, slow, cost):
+    # 逐日模擬：短均線在長均線之上時以當日收盤進場，持有到訊號消失那天收盤出場
+    fast_ma = pd.Series(close).rolling(fast).mean().to_numpy()
+    slow_ma = pd.Series(close).rolling(slow).mean().to_numpy()
+    position = fast_ma > slow_ma
+    equity, peak, max_drawdown = 1.0, 1.0, 0.0
+    trades, held_days = [], 0
+    was_held = False
+    for t in range(len(close) - 1):
+        held = bool(position[t])
+        change = int(held) - int(was_held)
+        r = (close[t + 1] / close[t] - 1 if held else 0.0) - cost * abs(change)
+        if change == 1:
+            trades.append(0.0)
+        if held or change == -1:
+            trades[-1] += np.log1p(r)
+        equity *= 1 + r
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, 1 - equity / peak)
+        held_days += held
+        was_held = held
+    return {
+        "return": equity - 1,
+        "trades": len(trades),
+        "hit_rate": sum(1 for x in trades if x > 0) / len(trades) if trades else np.nan,
+        "max_drawdown": max_drawdown,
+        "exposure": held_days / (len(close) - 1),
+    }
+
+def test_sweep_matches_naive_loop():
+    rng = np.random.default_rng(0)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, 300))
+    result = backtest.sweep(close, FAST, SLOW, cost=0.002)
+    for i, (fast, slow) in enumerate(zip(result["fast"], result["slow"])):
+        expected = _naive(close, fast, slow, 0.002)
+        for key, value in expected.items():
+            np.testing.assert_allclose(result[key][i], value, rtol=1e-9, atol=1e-12, err_msg=f"{fast},{slow} {key}")
+    assert result["buy_hold"] == close[-1] / close[0] - 1
+
+def test_suggest_requires_min_trades():
+    close = np.linspace(100, 200, 300)    # 單邊上漲：只會有一次進場
+    assert backtest.suggest(backtest.sweep(close, FAST, SLOW)) is None
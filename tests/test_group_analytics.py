@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+import group_analytics
+
+def test_correlation_matches_pairwise_pandas():
+    # 以矩陣乘法計算的兩兩相關係數，要與 pandas 逐對 (只取雙方都有資料的日子) 計算的結果相同
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 0.02, (250, 6))
+    returns[:, 1] += returns[:, 0]
+    returns[rng.random(returns.shape) < 0.15] = np.nan
+    returns[:200, 5] = np.nan     # 資料不足 min_periods 的代號
+
+    expected = pd.DataFrame(returns).corr(min_periods=60).to_numpy()
+    np.testing.assert_allclose(group_analytics.correlation_matrix(returns, min_periods=60), expected,
+                               rtol=1e-9, atol=1e-12, equal_nan=True)
+
+def test_equal_weight_index_skips_missing():
+    returns = np.array([[0.1, np.nan], [0.0, 0.2], [np.nan, np.nan]])
+    levels, daily = group_analytics.equal_weight_index(returns)
+    np.testing.assert_allclose(daily, [0.1, 0.1, 0.0])
+    np.testing.assert_allclose(levels, [100.0, 110.0, 121.0, 121.0])
+
+def test_insufficient_history(bar_db):
+    # 空群組、全部沒有歷史、只有一個交易日：都回傳「歷史資料不足」的結果 (days 少於 2)
+    bar_db.save_bars("ONEDAY", "1d", [1_700_000_000], {"close": [10.0], "volume": [1000.0]})
+    for symbols in ([], ["NOHIST.TW"], ["ONEDAY", "NOHIST.TW"]):
+        result = group_analytics.analyze_group(symbols)
+        assert len(result["days"]) < 2
+        assert result["symbols"] == []
+        assert result["correlation"].shape == (0, 0)
+    assert group_analytics.analyze_group(["NOHIST.TW"])["missing"] == ["NOHIST.TW"]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import indicators
+
+SPEC = indicators.parse_spec("MA5,MA20,EMA12,RSI14,MACD12/26/9,BB20/2,VMA5")
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    volume = rng.integers(1_000, 50_000, n).astype(float)
+    return close, volume
+
+def _assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
+@pytest.mark.parametrize("k", [2, 30, 249])
+def test_incremental_matches_full(k):
+    # 前 k 根不變、之後的 K 棒改寫並新增：尾段補算要與整段重算相同
+    close, volume = _series(260)
+    old_close, old_volume = close[:250].copy(), volume[:250].copy()
+    old_close[k:] *= 0.97
+    prev = indicators.compute_arrays(old_close, old_volume, SPEC)
+    _assert_same(indicators.compute_arrays(close, volume, SPEC, k, prev), indicators.compute_arrays(close, volume, SPEC))
+
+def test_compute_indicators_extends_cached_result(bar_db):
+    close, volume = _series(300, seed=1)
+    ts = [1_600_000_000 + i * 86400 for i in range(300)]
+
+    def save(n, fetched_at):
+        bar_db.save_bars("TEST", "1d", ts[:n], {"close": close[:n].tolist(), "volume": volume[:n].tolist()},
+                         fetched_at=fetched_at)
+
+    save(290, 1.0)
+    indicators.compute_indicators("TEST", SPEC)
+    # 最後一根盤中 K 棒收盤價變動，並新增 10 根
+    close[289] *= 1.01
+    save(300, 2.0)
+    ts_out, results = indicators.compute_indicators("TEST", SPEC)
+
+    assert list(ts_out) == ts
+    _assert_same(results, indicators._public(indicators.compute_arrays(close, volume, SPEC)))
@@ -0,0 +1,36 @@
+import datetime
+import json
+
+import pytest
+
+import market_calendar
+
+def write_calendar(path, holidays):
+    spec = {"timezone": "Asia/Taipei", "open": "09:00", "close": "13:30", "holidays": holidays}
+    path.write_text(json.dumps({"suffixes": {".TW": "TWSE"}, "default": None, "calendars": {"TWSE": spec}}), encoding="utf-8")
+
+@pytest.fixture
+def calendar_path(tmp_path, monkeypatch):
+    path = tmp_path / "market_calendar.json"
+    monkeypatch.setattr(market_calendar, "CALENDAR_PATH", str(path))
+    monkeypatch.setattr(market_calendar, "_loaded", {"mtime": None, "config": None, "calendars": {}, "checked_at": 0.0, "checked_year": None})
+    return path
+
+def test_missing_year_warns(calendar_path, capsys):
+    write_calendar(calendar_path, ["2000-01-03"])
+    assert market_calendar.get_calendar("2330.TW").name == "TWSE"
+    assert "沒有" in capsys.readouterr().out
+    # 同一年只提醒一次
+    market_calendar._loaded["checked_at"] = 0.0
+    market_calendar.get_calendar("2330.TW")
+    assert capsys.readouterr().out == ""
+
+def test_reload_checks_mtime_at_most_every_interval(calendar_path, monkeypatch):
+    write_calendar(calendar_path, [])
+    calendar = market_calendar.get_calendar("2330.TW")
+    write_calendar(calendar_path, ["2026-10-09"])
+    market_calendar._loaded["mtime"] = -1
+    # 檢查間隔內沿用已載入的日曆，不 stat 檔案
+    assert market_calendar.get_calendar("2330.TW") is calendar
+    market_calendar._loaded["checked_at"] -= market_calendar.RELOAD_CHECK_INTERVAL
+    assert market_calendar.get_calendar("2330.TW").holidays == {datetime.date(2026, 10, 9)}
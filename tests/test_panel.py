@@ -0,0 +1,30 @@
+import numpy as np
+
+import panel
+import screener
+
+def _save(bar_db, symbol, closes, start=1_700_000_000):
+    ts = [start + i * 86400 for i in range(len(closes))]
+    bar_db.save_bars(symbol, "1d", ts, {"close": list(closes), "volume": [1000.0] * len(closes)})
+
+def test_empty_symbol_list(bar_db):
+    result = panel.get_panel([])
+    assert result["close"].shape == (0, 0)
+    assert len(result["last_row"]) == 0
+    assert screener.screen(result, screener.parse_rules("CLOSE > MA20")) == []
+
+def test_symbols_without_history(bar_db):
+    result = panel.get_panel(["NOHIST1.TW", "NOHIST2.TW"])
+    assert result["close"].shape == (0, 2)
+    assert result["last_row"].tolist() == [-1, -1]
+    assert result["missing"] == ["NOHIST1.TW", "NOHIST2.TW"]
+    assert screener.screen(result, screener.parse_rules("PCT1 >= 3")) == []
+
+def test_aligns_and_forward_fills(bar_db):
+    _save(bar_db, "AAA", [10.0, 11.0, 12.0])
+    _save(bar_db, "BBB", [20.0, 21.0])
+    result = panel.get_panel(["AAA", "BBB", "NOHIST3"])
+    assert result["close"].shape == (3, 3)
+    np.testing.assert_allclose(result["close"][:, 1], [20.0, 21.0, 21.0])
+    assert result["last_row"].tolist() == [2, 1, -1]
+    assert result["missing"] == ["NOHIST3"]
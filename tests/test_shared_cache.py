@@ -0,0 +1,48 @@
+import os
+import threading
+import time
+
+import shared_cache
+
+def hold_lease(key, holding, done):
+    with shared_cache.lease(key) as leader:
+        assert leader
+        holding.set()
+        done.wait(5)
+
+def test_second_holder_is_not_leader_after_wait(shared_dir):
+    holding, done = threading.Event(), threading.Event()
+    thread = threading.Thread(target=hold_lease, args=("sync:A:1d", holding, done))
+    thread.start()
+    holding.wait(5)
+    try:
+        started = time.time()
+        with shared_cache.lease("sync:A:1d", wait=0.2) as leader:
+            assert leader is False
+        assert time.time() - started >= 0.2
+    finally:
+        done.set()
+        thread.join()
+    # 持有者釋放後即可取得
+    with shared_cache.lease("sync:A:1d") as leader:
+        assert leader
+
+def test_prune_removes_idle_lock_files_only(shared_dir):
+    backend = shared_cache.get_backend()
+    with shared_cache.lease("idle"):
+        pass
+    holding, done = threading.Event(), threading.Event()
+    thread = threading.Thread(target=hold_lease, args=("busy", holding, done))
+    thread.start()
+    holding.wait(5)
+    try:
+        old = time.time() - 3600
+        for key in ("idle", "busy"):
+            os.utime(backend._path(key, ".lock"), (old, old))
+        backend.prune(60)
+        assert not os.path.exists(backend._path("idle", ".lock"))
+        # 仍被持有的鎖檔不刪
+        assert os.path.exists(backend._path("busy", ".lock"))
+    finally:
+        done.set()
+        thread.join()
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+import failure_tracker
+import shared_cache
+import stock_data
+import yahoo_client
+
+def test_busy_sync_is_not_recorded_as_missing(bar_db, shared_dir, monkeypatch):
+    # 其他 worker 握著同步租約時，本地沒有資料的代號不可被記成永久「查無資料」
+    monkeypatch.setattr(stock_data, "SYNC_LEASE_WAIT", 0.1)
+    monkeypatch.setattr(yahoo_client, "fetch_chart", lambda *a, **k: (_ for _ in ()).throw(AssertionError("不應打 API")))
+    holding, done = threading.Event(), threading.Event()
+
+    def other_worker():
+        with shared_cache.lease("sync:BUSY.TW:1d"):
+            holding.set()
+            done.wait(5)
+
+    thread = threading.Thread(target=other_worker)
+    thread.start()
+    holding.wait(5)
+    try:
+        assert stock_data.get_latest_quote_and_change("BUSY.TW") == (None, None)
+        assert isinstance(stock_data.warm_history("BUSY.TW"), stock_data.SyncBusyError)
+        assert failure_tracker.get_failure("BUSY.TW") is None
+    finally:
+        done.set()
+        thread.join()
+
+def test_empty_backfill_still_extends_coverage(bar_db, monkeypatch):
+    # 往前補抓的區段沒有 K 棒 (上市前) 時仍要記錄涵蓋起點，下次不再重抓同一段
+    now = 1_800_000_000
+    day = 86400
+    bar_db.save_bars("NEW.TW", "1d", [now - 3 * day, now - 2 * day], {"close": [10.0, 11.0]}, covered_from=now - 10 * day)
+    calls = []
+
+    def fake_fetch_chart(symbol, params):
+        calls.append(params)
+        return [], {}
+
+    monkeypatch.setattr(yahoo_client, "fetch_chart", fake_fetch_chart)
+    assert stock_data._sync_bar_store("NEW.TW", "1y", "1d", now) == "backfill"
+    start = stock_data._range_start("1y", now)
+    assert bar_db.get_coverage("NEW.TW", "1d")[0] == start
+    assert calls[0]["period1"] == start
+
+    calls.clear()
+    assert stock_data._sync_bar_store("NEW.TW", "1y", "1d", now) == "delta"
+    assert all(params["period1"] != start for params in calls)
+
+@pytest.mark.parametrize("status, permanent", [(404, True), (403, False), (401, False)])
+def test_only_404_is_a_permanent_miss(bar_db, shared_dir, monkeypatch, status, permanent):
+    # 401 / 403 (權杖或被擋) 只做短暫退避，不把代號當成不存在
+    def fake_fetch_chart(symbol, params):
+        raise yahoo_client.YahooRequestError(f"HTTP {status}", status)
+
+    monkeypatch.setattr(yahoo_client, "fetch_chart", fake_fetch_chart)
+    symbol = f"E{status}.TW"
+    stock_data.get_latest_quote_and_change(symbol)
+    failure = failure_tracker.get_failure(symbol)
+    assert failure["permanent"] is permanent
+    assert failure["retry_in"] <= (failure_tracker.NEGATIVE_TTL_PERMANENT_BASE if permanent else failure_tracker.NEGATIVE_TTL_BASE)
@@ -0,0 +1,21 @@
+import pytest
+
+import watchlist_io
+
+def test_parse_csv_merges_groups():
+    text = "group,symbol,name,ma_settings,note,group_note\n半導體,2330,台積電,,,晶圓\n半導體,2303,,,,\n空群組,,,,,\n"
+    groups = watchlist_io.parse(text.encode("utf-8-sig"), "list.csv")
+    assert [g["name"] for g in groups] == ["半導體", "空群組"]
+    assert groups[0]["note"] == "晶圓"
+    assert [s["symbol"] for s in groups[0]["stocks"]] == ["2330", "2303"]
+    assert groups[1]["stocks"] == []
+
+def test_parse_csv_missing_columns():
+    with pytest.raises(ValueError):
+        watchlist_io.parse(b"name,note\nA,B\n", "list.csv")
+
+def test_parse_csv_error_becomes_value_error():
+    # csv.Error (例如欄位超過 field_size_limit) 要轉成頁面會處理的 ValueError
+    text = 'group,symbol\nA,"' + "x" * 200_000 + '"\n'
+    with pytest.raises(ValueError, match="CSV 格式錯誤"):
+        watchlist_io.parse(text, "list.csv")
@@ -0,0 +1,42 @@
+import watchlist_seed
+
+ALICE, BOB = "user:alice@example.com", "anon:" + "0" * 32
+
+def first_baseline_stock():
+    return watchlist_seed.DEFAULT_STOCKS[0]
+
+def test_baseline_edit_is_materialized_per_owner(watchlist_db):
+    stock = first_baseline_stock()
+    watchlist_db.update_note(ALICE, "stock", stock["id"], "觀察中")
+    watchlist_db.update_stock_ma(ALICE, stock["id"], "10,20,60")
+
+    row = watchlist_db.get_conn().execute(
+        "SELECT note, ma_settings FROM stocks WHERE owner = ? AND id = ?", (ALICE, stock["id"])
+    ).fetchone()
+    assert row == ("觀察中", "10,20,60")
+    # 基準列維持原樣，自己看到的是覆寫後的那一列 (不重複)
+    assert watchlist_db.get_stock(watchlist_db.BASELINE, stock["id"])["note"] == stock["note"]
+    assert [s["note"] for s in watchlist_db.get_all_stocks(ALICE) if s["id"] == stock["id"]] == ["觀察中"]
+
+def test_deleted_baseline_group_hides_its_stocks(watchlist_db):
+    group_id = first_baseline_stock()["group_id"]
+    watchlist_db.delete_group(ALICE, group_id)
+
+    assert watchlist_db.get_group(ALICE, group_id) is None
+    assert watchlist_db.get_stocks_by_group(ALICE, group_id) == []
+    assert all(s["group_id"] != group_id for s in watchlist_db.get_all_stocks(ALICE))
+    assert watchlist_db.get_stocks_by_group(watchlist_db.BASELINE, group_id)
+
+def test_owner_edits_are_invisible_to_others(watchlist_db):
+    stock = first_baseline_stock()
+    group_id = watchlist_db.add_group(ALICE, "自選")
+    watchlist_db.add_stock(ALICE, group_id, "2330.tw", "台積電")
+    watchlist_db.update_stock_info(ALICE, stock["id"], "9999.TW", "改名")
+    watchlist_db.delete_stock(ALICE, watchlist_seed.DEFAULT_STOCKS[1]["id"])
+
+    assert "2330.TW" in watchlist_db.get_all_symbols(ALICE)
+    assert watchlist_db.get_group(BOB, group_id) is None
+    assert "2330.TW" not in watchlist_db.get_all_symbols(BOB)
+    assert watchlist_db.get_stock(BOB, stock["id"])["symbol"] == stock["symbol"]
+    assert watchlist_db.get_stock(BOB, watchlist_seed.DEFAULT_STOCKS[1]["id"]) is not None
+    assert watchlist_db.get_all_stocks(BOB) == watchlist_db.get_all_stocks(watchlist_db.BASELINE)
@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+import failure_tracker
+import yahoo_client
+
+class FakeResponse:
+    def __init__(self, status, data=None):
+        self.status_code = status
+        self.headers = {}
+        self._data = data if data is not None else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._data
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return FakeResponse(self.statuses.pop(0), {"ok": True})
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = failure_tracker.CircuitBreaker()
+    monkeypatch.setattr(failure_tracker, "breaker", breaker)
+    monkeypatch.setattr(yahoo_client.time, "sleep", lambda s: None)
+    return breaker
+
+def use_session(monkeypatch, statuses):
+    session = FakeSession(statuses)
+    monkeypatch.setattr(yahoo_client, "_session", session)
+    return session
+
+def test_retries_count_as_one_breaker_outcome(breaker, monkeypatch):
+    # 兩次 503 後成功：斷路器只記錄一筆「未限流」，不因重試而累積限流比例
+    session = use_session(monkeypatch, [503, 503, 200])
+    assert yahoo_client.get_json("/x") == {"ok": True}
+    assert session.calls == 3
+    assert [throttled for _, throttled in breaker._results] == [False]
+
+def test_exhausted_retries_count_as_one_throttled_outcome(breaker, monkeypatch):
+    use_session(monkeypatch, [429] * (yahoo_client.MAX_RETRIES + 1))
+    with pytest.raises(yahoo_client.YahooRequestError) as info:
+        yahoo_client.get_json("/x")
+    assert info.value.status == 429
+    assert [throttled for _, throttled in breaker._results] == [True]
+
+def test_only_404_is_not_found(breaker, monkeypatch):
+    for status, not_found in ((404, True), (403, False), (401, False)):
+        session = use_session(monkeypatch, [status])
+        with pytest.raises(yahoo_client.YahooRequestError) as info:
+            yahoo_client.get_json("/x")
+        assert session.calls == 1
+        assert info.value.is_not_found is not_found
+    assert not any(throttled for _, throttled in breaker._results)
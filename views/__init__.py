@@ -0,0 +1,12 @@
+# ==========================================
+# 各頁面的繪製模組：app.py 每次 rerun 只 import 目前頁面對應的模組，
+# 沒開過的頁面 (與它們才需要的 pandas / plotly) 不會被載入
+# ==========================================
+PAGES = {
+    "home": "views.home",
+    "group_detail": "views.group_detail",
+    "stock_detail": "views.stock_detail",
+    "group_analytics": "views.analytics",
+    "screener": "views.screening",
+    "diagnostics": "views.diagnostics",
+}
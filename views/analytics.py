@@ -0,0 +1,103 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import backtest
+import group_analytics
+import quote_refresher
+import watchlist_store
+from views.common import current_user, get_stocks_by_group, update_stock_ma
+
+# ==========================================
+# 頁面 4: 群組分析
+# ==========================================
+def render_backtest(stocks):
+    # 全群組均線回測：各檔交給行程池平行計算，列出各自最佳的均線組合
+    st.subheader("均線回測")
+    if not st.toggle("🧪 回測全部個股的均線參數", key="group_backtest"):
+        return
+    with st.spinner("回測中..."):
+        results = backtest.sweep_group([s['symbol'] for s in stocks])
+    rows = []
+    changed = []
+    for s in stocks:
+        result = results[s['symbol']]
+        order = backtest.ranking(result)
+        if not len(order):
+            continue
+        best = order[0]
+        suggestion = backtest.suggest(result)
+        if suggestion != s['ma_settings']:
+            changed.append((s, suggestion))
+        rows.append({
+            "代號": s['symbol'], "目前均線": s['ma_settings'], "建議均線": suggestion,
+            "報酬%": result['return'][best] * 100, "勝率%": result['hit_rate'][best] * 100,
+            "最大回撤%": result['max_drawdown'][best] * 100, "交易次數": int(result['trades'][best]),
+            "買進持有%": result['buy_hold'] * 100,
+        })
+    if not rows:
+        st.info("歷史資料不足，無法回測")
+        return
+    table = pd.DataFrame(rows).set_index("代號")
+    st.dataframe(table.style.format("{:.1f}", subset=["報酬%", "勝率%", "最大回撤%", "買進持有%"]), use_container_width=True)
+    if changed and st.button(f"套用建議均線到 {len(changed)} 檔", use_container_width=True):
+        for s, suggestion in changed:
+            update_stock_ma(s['id'], suggestion)
+        st.rerun()
+
+def render():
+    group = watchlist_store.get_group(current_user(), st.session_state.selected_group['id']) or st.session_state.selected_group
+    st.title(f"📊 {group['name']}")
+    stocks = get_stocks_by_group(group['id'])
+    names = {s['symbol']: (s.get('name') or s['symbol']) for s in stocks}
+    quote_refresher.watch(list(names))
+    quote_refresher.warm_histories()
+
+    corr_window = st.radio("相關係數期間 (交易日)", group_analytics.CORR_WINDOWS, horizontal=True, format_func=lambda n: f"{n} 日")
+    result = group_analytics.analyze_group(list(names), corr_window)
+    if result['missing']:
+        st.caption(f"⚠️ {len(result['missing'])} 檔尚無歷史資料，未納入計算")
+
+    if len(result['days']) < 2:
+        st.info("歷史資料不足，無法分析")
+    else:
+        labels = [f"{sym} {names[sym]}" if "TW" in sym.upper() else sym for sym in result['symbols']]
+
+        # 等權重群組指數與各股相對強弱線
+        st.subheader("群組指數")
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=result['days'], y=result['index'], line=dict(color='#FF4B4B', width=2.5), name='等權重指數'))
+        fig.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10), legend=dict(orientation="h", y=1.02, x=0))
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("相對強弱")
+        rs = result['relative_strength']
+        st.caption("RS > 100 代表同期間強於群組指數；" + "、".join(
+            f"群組 {n} 日報酬 {rs[n]['index_return']:+.2f}%" for n in group_analytics.RS_WINDOWS))
+        rs_table = pd.DataFrame(
+            {f"{n}日報酬%": rs[n]['return'] for n in group_analytics.RS_WINDOWS}
+            | {f"RS{n}": rs[n]['rs'] for n in group_analytics.RS_WINDOWS},
+            index=labels,
+        ).sort_values(f"RS{group_analytics.RS_WINDOWS[0]}", ascending=False)
+        st.dataframe(rs_table.style.format("{:.2f}", na_rep="-"), use_container_width=True)
+
+        fig = go.Figure()
+        for j, label in enumerate(labels):
+            fig.add_trace(go.Scatter(x=result['days'], y=result['rs_line'][:, j], line=dict(width=1.2), name=label))
+        fig.update_layout(height=350, margin=dict(l=10, r=10, t=10, b=10), showlegend=False, hovermode="x")
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader(f"相關係數 (近 {result['corr_days']} 日報酬)")
+        fig = go.Figure(go.Heatmap(
+            z=result['correlation'], x=labels, y=labels, zmin=-1, zmax=1, colorscale='RdBu_r',
+            hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+        ))
+        fig.update_layout(height=max(300, 28 * len(labels) + 120), margin=dict(l=10, r=10, t=10, b=10), yaxis=dict(autorange="reversed"))
+        st.plotly_chart(fig, use_container_width=True)
+
+    render_backtest(stocks)
+
+    st.write("---")
+    if st.button(f"⬅️ 返回 {group['name']}", use_container_width=True):
+        st.session_state.page = 'group_detail'
+        st.rerun()
@@ -0,0 +1,153 @@
+import os
+import re
+import uuid
+
+import streamlit as st
+
+import failure_tracker
+import market_calendar
+import quote_refresher
+import watchlist_store
+
+# ==========================================
+# 各頁面共用的 CRUD 包裝、樣式與報價顯示元件
+# 只依賴輕量模組 (不 import pandas / plotly)，首頁與個股列表只需要這些
+# ==========================================
+# 即時模式的局部更新間隔 (秒)：報價只讀背景更新的快取，K 線圖每次只增量同步尾段
+LIVE_QUOTE_REFRESH = 15
+LIVE_CHART_REFRESH = 60
+
+CSS = """
+<style>
+    /* [修改] 稍微放寬頂部留白，避免被手機狀態列切到 */
+    .block-container {
+        padding-top: 2.5rem !important;
+        padding-bottom: 5rem !important;
+    }
+    
+    /* 字體設定 */
+    .big-header { font-size: 26px !important; font-weight: bold; margin-bottom: 0px !important; line-height: 1.2; }
+    .big-price { font-size: 24px !important; margin-bottom: 0px !important; line-height: 1.2; }
+    .detail-price-main { font-size: 28px !important; font-weight: bold; }
+    .detail-price-change { font-size: 18px !important; font-weight: bold; margin-left: 10px; }
+    
+    .stock-up { color: #ff2b2b; }
+    .stock-down { color: #00b800; }
+    .stock-flat { color: gray; }
+    
+    /* 按鈕樣式 */
+    .stButton > button {
+        font-size: 20px !important;
+        height: 2.8em !important;
+        padding: 0px 5px !important;
+        font-weight: bold !important;
+        margin-top: 5px !important;
+    }
+    
+    /* 輸入框 */
+    .stTextArea textarea, .stTextInput input { font-size: 18px !important; }
+    div[data-testid="column"] { gap: 0rem !important; }
+    
+    /* 刪除按鈕 */
+    .delete-btn button {
+        background-color: #ffcccc !important;
+        color: #cc0000 !important;
+        border: 1px solid #cc0000 !important;
+    }
+</style>
+"""
+
+def inject_css():
+    # Streamlit 每次 rerun 都會清掉沒有重新送出的元件，樣式必須每次送出；
+    # 字串只在模組載入時建立一次
+    st.markdown(CSS, unsafe_allow_html=True)
+
+# 觀察清單存在共用的 SQLite (watchlist_store)：基準清單所有人共用，
+# 個人修改疊加在基準清單上並永久保存，擁有者依序決定：
+#   1. 有設定登入 (st.login) 時用登入身分
+#   2. 設定了 WATCHLIST_SHARED_OWNER 時，所有未登入的訪客共用這個擁有者的修改
+#      (選用，只適合單人或內部部署：任何訪客都能改動 / 刪除這份清單)
+#   3. 否則每個瀏覽器各自一份：隨機產生的代碼放在網址 ?wl= (加入書籤即可保留自己的修改)，
+#      代碼猜不到，不接受自訂名稱；把網址給別人等於讓對方也能編輯這份清單
+WATCHLIST_SHARED_OWNER = os.environ.get("WATCHLIST_SHARED_OWNER", "")
+ANON_TOKEN = re.compile(r"^[0-9a-f]{32}$")
+
+def current_user():
+    if st.user.get("is_logged_in"):
+        return "user:" + str(st.user.get("email") or st.user.get("sub"))
+    if WATCHLIST_SHARED_OWNER:
+        return WATCHLIST_SHARED_OWNER
+    token = st.query_params.get("wl", "")
+    if not ANON_TOKEN.match(token):
+        token = st.session_state.get("watchlist_token") or uuid.uuid4().hex
+        st.query_params["wl"] = token
+    st.session_state.watchlist_token = token
+    return "anon:" + token
+
+def add_group(name):
+    watchlist_store.add_group(current_user(), name)
+
+def delete_group(group_id):
+    watchlist_store.delete_group(current_user(), group_id)
+
+def update_group_name(group_id, new_name):
+    watchlist_store.update_group_name(current_user(), group_id, new_name)
+
+def add_stock(group_id, symbol, name):
+    watchlist_store.add_stock(current_user(), group_id, symbol, name)
+
+def delete_stock(stock_id):
+    watchlist_store.delete_stock(current_user(), stock_id)
+
+def update_stock_info(stock_id, new_symbol, new_name):
+    watchlist_store.update_stock_info(current_user(), stock_id, new_symbol, new_name)
+
+def update_note(item_type, item_id, new_note):
+    return watchlist_store.update_note(current_user(), item_type, item_id, new_note)
+
+def update_stock_ma(stock_id, new_ma):
+    return watchlist_store.update_stock_ma(current_user(), stock_id, new_ma)
+
+def get_groups(): return watchlist_store.get_groups(current_user())
+def get_stocks_by_group(group_id): return watchlist_store.get_stocks_by_group(current_user(), group_id)
+
+def render_breaker_warning():
+    breaker_state = failure_tracker.breaker.state()
+    if breaker_state['state'] == 'open':
+        st.warning(f"⚠️ Yahoo 限流中，暫停查詢 {int(breaker_state['retry_in'])} 秒，先顯示最後已知報價")
+
+def quote_html(symbol, quote):
+    price, pct, age = quote
+    if price is None:
+        return failure_display(symbol)
+    price_str = f"{price:.2f}"
+    if pct > 0: pct_str = f"<span class='stock-up'>▲ {pct:.2f}%</span>"
+    elif pct < 0: pct_str = f"<span class='stock-down'>▼ {pct:.2f}%</span>"
+    else: pct_str = f"<span class='stock-flat'>0.00%</span>"
+    age_str = f" <span class='stock-flat' style='font-size: 14px;'>{quote_refresher.format_age(age)}</span>"
+    return f"<span class='big-price'>{price_str} | {pct_str}</span>{age_str}"
+
+def render_live_quotes(slots):
+    # slots：[(symbol, st.empty())]；整頁的報價一次讀取後填入各卡片的位置
+    # 只讀背景更新維持的報價快取，不打網路
+    quotes = quote_refresher.get_quotes([symbol for symbol, _ in slots], wait_if_cold=False)
+    for symbol, slot in slots:
+        slot.markdown(quote_html(symbol, quotes[symbol]), unsafe_allow_html=True)
+
+def live_mode_toggle(symbols):
+    # 即時模式只在交易時段 (含收盤後緩衝) 啟動計時器，休市時不佔伺服器資源
+    st.toggle("⚡ 即時模式", key='live_mode')
+    if not st.session_state.live_mode:
+        return False
+    if not any(market_calendar.is_session_active(sym) for sym in symbols):
+        st.caption("休市中，即時更新暫停")
+        return False
+    return True
+
+def failure_display(symbol):
+    failure = failure_tracker.get_failure(symbol)
+    if failure is None:
+        return "<span class='big-price'>⏳ 載入中...</span>"
+    if failure['permanent']:
+        return "<span class='big-price stock-flat'>⚠️ 查無資料</span>"
+    return f"<span class='big-price stock-flat'>⚠️ 暫時無法取得 ({int(failure['retry_in'] // 60) + 1} 分鐘後重試)</span>"
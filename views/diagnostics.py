@@ -0,0 +1,63 @@
+import pandas as pd
+import streamlit as st
+
+import metrics
+
+# ==========================================
+# 頁面 6: 診斷 (隱藏頁，只能以網址 ?page=diagnostics 開啟)
+# ==========================================
+def metric_rows(name):
+    # 計數器 / 直方圖轉成表格列：每組標籤一列
+    return [dict(labels, 次數=value) for labels, value in sorted(metrics.counter_values(name).items())]
+
+def histogram_rows(name):
+    return [dict(labels, 次數=s['count'], 平均ms=round(s['avg'] * 1000, 1),
+                 p50ms=round(s['p50'] * 1000, 1), p95ms=round(s['p95'] * 1000, 1))
+            for labels, s in sorted(metrics.histogram_summary(name).items())]
+
+def render():
+    st.title("🩺 診斷")
+    server = metrics.start_http_server()
+    endpoint = f"http://{server.server_address[0]}:{server.server_address[1]}/metrics" if server else "未啟動 (METRICS_PORT)"
+    st.caption(f"已執行 {int(metrics.uptime() // 60)} 分鐘 · Prometheus 端點：{endpoint}")
+    if st.button("🔄 重新整理", use_container_width=True):
+        st.rerun()
+
+    gauges = metrics.gauge_values()
+    cols = st.columns(4)
+    cols[0].metric("排程器排隊中", int(gauges.get('fetch_scheduler_queued', 0)))
+    cols[1].metric("排程器執行中", int(gauges.get('fetch_scheduler_running', 0)))
+    cols[2].metric("背景更新代號數", int(gauges.get('quote_refresher_watched', 0)))
+    cols[3].metric("斷路器", "跳脫" if gauges.get('yahoo_breaker_open') else "正常")
+
+    st.subheader("Yahoo 請求")
+    requests_rows = metric_rows('yahoo_requests_total')
+    total = sum(r['次數'] for r in requests_rows)
+    errors = sum(r['次數'] for r in requests_rows if not r['status'].startswith('2'))
+    if total:
+        st.caption(f"共 {total} 次，錯誤率 {errors / total * 100:.1f}%，重試 {sum(r['次數'] for r in metric_rows('yahoo_retries_total'))} 次")
+    st.dataframe(pd.DataFrame(requests_rows), hide_index=True, use_container_width=True)
+    st.dataframe(pd.DataFrame(histogram_rows('yahoo_request_seconds')), hide_index=True, use_container_width=True)
+
+    st.subheader("個股 K 線同步")
+    st.dataframe(pd.DataFrame(histogram_rows('symbol_fetch_seconds')), hide_index=True, use_container_width=True)
+    st.dataframe(pd.DataFrame(metric_rows('bar_sync_total')), hide_index=True, use_container_width=True)
+
+    st.subheader("快取命中")
+    cache_rows = pd.DataFrame(metric_rows('cache_requests_total'))
+    if not cache_rows.empty:
+        cache_table = cache_rows.pivot_table(index='cache', columns='result', values='次數', aggfunc='sum', fill_value=0)
+        cache_table['命中率%'] = (cache_table.get('hit', 0) / cache_table.sum(axis=1) * 100).round(1)
+        st.dataframe(cache_table, use_container_width=True)
+
+    st.subheader("頁面與排程器")
+    st.dataframe(pd.DataFrame(histogram_rows('page_render_seconds')), hide_index=True, use_container_width=True)
+    st.dataframe(pd.DataFrame(histogram_rows('fetch_scheduler_wait_seconds')), hide_index=True, use_container_width=True)
+
+    with st.expander("Prometheus 原始輸出"):
+        st.code(metrics.render_prometheus(), language=None)
+
+    st.write("---")
+    if st.button("⬅️ 返回群組列表", use_container_width=True, key='diagnostics_back'):
+        st.session_state.page = 'home'
+        st.rerun()
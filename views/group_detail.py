@@ -0,0 +1,135 @@
+import streamlit as st
+
+import quote_refresher
+import symbol_resolver
+import watchlist_store
+from views.common import (
+    LIVE_QUOTE_REFRESH, add_stock, current_user, delete_stock, get_stocks_by_group, live_mode_toggle, quote_html,
+    render_breaker_warning, render_live_quotes, update_note, update_stock_info,
+)
+
+# ==========================================
+# 頁面 2: 個股列表
+# ==========================================
+def render_resolve_error(symbol, result):
+    # 代號驗證結果：可用時回傳 True，否則顯示原因並回傳 False
+    if result['status'] in ("ok", "resolved"):
+        return True
+    if result['status'] == "invalid":
+        st.error(f"❌ 查無 {symbol} 的資料，請確認代號 (上市 .TW / 上櫃 .TWO)")
+    else:
+        st.warning("⚠️ 暫時無法驗證代號 (網路或限流)，請稍後再試")
+    return False
+
+def render():
+    is_edit_mode = st.session_state.edit_mode
+    # 每次都從資料庫重新讀取，反映剛才的修改
+    group = watchlist_store.get_group(current_user(), st.session_state.selected_group['id']) or st.session_state.selected_group
+    st.title(f"{group['name']}")
+    
+    if is_edit_mode:
+        with st.expander("➕ 新增個股", expanded=True):
+            col_add1, col_add2 = st.columns([1, 1])
+            with col_add1:
+                new_symbol = st.text_input("代號", placeholder="例如 2330.TW")
+            with col_add2:
+                new_stock_name = st.text_input("名稱", placeholder="例如 台積電")
+            
+            if st.button("確認新增個股", use_container_width=True):
+                if new_symbol:
+                    # 先向資料來源確認代號存在 (台股自動判斷 .TW / .TWO)，查不到的不加入清單
+                    result = symbol_resolver.resolve(new_symbol)
+                    if render_resolve_error(new_symbol, result):
+                        add_stock(group['id'], result['symbol'], new_stock_name or result['name'])
+                        st.success(f"已新增 {result['symbol']}")
+                        st.rerun()
+                else:
+                    st.warning("請輸入代號")
+        st.write("---")
+    
+    stocks = get_stocks_by_group(group['id'])
+    group_quotes = quote_refresher.get_quotes([s['symbol'] for s in stocks])
+    render_breaker_warning()
+    
+    live = live_mode_toggle([s['symbol'] for s in stocks])
+    # 各卡片的報價位置；即時模式下由整頁共用的一個 fragment 依計時器更新
+    quote_slots = []
+    
+    for s in stocks:
+        with st.container(border=True):
+            if is_edit_mode:
+                col1, col_action1, col_action2 = st.columns([4, 1.2, 1.2])
+            else:
+                col1, col_action1, col_action2 = st.columns([5, 1.2, 1.2])
+            
+            with col1:
+                if "TW" in s['symbol'].upper(): stock_display_name = f"{s['symbol']} {s.get('name', '')}"
+                else: stock_display_name = f"{s['symbol']}"
+                st.markdown(f"<div class='big-header'>{stock_display_name}</div>", unsafe_allow_html=True)
+                slot = st.empty()
+                quote_slots.append((s['symbol'], slot))
+                if not live:
+                    slot.markdown(quote_html(s['symbol'], group_quotes[s['symbol']]), unsafe_allow_html=True)
+            
+            if is_edit_mode:
+                with col_action1:
+                    edit_key = f"edit_s_{s['id']}"
+                    if st.button("✏️", key=f"btn_edit_s_{s['id']}", use_container_width=True):
+                         st.session_state.active_edit_id = None if st.session_state.active_edit_id == edit_key else edit_key
+                with col_action2:
+                    if st.button("🗑️", key=f"btn_del_s_{s['id']}", use_container_width=True):
+                        delete_stock(s['id'])
+                        st.rerun()
+            else:
+                with col_action1:
+                    note_key = f"stock_{s['id']}"
+                    if st.button("筆記", key=f"btn_note_s_{s['id']}", use_container_width=True):
+                        st.session_state.active_note_id = None if st.session_state.active_note_id == note_key else note_key
+                with col_action2:
+                    if st.button("分析", key=f"btn_ana_{s['id']}", use_container_width=True):
+                        st.session_state.selected_stock = s
+                        st.session_state.detail_back = 'group_detail'
+                        st.session_state.page = 'stock_detail'
+                        st.session_state.active_note_id = None
+                        st.rerun()
+
+            if not is_edit_mode and st.session_state.active_note_id == f"stock_{s['id']}":
+                st.write("---")
+                new_note = st.text_area("筆記", value=s.get('note', ''), key=f"txt_s_{s['id']}", label_visibility="collapsed")
+                if st.button("儲存筆記", key=f"save_s_{s['id']}"):
+                    update_note('stock', s['id'], new_note)
+                    st.session_state.active_note_id = None
+                    st.success("已儲存")
+                    st.rerun()
+            
+            if is_edit_mode and st.session_state.active_edit_id == f"edit_s_{s['id']}":
+                 with st.container():
+                    edit_sym = st.text_input("代號", value=s['symbol'], key=f"ed_sym_{s['id']}")
+                    edit_nam = st.text_input("名稱", value=s.get('name',''), key=f"ed_nam_{s['id']}")
+                    if st.button("確認修改", key=f"cfm_edit_s_{s['id']}"):
+                        result = {"status": "ok", "symbol": s['symbol']}
+                        if edit_sym.strip().upper() != s['symbol']:
+                            result = symbol_resolver.resolve(edit_sym)
+                        if render_resolve_error(edit_sym, result):
+                            update_stock_info(s['id'], result['symbol'], edit_nam)
+                            st.session_state.active_edit_id = None
+                            st.success("已更新")
+                            st.rerun()
+    
+    if live:
+        # 一個計時器、每次一次報價讀取，填入全部卡片；其餘部分不動
+        st.fragment(run_every=LIVE_QUOTE_REFRESH)(render_live_quotes)(quote_slots)
+
+    # 底部區域
+    st.write("---")
+    if st.button("📊 群組分析", use_container_width=True):
+        st.session_state.page = 'group_analytics'
+        st.session_state.active_note_id = None
+        st.rerun()
+    st.toggle("⚙️ 管理模式", key='edit_mode')
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    if st.button("⬅️ 返回群組列表", use_container_width=True):
+        st.session_state.page = 'home'
+        st.session_state.active_note_id = None
+        st.rerun()
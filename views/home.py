@@ -0,0 +1,173 @@
+import time
+from concurrent.futures import as_completed
+
+import streamlit as st
+
+import failure_tracker
+import quote_refresher
+import watchlist_store
+from views.common import (
+    add_group, current_user, delete_group, get_groups, render_breaker_warning, update_group_name, update_note,
+)
+from views.transfer import render_import_export
+
+# ==========================================
+# 頁面 1: 首頁 (群組列表)
+# ==========================================
+# 冷啟動時陸續完成的報價，最多每隔這麼久 (秒) 才重畫一次受影響群組的平均
+AVERAGE_REDRAW_INTERVAL = 0.25
+
+def group_average_html(stocks_in_group, quotes, pending_symbols):
+    total_pct = 0
+    valid_count = 0
+    failed_count = 0
+    waiting_count = 0
+    for s in stocks_in_group:
+        _, pct, _ = quotes.get(s['symbol'], (None, None, None))
+        if pct is not None:
+            total_pct += pct
+            valid_count += 1
+        elif s['symbol'] in pending_symbols:
+            waiting_count += 1
+        elif failure_tracker.get_failure(s['symbol']) is not None:
+            failed_count += 1
+
+    if valid_count == 0 and waiting_count:
+        return "<div class='big-price'>平均: <span class='stock-flat'>⏳ 計算中...</span></div>"
+
+    avg_pct = (total_pct / valid_count) if valid_count > 0 else 0
+    if avg_pct > 0: avg_display = f"<span class='stock-up'>▲ {avg_pct:.2f}%</span>"
+    elif avg_pct < 0: avg_display = f"<span class='stock-down'>▼ {avg_pct:.2f}%</span>"
+    else: avg_display = f"<span class='stock-flat'>- 0.00%</span>"
+    if waiting_count:
+        avg_display += f" <span class='stock-flat' style='font-size: 14px;'>⏳ 尚有 {waiting_count} 檔</span>"
+    if failed_count:
+        avg_display += f" <span class='stock-flat' style='font-size: 14px;'>⚠️ {failed_count} 檔無報價</span>"
+    return f"<div class='big-price'>平均: {avg_display}</div>"
+
+def render():
+    is_edit_mode = st.session_state.edit_mode
+    st.title("📂 投資觀察群組")
+    
+    # 新增群組區塊
+    if is_edit_mode:
+        with st.expander("➕ 新增群組", expanded=True):
+            new_group_name = st.text_input("群組名稱", placeholder="例如：美股科技股")
+            if st.button("確認新增群組", use_container_width=True):
+                if new_group_name:
+                    add_group(new_group_name)
+                    st.success(f"已新增 {new_group_name}")
+                    st.rerun()
+                else:
+                    st.warning("請輸入名稱")
+        render_import_export()
+        st.write("---")
+
+    groups = get_groups()
+    # 全部觀察清單的報價由背景更新維持，各群組平均都從同一份結果計算，不等網路；
+    # 還沒有報價的代號立刻送出查詢，卡片先畫出來，平均值依完成順序陸續填入
+    # 整份清單一次讀出再依群組分組 (不必每個群組各查一次資料庫)
+    stocks_by_group = {}
+    for s in watchlist_store.get_all_stocks(current_user()):
+        stocks_by_group.setdefault(s['group_id'], []).append(s)
+    all_symbols = sorted({s['symbol'] for stocks in stocks_by_group.values() for s in stocks})
+    all_quotes = quote_refresher.get_quotes(all_symbols, wait_if_cold=False)
+    pending_futures = quote_refresher.fetch_missing(all_symbols)
+    pending_symbols = set(pending_futures)
+    ages = [age for _, _, age in all_quotes.values() if age is not None]
+    if ages:
+        st.caption(f"報價更新於 {quote_refresher.format_age(max(ages))}")
+    render_breaker_warning()
+    avg_placeholders = {}
+    groups_by_symbol = {}
+    
+    for g in groups:
+        stocks_in_group = stocks_by_group.get(g['id'], [])
+        for s in stocks_in_group:
+            groups_by_symbol.setdefault(s['symbol'], set()).add(g['id'])
+
+        with st.container(border=True):
+            if is_edit_mode:
+                col_text, col_action1, col_action2 = st.columns([4, 1.2, 1.2])
+            else:
+                col_text, col_action1, col_action2 = st.columns([5, 1.2, 1.2])
+            
+            with col_text:
+                st.markdown(f"<div class='big-header'>{g['name']}</div>", unsafe_allow_html=True)
+                avg_placeholders[g['id']] = (st.empty(), stocks_in_group)
+                avg_placeholders[g['id']][0].markdown(group_average_html(stocks_in_group, all_quotes, pending_symbols), unsafe_allow_html=True)
+
+            if is_edit_mode:
+                with col_action1:
+                    edit_key = f"edit_g_{g['id']}"
+                    if st.button("✏️", key=f"btn_edit_g_{g['id']}", use_container_width=True):
+                        st.session_state.active_edit_id = None if st.session_state.active_edit_id == edit_key else edit_key
+                with col_action2:
+                    if st.button("🗑️", key=f"btn_del_g_{g['id']}", use_container_width=True):
+                        delete_group(g['id'])
+                        st.rerun()
+            else:
+                with col_action1:
+                    note_key = f"group_{g['id']}"
+                    if st.button("筆記", key=f"btn_note_g_{g['id']}", use_container_width=True):
+                        st.session_state.active_note_id = None if st.session_state.active_note_id == note_key else note_key
+                with col_action2:
+                    if st.button("進入", key=f"btn_enter_{g['id']}", use_container_width=True):
+                        st.session_state.selected_group = g
+                        st.session_state.page = 'group_detail'
+                        st.session_state.active_note_id = None
+                        st.rerun()
+            
+            # 隱藏區域
+            if not is_edit_mode and st.session_state.active_note_id == f"group_{g['id']}":
+                with st.container():
+                    new_note = st.text_area("筆記", value=g.get('note', ''), key=f"txt_g_{g['id']}", label_visibility="collapsed")
+                    if st.button("儲存筆記", key=f"save_g_{g['id']}"):
+                        update_note('group', g['id'], new_note)
+                        st.session_state.active_note_id = None
+                        st.success("已儲存")
+                        st.rerun()
+            
+            if is_edit_mode and st.session_state.active_edit_id == f"edit_g_{g['id']}":
+                with st.container():
+                    new_name_input = st.text_input("修改名稱", value=g['name'], key=f"inp_edit_g_{g['id']}")
+                    if st.button("確認修改", key=f"cfm_edit_g_{g['id']}"):
+                        update_group_name(g['id'], new_name_input)
+                        st.session_state.active_edit_id = None
+                        st.success("已更新")
+                        st.rerun()
+
+    # 管理模式開關
+    st.write("---")
+    if st.button("🔎 選股", use_container_width=True):
+        st.session_state.page = 'screener'
+        st.session_state.active_note_id = None
+        st.rerun()
+    st.toggle("⚙️ 管理模式", key='edit_mode')
+
+    # 整頁畫完後才等待冷啟動的報價，依完成順序更新受影響群組的平均
+    # 以代號 -> 群組對照找出受影響的群組，累積一小段時間再一起重畫
+    if pending_futures:
+        future_to_symbol = {future: sym for sym, future in pending_futures.items()}
+        dirty = set()
+        last_redraw = time.perf_counter()
+
+        def redraw():
+            for group_id in dirty:
+                placeholder, stocks_in_group = avg_placeholders[group_id]
+                placeholder.markdown(group_average_html(stocks_in_group, all_quotes, pending_symbols), unsafe_allow_html=True)
+            dirty.clear()
+
+        try:
+            for future in as_completed(future_to_symbol, timeout=quote_refresher.COLD_START_WAIT):
+                sym = future_to_symbol[future]
+                price, pct = future.result()
+                all_quotes[sym] = (price, pct, 0 if price is not None else None)
+                pending_symbols.discard(sym)
+                dirty.update(groups_by_symbol.get(sym, ()))
+                if time.perf_counter() - last_redraw >= AVERAGE_REDRAW_INTERVAL:
+                    redraw()
+                    last_redraw = time.perf_counter()
+        except TimeoutError:
+            pass
+        redraw()
@@ -0,0 +1,76 @@
+import streamlit as st
+
+import panel
+import quote_refresher
+import screener
+import watchlist_store
+from views.common import current_user
+
+# ==========================================
+# 頁面 5: 選股器
+# ==========================================
+# 選股器預設條件
+SCREENER_PRESETS = {
+    "站上月線且爆量": "CLOSE > MA20 AND VR20 > 2",
+    "黃金交叉 (MA5 穿越 MA20)": "MA5 CROSSUP MA20",
+    "創 60 日新高": "CLOSE > HIGH60",
+    "今日漲幅 3% 以上": "PCT1 >= 3",
+}
+
+def render():
+    st.title("🔎 選股")
+    all_stocks = watchlist_store.get_all_stocks(current_user())
+    all_symbols = sorted({s['symbol'] for s in all_stocks})
+    # 還沒有本地歷史的代號交給背景補抓
+    quote_refresher.watch(all_symbols)
+    quote_refresher.warm_histories()
+
+    preset = st.selectbox("常用條件", list(SCREENER_PRESETS))
+    rule_text = st.text_input("條件", value=SCREENER_PRESETS[preset], key=f"rule_{preset}")
+    rank_text = st.text_input("排序 (由大到小)", value="PCT1")
+    st.caption("可用：CLOSE、VOLUME、MA20、VMA20、PCT1 (漲跌%)、HIGH60 / LOW60 (前 N 日高低)、VR20 (量比)；"
+               "比較 > < >= <=、CROSSUP / CROSSDOWN (今日穿越)；多個條件以 AND 連接")
+
+    try:
+        conditions = screener.parse_rules(rule_text)
+        rank_by = screener.parse_rank(rank_text)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+    else:
+        price_panel = panel.get_panel(all_symbols)
+        results = screener.screen(price_panel, conditions, rank_by)
+        if len(price_panel['days']):
+            st.caption(f"資料日期 {price_panel['days'][-1]}，共 {len(all_symbols)} 檔，符合 {len(results)} 檔")
+        if price_panel['missing']:
+            st.caption(f"⚠️ {len(price_panel['missing'])} 檔尚無歷史資料，未納入篩選")
+
+        stocks_by_symbol = {}
+        for s in all_stocks:
+            stocks_by_symbol.setdefault(s['symbol'], s)
+        for r in results:
+            s = stocks_by_symbol[r['symbol']]
+            pct = r['values']['PCT1']
+            color_class = "stock-up" if pct > 0 else ("stock-down" if pct < 0 else "stock-flat")
+            extra = "、".join(f"{name} {value:,.2f}" for name, value in r['values'].items() if name not in ("CLOSE", "PCT1"))
+            with st.container(border=True):
+                col1, col2 = st.columns([5, 1.2])
+                with col1:
+                    st.markdown(f"<div class='big-header'>{s['symbol']} {s.get('name', '')}</div>", unsafe_allow_html=True)
+                    st.markdown(
+                        f"<span class='big-price'>{r['values']['CLOSE']:.2f}</span> "
+                        f"<span class='big-price {color_class}'>({pct:+.2f}%)</span> "
+                        f"<span class='stock-flat' style='font-size: 14px;'>{extra}</span>",
+                        unsafe_allow_html=True,
+                    )
+                with col2:
+                    if st.button("分析", key=f"btn_scr_{r['symbol']}", use_container_width=True):
+                        st.session_state.selected_stock = s
+                        st.session_state.selected_group = watchlist_store.get_group(current_user(), s['group_id'])
+                        st.session_state.detail_back = 'screener'
+                        st.session_state.page = 'stock_detail'
+                        st.rerun()
+
+    st.write("---")
+    if st.button("⬅️ 返回群組列表", use_container_width=True):
+        st.session_state.page = 'home'
+        st.rerun()
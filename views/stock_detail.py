@@ -0,0 +1,232 @@
+import datetime
+
+import plotly.graph_objects as go
+import streamlit as st
+
+import backtest
+import downsample
+import indicators
+import watchlist_store
+from stock_data import RESAMPLE_RULES, fetch_stock_data_direct
+from views.common import LIVE_CHART_REFRESH, LIVE_QUOTE_REFRESH, current_user, live_mode_toggle, update_stock_ma
+
+# ==========================================
+# 頁面 3: K線圖詳細頁
+# ==========================================
+# K線圖可加選的指標 (疊在 K 線上，或另開下方副圖)
+EXTRA_INDICATORS = {"EMA12": "EMA 12", "BB20/2": "布林通道", "VMA5": "成交量 / 均量", "RSI14": "RSI 14", "MACD12/26/9": "MACD"}
+LOWER_PANE_INDICATORS = ("VMA5", "RSI14", "MACD12/26/9")
+# K 線週期與各週期可選的區間 (週 K / 月 K 由日線在本地重新取樣)
+CHART_INTERVALS = {"1分": "1m", "5分": "5m", "60分": "1h", "日K": "1d", "週K": "1wk", "月K": "1mo"}
+CHART_RANGES = {
+    "1m": ("1d", "5d"), "5m": ("1d", "5d", "1mo"), "1h": ("1mo", "6mo", "1y"),
+    "1d": ("3mo", "6mo", "1y", "2y", "5y", "max"), "1wk": ("1y", "2y", "5y", "10y", "max"), "1mo": ("5y", "10y", "max"),
+}
+DEFAULT_RANGE = {"1m": "1d", "5m": "5d", "1h": "1mo", "1d": "6mo", "1wk": "2y", "1mo": "10y"}
+RANGE_LABELS = {
+    "1d": "1日", "5d": "5日", "1mo": "1個月", "3mo": "3個月", "6mo": "6個月",
+    "1y": "1年", "2y": "2年", "5y": "5年", "10y": "10年", "max": "全部",
+}
+INTRADAY_INTERVALS = ("1m", "5m", "1h")
+# 均線回測結果表顯示的組合數
+BACKTEST_TOP = 10
+
+def line_trace(index, values, **kwargs):
+    # 指標線以 LTTB 降採樣後用 WebGL 繪製，點數固定有上限
+    x, y = downsample.lttb(index, values)
+    return go.Scattergl(x=x, y=y, mode='lines', **kwargs)
+
+def bar_trace(index, values, **kwargs):
+    x, y = downsample.lttb(index, values)
+    return go.Bar(x=x, y=y, **kwargs)
+
+def render_price_header(symbol):
+    # 報價列以日線最後兩根計算 (由本地標準序列裁切，只同步尾段)
+    try:
+        daily = fetch_stock_data_direct(symbol, range_str="5d")
+    except Exception as e:
+        st.error(f"發生未預期的錯誤: {e}")
+        return
+    if daily is None or len(daily) < 2:
+        st.error(f"❌ 無法取得 {symbol} 資料。")
+        return
+    latest = daily.iloc[-1]
+    prev = daily.iloc[-2]
+    price = latest['Close']
+    change = price - prev['Close']
+    pct = (change / prev['Close']) * 100
+    
+    sign = "+" if change > 0 else ""
+    color_class = "stock-up" if change > 0 else ("stock-down" if change < 0 else "stock-flat")
+    
+    price_html = f"""
+    <div style='margin-bottom: 10px;'>
+        <span class='detail-price-main'>{price:.2f}</span>
+        <span class='detail-price-change {color_class}'>{sign}{change:.2f} ({sign}{pct:.2f}%)</span>
+    </div>
+    """
+    st.markdown(price_html, unsafe_allow_html=True)
+
+def render_chart(stock):
+    try:
+        interval = CHART_INTERVALS[st.radio(
+            "K線週期", list(CHART_INTERVALS), index=list(CHART_INTERVALS).index("日K"),
+            horizontal=True, label_visibility="collapsed", key=f"interval_{stock['id']}",
+        )]
+        ranges = CHART_RANGES[interval]
+        range_str = st.radio(
+            "區間", ranges, index=ranges.index(DEFAULT_RANGE[interval]), format_func=lambda r: RANGE_LABELS[r],
+            horizontal=True, label_visibility="collapsed", key=f"range_{stock['id']}_{interval}",
+        )
+        with st.spinner('資料下載中...'):
+            # 各區間都由同一條標準序列在本地裁切、取樣；即時模式下每次只增量同步尾段
+            df = fetch_stock_data_direct(stock['symbol'], range_str=range_str, interval=interval)
+
+        if df is None or df.empty:
+            st.error(f"❌ 無法取得 {stock['symbol']} 資料。")
+            return
+
+        # 均線與其他指標由指標引擎一次計算 (依最後一根 K 棒快取)
+        extra_keys = st.multiselect(
+            "其他指標", list(EXTRA_INDICATORS), format_func=lambda k: EXTRA_INDICATORS[k],
+            key=f"indicators_{stock['id']}", label_visibility="collapsed", placeholder="加入其他指標",
+        )
+        ma_items = indicators.ma_spec(stock['ma_settings'])
+        spec = ma_items + indicators.parse_spec(",".join(extra_keys))
+        if interval not in RESAMPLE_RULES:
+            ind_ts, ind_values = indicators.compute_indicators(stock['symbol'], spec, interval)
+            aligned = indicators.align_to_index(ind_ts, ind_values, df.index)
+        else:
+            aligned = indicators.compute_for_frame(df, spec)
+
+        # Streamlit 收不到 Plotly 的縮放事件，改由顯示範圍滑桿縮放：
+        # 範圍縮小後從原始解析度重新裁切，再降採樣送出
+        if len(df) > downsample.MAX_CANDLES:
+            times = df.index.tz_localize(None)
+            intraday = interval in INTRADAY_INTERVALS
+            view_start, view_end = st.slider(
+                "顯示範圍", min_value=times[0].to_pydatetime(), max_value=times[-1].to_pydatetime(),
+                value=(times[0].to_pydatetime(), times[-1].to_pydatetime()),
+                step=datetime.timedelta(minutes=1) if intraday else datetime.timedelta(days=1),
+                format="MM/DD HH:mm" if intraday else "YYYY/MM/DD",
+                label_visibility="collapsed", key=f"zoom_{stock['id']}_{interval}_{range_str}",
+            )
+            in_view = (times >= view_start) & (times <= view_end)
+            df = df[in_view]
+            aligned = {name: values[in_view] for name, values in aligned.items()}
+        candles = downsample.ohlc_buckets(df)
+        if len(candles) < len(df):
+            st.caption(f"共 {len(df)} 根 K 棒，每 {-(-len(df) // len(candles))} 根合併顯示；縮小顯示範圍可看到原始 K 棒")
+
+        lower_panes = [k for k in extra_keys if k in LOWER_PANE_INDICATORS]
+        if lower_panes:
+            from plotly.subplots import make_subplots
+            fig = make_subplots(
+                rows=1 + len(lower_panes), cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                row_heights=[3] + [1] * len(lower_panes),
+            )
+        else:
+            fig = go.Figure()
+        price_row = dict(row=1, col=1) if lower_panes else {}
+
+        fig.add_trace(go.Candlestick(
+            x=candles.index, open=candles['Open'], high=candles['High'], low=candles['Low'], close=candles['Close'],
+            name='K線', increasing_line_color='red', increasing_fillcolor='red',
+            decreasing_line_color='green', decreasing_fillcolor='green'
+        ), **price_row)
+            
+        colors = ['#FFA500', '#0000FF', '#800080', '#008000']
+        for i, (_, ma_day) in enumerate(ma_items):
+            color = colors[i % len(colors)]
+            fig.add_trace(line_trace(df.index, aligned[f"MA{ma_day}"], line=dict(color=color, width=1.5), name=f'MA {ma_day}'), **price_row)
+
+        if "EMA12" in extra_keys:
+            fig.add_trace(line_trace(df.index, aligned["EMA12"], line=dict(color='#00A0A0', width=1.5), name='EMA 12'), **price_row)
+        if "BB20/2" in extra_keys:
+            fig.add_trace(line_trace(df.index, aligned["BB20/2_upper"], line=dict(color='gray', width=1, dash='dot'), name='布林上軌'), **price_row)
+            fig.add_trace(line_trace(df.index, aligned["BB20/2_lower"], line=dict(color='gray', width=1, dash='dot'), name='布林下軌'), **price_row)
+
+        for row, key in enumerate(lower_panes, start=2):
+            if key == "VMA5":
+                fig.add_trace(bar_trace(df.index, df['Volume'], marker_color='lightgray', name='成交量'), row=row, col=1)
+                fig.add_trace(line_trace(df.index, aligned["VMA5"], line=dict(color='#FFA500', width=1.5), name='均量 5'), row=row, col=1)
+            elif key == "RSI14":
+                fig.add_trace(line_trace(df.index, aligned["RSI14"], line=dict(color='#800080', width=1.5), name='RSI 14'), row=row, col=1)
+            elif key == "MACD12/26/9":
+                fig.add_trace(bar_trace(df.index, aligned["MACD12/26/9_hist"], marker_color='lightgray', name='MACD 柱'), row=row, col=1)
+                fig.add_trace(line_trace(df.index, aligned["MACD12/26/9"], line=dict(color='#0000FF', width=1.5), name='DIF'), row=row, col=1)
+                fig.add_trace(line_trace(df.index, aligned["MACD12/26/9_signal"], line=dict(color='#FFA500', width=1.5), name='訊號線'), row=row, col=1)
+
+        fig.update_layout(
+            height=450 + 150 * len(lower_panes), xaxis_rangeslider_visible=False,
+            margin=dict(l=10, r=10, t=10, b=10), legend=dict(orientation="h", y=1.02, x=0)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.write("") 
+        col_input, col_save = st.columns([1, 1]) 
+        with col_input:
+            new_ma = st.text_input("MA設定", value=stock['ma_settings'], label_visibility="collapsed")
+        with col_save:
+            if st.button("更新均線", use_container_width=True):
+                update_stock_ma(stock['id'], new_ma)
+                st.success("OK")
+                st.rerun()
+
+    except Exception as e:
+        st.error(f"發生未預期的錯誤: {e}")
+
+def backtest_rows(result, order):
+    return {
+        "均線": [f"{result['fast'][i]} / {result['slow'][i]}" for i in order],
+        "報酬%": [result['return'][i] * 100 for i in order],
+        "勝率%": [result['hit_rate'][i] * 100 for i in order],
+        "最大回撤%": [result['max_drawdown'][i] * 100 for i in order],
+        "交易次數": [int(result['trades'][i]) for i in order],
+        "持有比例%": [result['exposure'][i] * 100 for i in order],
+    }
+
+BACKTEST_COLUMNS = {
+    name: st.column_config.NumberColumn(format="%.1f") for name in ("報酬%", "勝率%", "最大回撤%", "持有比例%")
+}
+
+def render_backtest(stock):
+    # 以本地日線回測數百組均線交叉參數 (結果依 K 線版本快取)，可一鍵套用建議的均線設定
+    if not st.toggle("🧪 均線回測", key=f"backtest_{stock['id']}"):
+        return
+    result = backtest.sweep_symbol(stock['symbol'])
+    order = backtest.ranking(result)
+    if not len(order):
+        st.info(f"歷史資料不足 ({result['days']} 個交易日)，無法回測")
+        return
+    st.caption(
+        f"近 {result['days']} 個交易日、{len(result['fast'])} 組參數；短均線在長均線之上時持有，"
+        f"每次進出場扣 {backtest.TRADE_COST:.1%} 成本。買進持有報酬 {result['buy_hold']:+.1%}"
+    )
+    st.dataframe(backtest_rows(result, order[:BACKTEST_TOP]), column_config=BACKTEST_COLUMNS, hide_index=True, use_container_width=True)
+    suggestion = backtest.suggest(result)
+    if suggestion != stock['ma_settings'] and st.button(f"套用建議均線 {suggestion}", use_container_width=True, key=f"apply_bt_{stock['id']}"):
+        update_stock_ma(stock['id'], suggestion)
+        st.rerun()
+
+def render():
+    stock = watchlist_store.get_stock(current_user(), st.session_state.selected_stock['id']) or st.session_state.selected_stock
+    
+    if "TW" in stock['symbol'].upper(): title_str = f"{stock['symbol']} {stock.get('name', '')}"
+    else: title_str = f"{stock['symbol']}"
+    st.title(title_str)
+    
+    live = live_mode_toggle([stock['symbol']])
+    # 報價列與 K 線圖各自是 fragment：切換指標 / 區間只重跑圖表，即時模式下依計時器局部更新
+    st.fragment(run_every=LIVE_QUOTE_REFRESH if live else None)(render_price_header)(stock['symbol'])
+    st.fragment(run_every=LIVE_CHART_REFRESH if live else None)(render_chart)(stock)
+    st.fragment(render_backtest)(stock)
+
+    st.write("---")
+    if st.session_state.detail_back == 'screener':
+        if st.button("⬅️ 返回選股", use_container_width=True):
+            st.session_state.page = 'screener'
+            st.rerun()
+    elif st.button(f"⬅️ 返回 {st.session_state.selected_group['name']}", use_container_width=True):
+        st.session_state.page = 'group_detail'
+        st.rerun()
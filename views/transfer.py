@@ -0,0 +1,47 @@
+import streamlit as st
+
+import watchlist_io
+from views.common import current_user
+
+# ==========================================
+# 首頁管理模式：觀察清單批次匯入 / 匯出
+# ==========================================
+def render_report(report):
+    st.success(f"已匯入 {report['added']} 檔" + (f"，新增群組：{'、'.join(report['groups_added'])}" if report['groups_added'] else ""))
+    if report['resolved']:
+        st.info("已自動補上 / 修正後綴：" + "、".join(f"{src} → {dst}" for src, dst in report['resolved']))
+    if report['duplicates']:
+        st.caption(f"群組內已有，略過 {len(report['duplicates'])} 檔：{'、'.join(report['duplicates'])}")
+    if report['invalid']:
+        st.warning(f"查無資料，未匯入 {len(report['invalid'])} 檔：{'、'.join(report['invalid'])}")
+    if report['errors']:
+        st.warning(f"暫時無法驗證 (網路或限流)，未匯入 {len(report['errors'])} 檔，請稍後重新匯入：{'、'.join(report['errors'])}")
+
+def render_import_export():
+    with st.expander("📥 匯入 / 📤 匯出"):
+        groups = watchlist_io.export_groups(current_user())
+        col_csv, col_json = st.columns(2)
+        with col_csv:
+            # 加上 BOM，Excel 開啟時中文名稱才不會亂碼
+            st.download_button("匯出 CSV", watchlist_io.to_csv(groups).encode("utf-8-sig"), file_name="watchlist.csv",
+                               mime="text/csv", use_container_width=True)
+        with col_json:
+            st.download_button("匯出 JSON", watchlist_io.to_json(groups).encode("utf-8"), file_name="watchlist.json",
+                               mime="application/json", use_container_width=True)
+
+        uploaded = st.file_uploader("匯入 CSV / JSON", type=["csv", "json"])
+        st.caption("CSV 欄位：group, symbol, name, ma_settings, note, group_note；台股代號可不寫 .TW / .TWO，匯入時自動判斷")
+        if uploaded is not None and st.button("確認匯入", use_container_width=True):
+            try:
+                parsed = watchlist_io.parse(uploaded.getvalue(), uploaded.name)
+            except ValueError as e:
+                st.error(f"檔案格式錯誤: {e}")
+                return
+            with st.spinner("驗證代號中..."):
+                # 匯入結果存到 session，重跑 (更新群組列表) 之後再顯示
+                st.session_state.import_report = watchlist_io.import_groups(current_user(), parsed)
+            st.rerun()
+
+        report = st.session_state.pop('import_report', None)
+        if report is not None:
+            render_report(report)
@@ -0,0 +1,181 @@
+import csv
+import io
+import json
+
+import symbol_resolver
+import watchlist_store
+
+# ==========================================
+# 觀察清單匯入 / 匯出 (CSV / JSON)
+#   CSV   一列一檔個股，欄位 group, symbol, name, ma_settings, note, group_note
+#         (只有群組、沒有個股時 symbol 留空)
+#   JSON  {"groups": [{"name", "note", "stocks": [{"symbol", "name", "ma_settings", "note"}]}]}
+# 匯入時全部代號一次批次驗證並判斷後綴 (symbol_resolver)，查不到的代號不匯入；
+# 群組依名稱合併到既有群組，同群組已有的代號略過
+# ==========================================
+CSV_COLUMNS = ("group", "symbol", "name", "ma_settings", "note", "group_note")
+DEFAULT_MA = "5,10,20"
+
+# --- 匯出 ---
+def export_groups(owner):
+    stocks_by_group = {}
+    for s in watchlist_store.get_all_stocks(owner):
+        stocks_by_group.setdefault(s["group_id"], []).append(s)
+    return [
+        {
+            "name": g["name"], "note": g["note"],
+            "stocks": [{"symbol": s["symbol"], "name": s["name"], "ma_settings": s["ma_settings"], "note": s["note"]}
+                       for s in stocks_by_group.get(g["id"], [])],
+        }
+        for g in watchlist_store.get_groups(owner)
+    ]
+
+def to_json(groups):
+    return json.dumps({"groups": groups}, ensure_ascii=False, indent=2)
+
+def to_csv(groups):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+    for g in groups:
+        if not g["stocks"]:
+            writer.writerow([g["name"], "", "", "", "", g["note"]])
+        for s in g["stocks"]:
+            writer.writerow([g["name"], s["symbol"], s["name"], s["ma_settings"], s["note"], g["note"]])
+    return buf.getvalue()
+
+# --- 解析 (格式錯誤丟出 ValueError) ---
+def _group(groups, name, note=""):
+    name = name.strip()
+    if not name:
+        raise ValueError("群組名稱不可空白")
+    if name not in groups:
+        groups[name] = {"name": name, "note": note, "stocks": []}
+    elif note and not groups[name]["note"]:
+        groups[name]["note"] = note
+    return groups[name]
+
+def _stock(item):
+    if isinstance(item, str):
+        item = {"symbol": item}
+    return {
+        "symbol": str(item.get("symbol") or "").strip().upper(),
+        "name": str(item.get("name") or "").strip(),
+        "ma_settings": str(item.get("ma_settings") or "").strip(),
+        "note": str(item.get("note") or ""),
+    }
+
+def _json_text(value, where):
+    # JSON 的文字欄位只接受字串 (缺少或 null 視為空白)；數字也接受，代號常被寫成 2330
+    if value is None:
+        return ""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"{where} 必須是字串")
+    return str(value)
+
+def _json_stock(item, where):
+    if isinstance(item, str):
+        item = {"symbol": item}
+    if not isinstance(item, dict):
+        raise ValueError(f"{where} 必須是代號字串或物件")
+    return _stock({key: _json_text(item.get(key), f"{where}.{key}") for key in ("symbol", "name", "ma_settings", "note")})
+
+def _parse_json(text):
+    data = json.loads(text)
+    items = data.get("groups") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise ValueError("JSON 需要 groups 陣列")
+    groups = {}
+    for i, item in enumerate(items):
+        where = f"groups[{i}]"
+        if not isinstance(item, dict):
+            raise ValueError(f"{where} 必須是物件")
+        if not isinstance(item.get("name"), str):
+            raise ValueError(f"{where}.name 必須是字串")
+        stocks = item.get("stocks") or []
+        if not isinstance(stocks, list):
+            raise ValueError(f"{where}.stocks 必須是陣列")
+        group = _group(groups, item["name"], _json_text(item.get("note"), f"{where}.note"))
+        parsed = (_json_stock(s, f"{where}.stocks[{j}]") for j, s in enumerate(stocks))
+        group["stocks"].extend(s for s in parsed if s["symbol"])
+    return list(groups.values())
+
+def _read_csv(text):
+    reader = csv.DictReader(io.StringIO(text))
+    fields = {(f or "").strip().lower(): f for f in reader.fieldnames or []}
+    if "group" not in fields or "symbol" not in fields:
+        raise ValueError("CSV 需要 group 與 symbol 欄位")
+    groups = {}
+    for row in reader:
+        row = {key: row.get(original) or "" for key, original in fields.items()}
+        if not row["group"].strip() and not row["symbol"].strip():
+            continue
+        group = _group(groups, row["group"], row.get("group_note", ""))
+        stock = _stock(row)
+        if stock["symbol"]:
+            group["stocks"].append(stock)
+    return list(groups.values())
+
+def _parse_csv(text):
+    # csv 模組自己的格式錯誤 (欄位過長、引號未關閉等) 也轉成 ValueError，頁面才會顯示錯誤訊息
+    try:
+        return _read_csv(text)
+    except csv.Error as e:
+        raise ValueError(f"CSV 格式錯誤：{e}") from e
+
+def parse(data, filename=""):
+    # 依副檔名判斷格式，沒有副檔名時看內容開頭；接受有 BOM 的 UTF-8 (Excel 存出的 CSV)
+    try:
+        text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    except UnicodeDecodeError as e:
+        raise ValueError("檔案必須是 UTF-8 編碼") from e
+    name = filename.lower()
+    if name.endswith(".json") or (not name.endswith(".csv") and text.lstrip()[:1] in ("{", "[")):
+        return _parse_json(text)
+    return _parse_csv(text)
+
+# --- 匯入 ---
+def _valid_ma(text):
+    parts = [p.strip() for p in text.split(",") if p.strip()]
+    return text if parts and all(p.isdigit() and int(p) > 0 for p in parts) else DEFAULT_MA
+
+def import_groups(owner, groups):
+    # 回傳匯入報告：新增的群組、新增檔數、改用其他後綴 / 重複 / 查無資料 / 無法驗證的代號
+    results = symbol_resolver.resolve_many(s["symbol"] for g in groups for s in g["stocks"])
+    group_ids = {g["name"]: g["id"] for g in watchlist_store.get_groups(owner)}
+    present = {}
+    for s in watchlist_store.get_all_stocks(owner):
+        present.setdefault(s["group_id"], set()).add(s["symbol"])
+
+    report = {"groups_added": [], "added": 0, "resolved": [], "duplicates": [], "invalid": [], "errors": []}
+    rows = []
+    for g in groups:
+        group_id = group_ids.get(g["name"])
+        if group_id is None:
+            group_id = watchlist_store.add_group(owner, g["name"])
+            if g["note"]:
+                watchlist_store.update_note(owner, "group", group_id, g["note"])
+            group_ids[g["name"]] = group_id
+            report["groups_added"].append(g["name"])
+        symbols = present.setdefault(group_id, set())
+        for s in g["stocks"]:
+            result = results[s["symbol"]]
+            if result["status"] == "invalid":
+                report["invalid"].append(s["symbol"])
+                continue
+            if result["status"] == "error":
+                report["errors"].append(s["symbol"])
+                continue
+            if result["status"] == "resolved":
+                report["resolved"].append((s["symbol"], result["symbol"]))
+            if result["symbol"] in symbols:
+                report["duplicates"].append(result["symbol"])
+                continue
+            symbols.add(result["symbol"])
+            rows.append({
+                "group_id": group_id, "symbol": result["symbol"], "name": s["name"] or result["name"],
+                "ma_settings": _valid_ma(s["ma_settings"]), "note": s["note"],
+            })
+    watchlist_store.add_stocks(owner, rows)
+    report["added"] = len(rows)
+    return report
@@ -0,0 +1,133 @@
+# ==========================================
+# 觀察清單預設資料 (資料庫 V17 - 資訊服務與銅箔基板新增版)
+# 只在 watchlist_store 初始化空資料庫時寫入，作為所有使用者共用的基準清單
+# ==========================================
+
+DEFAULT_GROUPS = [
+    {"id": 1, "name": "記憶體", "note": ""},
+    {"id": 2, "name": "IC載板", "note": ""},
+    {"id": 3, "name": "矽光子", "note": ""},
+    {"id": 4, "name": "電子通路", "note": ""},
+    {"id": 5, "name": "太陽能", "note": ""},
+    {"id": 6, "name": "低軌衛星", "note": ""},
+    {"id": 7, "name": "半導體測試", "note": ""},
+    {"id": 8, "name": "面板", "note": ""},
+    {"id": 9, "name": "散熱", "note": ""},
+    {"id": 10, "name": "高階玻纖布", "note": ""},
+    {"id": 11, "name": "被動元件", "note": ""},
+    {"id": 12, "name": "半導體設備", "note": ""},
+    {"id": 13, "name": "電子五哥", "note": ""},
+    {"id": 14, "name": "CCL", "note": ""},
+    {"id": 15, "name": "重電", "note": ""},
+    {"id": 16, "name": "資訊服務", "note": ""},
+    {"id": 17, "name": "銅箔基板", "note": ""},
+]
+
+DEFAULT_STOCKS = [
+    # Group 1: 記憶體
+    {"id": 101, "symbol": "2344.TW", "name": "華邦電", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+    {"id": 102, "symbol": "3006.TW", "name": "晶豪科", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+    {"id": 103, "symbol": "8299.TWO", "name": "群聯", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+    {"id": 104, "symbol": "2408.TW", "name": "南亞科", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+    {"id": 105, "symbol": "4967.TW", "name": "十銓", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+    {"id": 106, "symbol": "2337.TW", "name": "旺宏", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+    {"id": 107, "symbol": "3260.TWO", "name": "威剛", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+    {"id": 108, "symbol": "3135.TWO", "name": "凌航", "group_id": 1, "ma_settings": "5,10,20", "note": ""},
+
+    # Group 2: IC載板
+    {"id": 201, "symbol": "3037.TW", "name": "欣興", "group_id": 2, "ma_settings": "5,10,20", "note": "ABF"},
+    {"id": 202, "symbol": "3189.TW", "name": "景碩", "group_id": 2, "ma_settings": "5,10,20", "note": "ABF/BT"},
+    {"id": 203, "symbol": "8046.TW", "name": "南電", "group_id": 2, "ma_settings": "5,10,20", "note": "ABF"},
+    {"id": 204, "symbol": "4958.TW", "name": "臻鼎-KY", "group_id": 2, "ma_settings": "5,10,20", "note": "PCB"},
+    {"id": 205, "symbol": "2383.TW", "name": "台光電", "group_id": 2, "ma_settings": "5,10,20", "note": "CCL"},
+
+    # Group 3: 矽光子
+    {"id": 301, "symbol": "6451.TW", "name": "訊芯-KY", "group_id": 3, "ma_settings": "5,10,20", "note": ""},
+    {"id": 302, "symbol": "3363.TWO", "name": "上詮", "group_id": 3, "ma_settings": "5,10,20", "note": ""},
+    {"id": 303, "symbol": "3163.TWO", "name": "波若威", "group_id": 3, "ma_settings": "5,10,20", "note": ""},
+    {"id": 304, "symbol": "6442.TW", "name": "光聖", "group_id": 3, "ma_settings": "5,10,20", "note": ""},
+    {"id": 305, "symbol": "4979.TWO", "name": "華星光", "group_id": 3, "ma_settings": "5,10,20", "note": ""},
+    {"id": 306, "symbol": "2345.TW", "name": "智邦", "group_id": 3, "ma_settings": "5,10,20", "note": ""},
+    {"id": 307, "symbol": "2455.TW", "name": "全新", "group_id": 3, "ma_settings": "5,10,20", "note": ""},
+    {"id": 308, "symbol": "6588.TWO", "name": "東典光電", "group_id": 3, "ma_settings": "5,10,20", "note": "濾光片"},
+    {"id": 309, "symbol": "6426.TWO", "name": "統新", "group_id": 3, "ma_settings": "5,10,20", "note": "濾光片"},
+    {"id": 310, "symbol": "7728.TWO", "name": "光矩科", "group_id": 3, "ma_settings": "5,10,20", "note": "LPO透鏡/興櫃"},
+
+    # Group 4: 電子通路
+    {"id": 401, "symbol": "8096.TWO", "name": "擎亞", "group_id": 4, "ma_settings": "5,10,20", "note": "IC通路"},
+    {"id": 402, "symbol": "3028.TW", "name": "增你強", "group_id": 4, "ma_settings": "5,10,20", "note": "IC通路"},
+
+    # Group 5: 太陽能
+    {"id": 501, "symbol": "3576.TW", "name": "聯合再生", "group_id": 5, "ma_settings": "5,10,20", "note": ""},
+    {"id": 502, "symbol": "6244.TWO", "name": "茂迪", "group_id": 5, "ma_settings": "5,10,20", "note": ""},
+    {"id": 503, "symbol": "6443.TW", "name": "元晶", "group_id": 5, "ma_settings": "5,10,20", "note": ""},
+    {"id": 504, "symbol": "2406.TW", "name": "國碩", "group_id": 5, "ma_settings": "5,10,20", "note": "太陽能材料"},
+
+    # Group 6: 低軌衛星
+    {"id": 601, "symbol": "2313.TW", "name": "華通", "group_id": 6, "ma_settings": "5,10,20", "note": ""},
+    {"id": 602, "symbol": "2367.TW", "name": "燿華", "group_id": 6, "ma_settings": "5,10,20", "note": ""},
+    {"id": 603, "symbol": "2312.TW", "name": "金寶", "group_id": 6, "ma_settings": "5,10,20", "note": ""},
+    {"id": 604, "symbol": "2485.TW", "name": "兆赫", "group_id": 6, "ma_settings": "5,10,20", "note": ""},
+    {"id": 605, "symbol": "6285.TW", "name": "啟碁", "group_id": 6, "ma_settings": "5,10,20", "note": "網通"},
+
+    # Group 7: 半導體測試
+    {"id": 701, "symbol": "6510.TW", "name": "精測", "group_id": 7, "ma_settings": "5,10,20", "note": "測試卡"},
+    {"id": 702, "symbol": "6223.TW", "name": "旺矽", "group_id": 7, "ma_settings": "5,10,20", "note": "探針卡"},
+    {"id": 703, "symbol": "6515.TW", "name": "穎崴", "group_id": 7, "ma_settings": "5,10,20", "note": "測試座"},
+    {"id": 704, "symbol": "6217.TW", "name": "中探針", "group_id": 7, "ma_settings": "5,10,20", "note": "探針"},
+
+    # Group 8: 面板
+    {"id": 801, "symbol": "3481.TW", "name": "群創", "group_id": 8, "ma_settings": "5,10,20", "note": ""},
+    {"id": 802, "symbol": "2409.TW", "name": "友達", "group_id": 8, "ma_settings": "5,10,20", "note": ""},
+    {"id": 803, "symbol": "6116.TW", "name": "彩晶", "group_id": 8, "ma_settings": "5,10,20", "note": ""},
+
+    # Group 9: 散熱
+    {"id": 901, "symbol": "3017.TW", "name": "奇鋐", "group_id": 9, "ma_settings": "5,10,20", "note": "散熱模組"},
+    {"id": 902, "symbol": "3324.TW", "name": "雙鴻", "group_id": 9, "ma_settings": "5,10,20", "note": "液冷散熱"},
+    {"id": 903, "symbol": "3653.TW", "name": "健策", "group_id": 9, "ma_settings": "5,10,20", "note": "均熱片"},
+    {"id": 904, "symbol": "2486.TW", "name": "一詮", "group_id": 9, "ma_settings": "5,10,20", "note": "導線架/散熱"},
+
+    # Group 10: 高階玻纖布
+    {"id": 1001, "symbol": "1802.TW", "name": "台玻", "group_id": 10, "ma_settings": "5,10,20", "note": "低介電玻纖布"},
+    {"id": 1002, "symbol": "1815.TWO", "name": "富喬", "group_id": 10, "ma_settings": "5,10,20", "note": "玻纖紗/布"},
+    {"id": 1003, "symbol": "5475.TWO", "name": "德宏", "group_id": 10, "ma_settings": "5,10,20", "note": "玻纖布"},
+
+    # Group 11: 被動元件
+    {"id": 1101, "symbol": "2327.TW", "name": "國巨", "group_id": 11, "ma_settings": "5,10,20", "note": "龍頭"},
+    {"id": 1102, "symbol": "2492.TW", "name": "華新科", "group_id": 11, "ma_settings": "5,10,20", "note": ""},
+    {"id": 1103, "symbol": "2375.TW", "name": "凱美", "group_id": 11, "ma_settings": "5,10,20", "note": ""},
+    {"id": 1104, "symbol": "8042.TW", "name": "金山電", "group_id": 11, "ma_settings": "5,10,20", "note": ""},
+    {"id": 1105, "symbol": "8043.TWO", "name": "蜜望實", "group_id": 11, "ma_settings": "5,10,20", "note": ""},
+    {"id": 1106, "symbol": "6173.TWO", "name": "信昌電", "group_id": 11, "ma_settings": "5,10,20", "note": ""},
+    {"id": 1107, "symbol": "2478.TW", "name": "大毅", "group_id": 11, "ma_settings": "5,10,20", "note": ""},
+    {"id": 1108, "symbol": "5328.TWO", "name": "華容", "group_id": 11, "ma_settings": "5,10,20", "note": "薄膜電容"},
+
+    # Group 12: 半導體設備
+    {"id": 1201, "symbol": "1560.TW", "name": "中砂", "group_id": 12, "ma_settings": "5,10,20", "note": "鑽石碟/再生晶圓"},
+    {"id": 1202, "symbol": "2360.TW", "name": "致茂", "group_id": 12, "ma_settings": "5,10,20", "note": "量測設備"},
+
+    # Group 13: 電子五哥
+    {"id": 1301, "symbol": "2317.TW", "name": "鴻海", "group_id": 13, "ma_settings": "5,10,20", "note": "EMS龍頭/AI"},
+    {"id": 1302, "symbol": "2382.TW", "name": "廣達", "group_id": 13, "ma_settings": "5,10,20", "note": "AI伺服器"},
+    {"id": 1303, "symbol": "3231.TW", "name": "緯創", "group_id": 13, "ma_settings": "5,10,20", "note": "AI伺服器"},
+    {"id": 1304, "symbol": "6669.TW", "name": "緯穎", "group_id": 13, "ma_settings": "5,10,20", "note": "AI伺服器"},
+    {"id": 1305, "symbol": "2356.TW", "name": "英業達", "group_id": 13, "ma_settings": "5,10,20", "note": "伺服器代工"},
+
+    # Group 14: CCL
+    {"id": 1401, "symbol": "6213.TW", "name": "聯茂", "group_id": 14, "ma_settings": "5,10,20", "note": "銅箔基板"},
+
+    # Group 15: 重電
+    {"id": 1501, "symbol": "1519.TW", "name": "華城", "group_id": 15, "ma_settings": "5,10,20", "note": "變壓器"},
+    {"id": 1502, "symbol": "1514.TW", "name": "亞力", "group_id": 15, "ma_settings": "5,10,20", "note": "配電盤"},
+    {"id": 1503, "symbol": "1513.TW", "name": "中興電", "group_id": 15, "ma_settings": "5,10,20", "note": "GIS設備"},
+    {"id": 1504, "symbol": "1511.TWO", "name": "沛波", "group_id": 15, "ma_settings": "5,10,20", "note": "鋼筋加工"},
+
+    # Group 16: 資訊服務 - NEW
+    {"id": 1601, "symbol": "6112.TW", "name": "邁達特", "group_id": 16, "ma_settings": "5,10,20", "note": "資服軟體"},
+    {"id": 1602, "symbol": "6689.TW", "name": "伊雲谷", "group_id": 16, "ma_settings": "5,10,20", "note": "雲端服務"},
+
+    # Group 17: 銅箔基板 - NEW
+    {"id": 1701, "symbol": "8039.TW", "name": "台虹", "group_id": 17, "ma_settings": "5,10,20", "note": "軟性銅箔基板"},
+    {"id": 1702, "symbol": "4939.TWO", "name": "亞電", "group_id": 17, "ma_settings": "5,10,20", "note": "軟性銅箔基板"},
+    {"id": 1703, "symbol": "2367.TW", "name": "燿華", "group_id": 17, "ma_settings": "5,10,20", "note": "PCB/軟硬結合板"},
+]
@@ -0,0 +1,203 @@
+import os
+
+import sqlite_conn
+
+# ==========================================
+# 觀察清單資料庫 (SQLite)：所有 session 共用一份基準清單 (owner = '')，
+# 各使用者的修改以 copy-on-write 疊加在自己的 owner 底下 (刪除以 deleted = 1 標記)
+# ==========================================
+DB_PATH = os.environ.get(
+    "WATCHLIST_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "watchlist.sqlite3"),
+)
+BASELINE = ""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS groups (
+    owner   TEXT    NOT NULL,
+    id      INTEGER NOT NULL,
+    name    TEXT    NOT NULL,
+    note    TEXT    NOT NULL DEFAULT '',
+    deleted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stocks (
+    owner       TEXT    NOT NULL,
+    id          INTEGER NOT NULL,
+    symbol      TEXT    NOT NULL,
+    name        TEXT    NOT NULL DEFAULT '',
+    group_id    INTEGER NOT NULL,
+    ma_settings TEXT    NOT NULL DEFAULT '5,10,20',
+    note        TEXT    NOT NULL DEFAULT '',
+    deleted     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_stocks_group ON stocks (owner, group_id);
+CREATE INDEX IF NOT EXISTS idx_stocks_symbol ON stocks (owner, symbol);
+
+CREATE TABLE IF NOT EXISTS sequences (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+GROUP_COLUMNS = ("id", "name", "note")
+STOCK_COLUMNS = ("id", "symbol", "name", "group_id", "ma_settings", "note")
+
+def _seed(conn):
+    # 空資料庫時寫入預設清單作為基準，並把 id 流水號接在預設資料之後
+    if conn.execute("SELECT 1 FROM groups WHERE owner = ? LIMIT 1", (BASELINE,)).fetchone():
+        return
+    # 預設清單只有空資料庫初始化時才需要，平常不載入
+    import watchlist_seed
+    with conn:
+        conn.executemany(
+            "INSERT INTO groups (owner, id, name, note) VALUES (?, ?, ?, ?)",
+            [(BASELINE, g["id"], g["name"], g["note"]) for g in watchlist_seed.DEFAULT_GROUPS],
+        )
+        conn.executemany(
+            "INSERT INTO stocks (owner, id, symbol, name, group_id, ma_settings, note) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(BASELINE, s["id"], s["symbol"], s["name"], s["group_id"], s["ma_settings"], s["note"])
+             for s in watchlist_seed.DEFAULT_STOCKS],
+        )
+        conn.execute("INSERT OR REPLACE INTO sequences VALUES ('groups', ?)",
+                     (max(g["id"] for g in watchlist_seed.DEFAULT_GROUPS),))
+        conn.execute("INSERT OR REPLACE INTO sequences VALUES ('stocks', ?)",
+                     (max(s["id"] for s in watchlist_seed.DEFAULT_STOCKS),))
+
+_connections = sqlite_conn.ThreadConnections(SCHEMA, on_create=_seed)
+
+def get_conn():
+    return _connections.get(DB_PATH)
+
+def _effective(table, columns, where="", params=()):
+    # 使用者看到的清單 = 自己的列 (未刪除) + 沒被自己覆寫過的基準列；owner 為第一個參數
+    cols = ", ".join(columns)
+    sql = (
+        f"SELECT {cols} FROM {table} b WHERE b.owner = '' {where} "
+        f"AND NOT EXISTS (SELECT 1 FROM {table} o WHERE o.owner = ?1 AND o.id = b.id) "
+        f"UNION ALL SELECT {cols} FROM {table} WHERE owner = ?1 AND deleted = 0 {where} "
+        f"ORDER BY id"
+    )
+    rows = get_conn().execute(sql, params).fetchall()
+    return [dict(zip(columns, row)) for row in rows]
+
+def _next_id(conn, name):
+    conn.execute("UPDATE sequences SET value = value + 1 WHERE name = ?", (name,))
+    return conn.execute("SELECT value FROM sequences WHERE name = ?", (name,)).fetchone()[0]
+
+def _materialize(conn, table, owner, item_id):
+    # copy-on-write：第一次修改基準列時，先複製一份到使用者自己的 owner 底下
+    columns = ", ".join(GROUP_COLUMNS if table == "groups" else STOCK_COLUMNS)
+    conn.execute(
+        f"INSERT OR IGNORE INTO {table} (owner, {columns}) SELECT ?, {columns} FROM {table} WHERE owner = '' AND id = ?",
+        (owner, item_id),
+    )
+
+# --- 讀取 ---
+def get_groups(owner):
+    return _effective("groups", GROUP_COLUMNS, params=(owner,))
+
+def get_group(owner, group_id):
+    rows = _effective("groups", GROUP_COLUMNS, "AND id = ?2", (owner, group_id))
+    return rows[0] if rows else None
+
+def get_stocks_by_group(owner, group_id):
+    return _effective("stocks", STOCK_COLUMNS, "AND group_id = ?2", (owner, group_id))
+
+def get_stock(owner, stock_id):
+    rows = _effective("stocks", STOCK_COLUMNS, "AND id = ?2", (owner, stock_id))
+    return rows[0] if rows else None
+
+def get_stocks_by_symbol(owner, symbol):
+    return _effective("stocks", STOCK_COLUMNS, "AND symbol = ?2", (owner, symbol.upper()))
+
+def get_all_stocks(owner):
+    return _effective("stocks", STOCK_COLUMNS, params=(owner,))
+
+def get_all_symbols(owner):
+    return sorted({s["symbol"] for s in _effective("stocks", ("id", "symbol"), params=(owner,))})
+
+# --- 寫入 (只寫入使用者自己的 owner，基準清單不變) ---
+def add_group(owner, name):
+    conn = get_conn()
+    with conn:
+        new_id = _next_id(conn, "groups")
+        conn.execute("INSERT INTO groups (owner, id, name, note) VALUES (?, ?, ?, '')", (owner, new_id, name))
+    return new_id
+
+def delete_group(owner, group_id):
+    conn = get_conn()
+    with conn:
+        _materialize(conn, "groups", owner, group_id)
+        conn.execute("UPDATE groups SET deleted = 1 WHERE owner = ? AND id = ?", (owner, group_id))
+        # 群組內的基準個股一併以刪除標記覆寫
+        conn.execute(
+            f"INSERT OR IGNORE INTO stocks (owner, {', '.join(STOCK_COLUMNS)}) "
+            f"SELECT ?, {', '.join(STOCK_COLUMNS)} FROM stocks WHERE owner = '' AND group_id = ?",
+            (owner, group_id),
+        )
+        conn.execute("UPDATE stocks SET deleted = 1 WHERE owner = ? AND group_id = ?", (owner, group_id))
+
+def update_group_name(owner, group_id, new_name):
+    conn = get_conn()
+    with conn:
+        _materialize(conn, "groups", owner, group_id)
+        conn.execute("UPDATE groups SET name = ? WHERE owner = ? AND id = ? AND deleted = 0", (new_name, owner, group_id))
+
+def add_stock(owner, group_id, symbol, name, ma_settings="5,10,20", note=""):
+    conn = get_conn()
+    with conn:
+        new_id = _next_id(conn, "stocks")
+        conn.execute(
+            "INSERT INTO stocks (owner, id, symbol, name, group_id, ma_settings, note) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (owner, new_id, symbol.upper(), name, group_id, ma_settings, note),
+        )
+    return new_id
+
+def add_stocks(owner, rows):
+    # 批次新增 (匯入用)，整批一個交易；rows: [{"group_id", "symbol", "name", "ma_settings", "note"}]，回傳新 id
+    conn = get_conn()
+    new_ids = []
+    with conn:
+        for row in rows:
+            new_id = _next_id(conn, "stocks")
+            conn.execute(
+                "INSERT INTO stocks (owner, id, symbol, name, group_id, ma_settings, note) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (owner, new_id, row["symbol"].upper(), row.get("name", ""), row["group_id"],
+                 row.get("ma_settings") or "5,10,20", row.get("note", "")),
+            )
+            new_ids.append(new_id)
+    return new_ids
+
+def delete_stock(owner, stock_id):
+    conn = get_conn()
+    with conn:
+        _materialize(conn, "stocks", owner, stock_id)
+        conn.execute("UPDATE stocks SET deleted = 1 WHERE owner = ? AND id = ?", (owner, stock_id))
+
+def update_stock_info(owner, stock_id, new_symbol, new_name):
+    conn = get_conn()
+    with conn:
+        _materialize(conn, "stocks", owner, stock_id)
+        conn.execute(
+            "UPDATE stocks SET symbol = ?, name = ? WHERE owner = ? AND id = ? AND deleted = 0",
+            (new_symbol.upper(), new_name, owner, stock_id),
+        )
+
+def update_note(owner, item_type, item_id, new_note):
+    table = "groups" if item_type == "group" else "stocks"
+    conn = get_conn()
+    with conn:
+        _materialize(conn, table, owner, item_id)
+        cur = conn.execute(f"UPDATE {table} SET note = ? WHERE owner = ? AND id = ? AND deleted = 0", (new_note, owner, item_id))
+    return cur.rowcount > 0
+
+def update_stock_ma(owner, stock_id, new_ma):
+    conn = get_conn()
+    with conn:
+        _materialize(conn, "stocks", owner, stock_id)
+        cur = conn.execute("UPDATE stocks SET ma_settings = ? WHERE owner = ? AND id = ? AND deleted = 0", (new_ma, owner, stock_id))
+    return cur.rowcount > 0
@@ -0,0 +1,191 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import failure_tracker
+import metrics
+
+# ==========================================
+# Yahoo API 連線層：共用 keep-alive 連線池 + 抖動退避重試 + 請求計時
+# ==========================================
+# 可用環境變數 YAHOO_BASE_URL 改連本地模擬伺服器 (bench/mock_yahoo.py)
+BASE_URL = os.environ.get("YAHOO_BASE_URL", "https://query1.finance.yahoo.com").rstrip("/")
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# 連線池大小與抓取執行緒數一致，避免執行緒等待連線或多開握手
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 5
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+_timings = deque(maxlen=2000)
+_timings_lock = threading.Lock()
+
+metrics.gauge("yahoo_breaker_open", lambda: failure_tracker.breaker.state()["state"] == "open")
+
+class YahooRequestError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def is_transient(self):
+        # 連線錯誤 (無狀態碼) 或 429/5xx 視為暫時性錯誤
+        return self.status is None or self.status in RETRY_STATUS
+
+    @property
+    def is_not_found(self):
+        # 只有 404 代表代號不存在；401 / 403 等其他 4xx 多半是權杖或被擋，過一陣子可能恢復
+        return self.status == 404
+
+class CircuitOpenError(YahooRequestError):
+    pass
+
+def get_session():
+    # 整個行程共用一個 Session；HTTPAdapter 底下的 urllib3 連線池是執行緒安全的
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(HEADERS)
+                _session = session
+    return _session
+
+def _backoff_delay(attempt, retry_after=None):
+    # Full jitter：在 [0, min(上限, base * 2^n)] 之間隨機等待，避免大家同時重試
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def _record_timing(endpoint, status, elapsed, attempts, outcome=None):
+    # outcome：指標用的狀態標籤，預設為 HTTP 狀態碼 (連線錯誤為 error)
+    metrics.observe("yahoo_request_seconds", elapsed, endpoint=endpoint)
+    metrics.inc("yahoo_requests_total", endpoint=endpoint, status=outcome or (str(status) if status else "error"))
+    with _timings_lock:
+        _timings.append({
+            "endpoint": endpoint,
+            "status": status,
+            "elapsed": elapsed,
+            "attempts": attempts,
+            "at": time.time(),
+        })
+
+def get_request_timings():
+    with _timings_lock:
+        return list(_timings)
+
+def get_json(path, params=None, endpoint="chart", timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES):
+    # 429 / 5xx / 連線錯誤會以抖動退避重試；重試用盡後丟出 YahooRequestError
+    url = f"{BASE_URL}{path}"
+    session = get_session()
+    started = time.perf_counter()
+    status = None
+
+    # 斷路器開啟時直接失敗，不再對 Yahoo 送出請求
+    if not failure_tracker.breaker.allow():
+        _record_timing(endpoint, None, time.perf_counter() - started, 0, outcome="circuit_open")
+        raise CircuitOpenError("Yahoo 限流中，斷路器暫停查詢")
+
+    # 斷路器以一次查詢為單位記錄結果 (重試不重複計數)：最後一次嘗試仍是 429 / 5xx / 連線錯誤才算限流，
+    # 其他失敗不會讓斷路器跳脫
+    throttled = False
+    try:
+        for attempt in range(max_retries + 1):
+            # 重試前斷路器已被其他查詢觸發跳脫：放棄剩下的重試
+            if attempt and failure_tracker.breaker.is_open():
+                _record_timing(endpoint, status, time.perf_counter() - started, attempt, outcome="circuit_open")
+                raise CircuitOpenError("Yahoo 限流中，斷路器暫停查詢")
+
+            retry_after = None
+            throttled = False
+            try:
+                response = session.get(url, params=params, timeout=timeout)
+                status = response.status_code
+                throttled = status in RETRY_STATUS
+                if not throttled:
+                    response.raise_for_status()
+                    try:
+                        data = response.json()
+                    except ValueError as e:
+                        # 回應不是 JSON (例如被導到錯誤頁)：不重試，視為暫時性錯誤
+                        _record_timing(endpoint, status, time.perf_counter() - started, attempt + 1, outcome="invalid_json")
+                        raise YahooRequestError(f"回應格式錯誤: {e}") from e
+                    _record_timing(endpoint, status, time.perf_counter() - started, attempt + 1)
+                    return data
+                retry_after = response.headers.get("Retry-After")
+                error = YahooRequestError(f"HTTP {status}", status)
+            except requests.HTTPError as e:
+                # 404 等非暫時性錯誤不重試
+                _record_timing(endpoint, status, time.perf_counter() - started, attempt + 1)
+                raise YahooRequestError(str(e), status) from e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                status = None
+                throttled = True
+                error = YahooRequestError(str(e))
+            except requests.RequestException as e:
+                # 轉址過多、網址錯誤、傳輸中斷等：不重試
+                _record_timing(endpoint, None, time.perf_counter() - started, attempt + 1)
+                raise YahooRequestError(str(e)) from e
+
+            if attempt < max_retries:
+                metrics.inc("yahoo_retries_total", endpoint=endpoint)
+                time.sleep(_backoff_delay(attempt, retry_after))
+
+        _record_timing(endpoint, status, time.perf_counter() - started, max_retries + 1)
+        raise error
+    finally:
+        failure_tracker.breaker.record(throttled)
+
+def fetch_chart(symbol, params):
+    # 回傳 (timestamps, indicators.quote[0])，查無資料時回傳 (None, None)
+    data = get_json(f"/v8/finance/chart/{symbol}", params=params, endpoint="chart")
+
+    if "chart" not in data or "result" not in data["chart"] or not data["chart"]["result"]:
+        return None, None
+
+    result = data["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    timestamps = result.get("timestamp") or []
+    return timestamps, quote
+
+def fetch_spark(symbols, range_str="5d", interval="1d"):
+    # 回傳 {symbol: 收盤價陣列}
+    params = {"symbols": ",".join(symbols), "range": range_str, "interval": interval}
+    data = get_json("/v7/finance/spark", params=params, endpoint="spark")
+
+    closes = {}
+    for item in (data.get("spark") or {}).get("result") or []:
+        responses = item.get("response") or []
+        if not responses:
+            continue
+        closes[item["symbol"]] = responses[0]["indicators"]["quote"][0].get("close") or []
+    return closes
+
+def fetch_symbol_meta(symbols):
+    # 回傳 {symbol: chart meta}，只包含查得到的代號 (查無資料的代號不會出現在結果裡)
+    params = {"symbols": ",".join(symbols), "range": "1d", "interval": "1d"}
+    data = get_json("/v7/finance/spark", params=params, endpoint="spark")
+
+    metas = {}
+    for item in (data.get("spark") or {}).get("result") or []:
+        responses = item.get("response") or []
+        if responses:
+            metas[item["symbol"]] = responses[0].get("meta") or {}
+    return metas